@@ -124,6 +124,34 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # Escritas simultaneas esperam ate 20s pelo lock em vez de falhar com "database is locked"
+                'timeout': 20,
+            },
+            # Banco de testes em arquivo (e nao em memoria): os testes de concorrencia
+            # (core/tests/test_concurrency.py) abrem uma conexao por thread e so eles
+            # usam BEGIN IMMEDIATE
+            'TEST': {
+                'NAME': BASE_DIR / 'test_db.sqlite3',
+            },
+        }
+    }
+
+
+# Cache
+# Em prod/dev varios workers do gunicorn precisam enxergar a mesma versao dos dados
+# de referencia, entao usamos o cache em banco (tabela criada com createcachetable).
+if ENV == 'prod' or ENV == 'dev':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+            'LOCATION': 'grupi_cache',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
         }
     }
 
@@ -0,0 +1,148 @@
+# core/cache.py
+"""
+Cache versionado dos dados de referencia (eixos, polos, DRPs, cursos, PIs e tags).
+
+Os payloads serializados ficam guardados sob uma chave que inclui a versao atual.
+Quando algum desses modelos e salvo ou deletado a versao e incrementada depois do
+commit (ver core/signals.py), o que invalida todas as entradas antigas de uma vez so, sem
+precisar conhecer as chaves.
+
+O mesmo mecanismo de versoes e usado para os dados derivados dos grupos de projeto
+(namespace 'project-groups').
+"""
+import gzip
+import hashlib
+import time
+
+import brotli
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .models import CacheVersion
+
+REFERENCE_DATA_NAMESPACE = 'reference-data'
+
+# Dados derivados dos grupos de projeto (ex.: caracteristicas usadas nas recomendacoes)
+PROJECT_GROUPS_NAMESPACE = 'project-groups'
+
+# Os payloads expiram sozinhos depois de um dia, mesmo que a versao nao mude
+REFERENCE_DATA_TIMEOUT = 60 * 60 * 24
+
+PROJECT_GROUPS_TIMEOUT = 60 * 60
+
+
+# A copia da versao no cache expira para se corrigir sozinha caso algum bump nao chegue ao cache
+VERSION_CACHE_TIMEOUT = 60 * 5
+
+
+def _version_key(namespace):
+    return f'{namespace}:version'
+
+
+def get_version(namespace):
+    """
+    Retorna a versao atual do namespace.
+
+    A fonte da verdade e a tabela CacheVersion; o cache guarda uma copia para que os
+    requests normalmente nao toquem no banco.
+    """
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        version = CacheVersion.objects.filter(namespace=namespace).values_list('version', flat=True).first()
+        if version is None:
+            return bump_version(namespace)
+        # add() e nao set(): um bump que aconteceu depois da leitura acima prevalece
+        cache.add(_version_key(namespace), version, timeout=VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def bump_version(namespace):
+    """
+    Incrementa a versao do namespace, invalidando tudo o que foi cacheado nele.
+
+    Deve rodar depois do commit de quem alterou os dados (transaction.on_commit); caso
+    contrario outro request pode recriar o payload com os dados antigos sob a nova versao.
+    """
+    versions = CacheVersion.objects.filter(namespace=namespace)
+    with transaction.atomic():
+        if not versions.update(version=F('version') + 1):
+            # Usamos o timestamp para que um namespace novo nunca reutilize payloads antigos do cache
+            _, created = CacheVersion.objects.get_or_create(
+                namespace=namespace, defaults={'version': int(time.time() * 1000)}
+            )
+            if not created:
+                versions.update(version=F('version') + 1)
+        version = versions.values_list('version', flat=True).get()
+        # Publicada com a linha ainda travada: bumps simultaneos chegam ao cache na ordem do banco
+        cache.set(_version_key(namespace), version, timeout=VERSION_CACHE_TIMEOUT)
+    return version
+
+
+def make_etag(*parts):
+    digest = hashlib.md5(':'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'"{digest}"'
+
+
+def get_reference_version():
+    return get_version(REFERENCE_DATA_NAMESPACE)
+
+
+def bump_reference_version():
+    return bump_version(REFERENCE_DATA_NAMESPACE)
+
+
+def get_project_groups_version():
+    return get_version(PROJECT_GROUPS_NAMESPACE)
+
+
+def bump_project_groups_version():
+    return bump_version(PROJECT_GROUPS_NAMESPACE)
+
+
+def get_project_groups_payload(name, builder, version=None):
+    """Como get_reference_payload, mas para os dados derivados dos grupos (ex.: facetas)."""
+    if version is None:
+        version = get_project_groups_version()
+    key = f'{PROJECT_GROUPS_NAMESPACE}:{name}:{version}'
+    payload = cache.get(key)
+    if payload is None:
+        payload = builder()
+        cache.set(key, payload, timeout=PROJECT_GROUPS_TIMEOUT)
+    return payload
+
+
+def get_reference_etag(name, version=None):
+    """ETag do recurso de referencia 'name'; depende apenas da versao, entao nao toca no banco."""
+    if version is None:
+        version = get_reference_version()
+    return make_etag(REFERENCE_DATA_NAMESPACE, name, version)
+
+
+def get_reference_payload(name, builder, version=None):
+    """
+    Retorna o payload cacheado do recurso de referencia 'name'.
+
+    'builder' so e chamado quando nao existe payload cacheado para a versao atual.
+    """
+    if version is None:
+        version = get_reference_version()
+    key = f'{REFERENCE_DATA_NAMESPACE}:{name}:{version}'
+    payload = cache.get(key)
+    if payload is None:
+        payload = builder()
+        cache.set(key, payload, timeout=REFERENCE_DATA_TIMEOUT)
+    return payload
+
+
+def build_encoded_variants(body):
+    """
+    Pre-comprime 'body' (bytes) uma unica vez, para que as respostas so precisem
+    escolher a variante pelo Accept-Encoding.
+    """
+    variants = {
+        'identity': body,
+        'gzip': gzip.compress(body, compresslevel=9, mtime=0),
+        'br': brotli.compress(body, quality=11),
+    }
+    return variants
@@ -0,0 +1,79 @@
+# core/context.py
+"""
+Dados do usuario autenticado compartilhados durante um request.
+
+Permissoes e views precisam do vinculo (Membership) e do perfil de quem fez o request.
+Em vez de cada uma consultar de novo, get_request_context carrega cada um uma unica vez,
+ja com os relacionamentos usados (select_related), e guarda o resultado no proprio
+HttpRequest. Assim IsMemberOfGroup, IsAdminOfGroup e a view do mesmo request enxergam
+os mesmos objetos.
+
+O contexto nao acompanha escritas feitas durante o request (ex.: sair do grupo); quem
+altera o vinculo deve seguir com os objetos que ja tem em maos.
+"""
+from django.utils.functional import cached_property
+
+from .models import Membership, UserProfile
+
+# Atributo do HttpRequest onde o contexto fica guardado
+REQUEST_ATTRIBUTE = '_core_request_context'
+
+
+class RequestContext:
+    def __init__(self, user):
+        self.user = user
+
+    @property
+    def user_id(self):
+        return self.user.pk
+
+    @cached_property
+    def membership(self):
+        """Vinculo do usuario (com o grupo) ou None se ele nao faz parte de um grupo."""
+        if self.user_id is None:
+            return None
+        return Membership.objects.select_related('project_group').filter(user_id=self.user_id).first()
+
+    @cached_property
+    def profile(self):
+        """Perfil do usuario com os dados academicos usados ao criar grupos e recomendar, ou None."""
+        if self.user_id is None:
+            return None
+        return (
+            UserProfile.objects.select_related('polo__drp', 'curso__eixo', 'projeto_integrador')
+            .filter(user_id=self.user_id)
+            .first()
+        )
+
+    @property
+    def group(self):
+        return self.membership.project_group if self.membership else None
+
+    def membership_in(self, group):
+        """Vinculo do usuario em 'group' (instancia ou id), ou None."""
+        group_pk = getattr(group, 'pk', group)
+        if self.membership is not None and self.membership.project_group_id == group_pk:
+            return self.membership
+        return None
+
+    def is_member_of(self, group):
+        return self.membership_in(group) is not None
+
+    def is_admin_of(self, group):
+        membership = self.membership_in(group)
+        return membership is not None and membership.role == Membership.Role.ADMIN
+
+
+def get_request_context(request):
+    """
+    Retorna o RequestContext do usuario de 'request' (Request do DRF ou HttpRequest).
+
+    O contexto fica no HttpRequest, que e o mesmo objeto para permissoes e views. Se o
+    usuario do request mudar, um novo contexto e criado.
+    """
+    http_request = getattr(request, '_request', request)
+    context = getattr(http_request, REQUEST_ATTRIBUTE, None)
+    if context is None or context.user is not request.user:
+        context = RequestContext(request.user)
+        setattr(http_request, REQUEST_ATTRIBUTE, context)
+    return context
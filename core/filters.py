@@ -0,0 +1,198 @@
+# core/filters.py
+import hashlib
+import json
+import uuid
+
+from django.db.models import Count, Exists, OuterRef
+from rest_framework import serializers
+
+from .models import ProjectGroup, ProjectGroupTags, UserTags
+
+
+def int_query_param(request, name):
+    """Le um parametro inteiro da query string; retorna None se ausente e 400 se invalido."""
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise serializers.ValidationError({name: 'Informe um número inteiro válido.'})
+
+
+def int_list_query_param(request, name):
+    """Le uma lista de inteiros separados por virgula (ex.: ?tags=1,2,3)."""
+    value = request.query_params.get(name)
+    if not value:
+        return []
+    try:
+        return [int(item) for item in value.split(',') if item.strip()]
+    except ValueError:
+        raise serializers.ValidationError({name: 'Informe uma lista de números inteiros separados por vírgula.'})
+
+
+def uuid_list_query_param(request, name, max_items):
+    """Le uma lista de UUIDs separados por virgula, sem repeticoes e na ordem informada."""
+    value = request.query_params.get(name)
+    if not value:
+        return []
+    try:
+        items = list(dict.fromkeys(uuid.UUID(item.strip()) for item in value.split(',') if item.strip()))
+    except ValueError:
+        raise serializers.ValidationError({name: 'Informe uma lista de UUIDs separados por vírgula.'})
+    if len(items) > max_items:
+        raise serializers.ValidationError({name: f'Informe no máximo {max_items} usuários por consulta.'})
+    return items
+
+
+def bool_query_param(request, name):
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return None
+    if value.lower() in ('true', '1'):
+        return True
+    if value.lower() in ('false', '0'):
+        return False
+    raise serializers.ValidationError({name: 'Use true ou false.'})
+
+
+def choice_query_param(request, name, choices):
+    """Le um parametro que deve ser um dos valores de 'choices' (ex.: ?status=PENDING)."""
+    value = request.query_params.get(name)
+    if value in (None, ''):
+        return None
+    value = value.upper()
+    if value not in choices:
+        raise serializers.ValidationError({name: f"Use um destes valores: {', '.join(choices)}."})
+    return value
+
+
+# Filtros academicos aceitos pela lista de grupos: parametro -> campo de ProjectGroup
+PROJECT_GROUP_FK_FILTERS = {
+    'projeto_integrador': 'projeto_integrador_id',
+    'drp': 'drp_id',
+    'polo': 'polo_id',
+    'eixo': 'eixo_id',
+    'curso': 'curso_id',
+}
+
+
+def project_group_filters(request):
+    """
+    Le e valida os filtros da lista de grupos (?projeto_integrador=, ?drp=, ?polo=, ?eixo=,
+    ?curso=, ?tags=1,2, ?moderated= e ?search=) em forma canonica: tags ordenadas e sem
+    repeticao, moderated como bool e search sem espacos nas pontas.
+    """
+    fields = {}
+    for param, field in PROJECT_GROUP_FK_FILTERS.items():
+        value = int_query_param(request, param)
+        if value is not None:
+            fields[field] = value
+
+    moderated = bool_query_param(request, 'moderated')
+    if moderated is not None:
+        fields['moderated'] = moderated
+
+    return {
+        'fields': fields,
+        'tags': sorted(set(int_list_query_param(request, 'tags'))),
+        'search': request.query_params.get('search', '').strip(),
+    }
+
+
+def apply_project_group_filters(queryset, filters):
+    """
+    Aplica os filtros lidos por project_group_filters. As combinacoes mais comuns sao cobertas
+    pelos indices compostos de ProjectGroup; search usa o indice textual e anota 'search_rank'.
+    """
+    queryset = queryset.filter(**filters['fields'])
+
+    if filters['tags']:
+        # EXISTS em vez de JOIN para nao duplicar grupos que tem mais de uma das tags
+        queryset = queryset.filter(
+            Exists(ProjectGroupTags.objects.filter(project_group=OuterRef('pk'), tag_id__in=filters['tags']))
+        )
+
+    if filters['search']:
+        queryset = queryset.search(filters['search'])
+    return queryset
+
+
+def filter_project_groups(queryset, request):
+    """Aplica os filtros da lista de grupos informados na query string."""
+    return apply_project_group_filters(queryset, project_group_filters(request))
+
+
+# Filtros academicos da busca de alunos sem grupo: parametro -> campo de UserProfile
+PROFILE_FK_FILTERS = {
+    'projeto_integrador': 'projeto_integrador_id',
+    'drp': 'polo__drp_id',
+    'polo': 'polo_id',
+    'eixo': 'curso__eixo_id',
+    'curso': 'curso_id',
+}
+
+
+def filter_profiles(queryset, request):
+    """Aplica os filtros da busca de alunos (?projeto_integrador=, ?drp=, ?polo=, ?eixo=, ?curso= e ?tags=1,2)."""
+    filters = {}
+    for param, field in PROFILE_FK_FILTERS.items():
+        value = int_query_param(request, param)
+        if value is not None:
+            filters[field] = value
+    queryset = queryset.filter(**filters)
+
+    tags = int_list_query_param(request, 'tags')
+    if tags:
+        queryset = queryset.filter(Exists(UserTags.objects.filter(profile=OuterRef('pk'), tag_id__in=tags)))
+    return queryset
+
+
+# Faceta -> (campo do grupo, campo com o rotulo, formato do rotulo)
+PROJECT_GROUP_FACETS = {
+    'projeto_integrador': ('projeto_integrador', 'projeto_integrador__numero', 'PI {}'),
+    'drp': ('drp', 'drp__numero', 'DRP {}'),
+    'polo': ('polo', 'polo__nome', '{}'),
+    'eixo': ('eixo', 'eixo__nome', '{}'),
+    'curso': ('curso', 'curso__nome', '{}'),
+}
+
+
+def project_group_filters_key(filters):
+    """
+    Chave do cache para os filtros lidos por project_group_filters. Usa os valores ja
+    normalizados, entao ?tags=1,2 e ?tags=2,1 (ou ?moderated=1 e ?moderated=true) dividem a entrada.
+    """
+    payload = json.dumps(filters, sort_keys=True, separators=(',', ':'))
+    return hashlib.md5(payload.encode('utf-8')).hexdigest()
+
+
+def project_group_facets(queryset):
+    """
+    Conta os grupos de 'queryset' por PI, DRP, polo, eixo, curso e tag: uma consulta
+    agregada (GROUP BY) por faceta, sem carregar os grupos.
+    """
+    # Trabalha sobre os ids para nao arrastar anotacoes (ex.: search_rank) para o GROUP BY
+    groups = ProjectGroup.objects.filter(pk__in=queryset.values('pk')).order_by()
+
+    facets = {'total': groups.count()}
+    for facet, (field, label_field, label_format) in PROJECT_GROUP_FACETS.items():
+        rows = (
+            groups.exclude(**{f'{field}__isnull': True})
+            .values(field, label_field)
+            .annotate(count=Count('pk'))
+            .order_by('-count', label_field)
+        )
+        facets[facet] = [
+            {'id': row[field], 'label': label_format.format(row[label_field]), 'count': row['count']}
+            for row in rows
+        ]
+
+    rows = (
+        ProjectGroupTags.objects.filter(project_group__in=groups.values('pk'))
+        .values('tag', 'tag__name')
+        .annotate(count=Count('project_group', distinct=True))
+        .order_by('-count', 'tag__name')
+    )
+    facets['tags'] = [{'id': row['tag'], 'label': row['tag__name'], 'count': row['count']} for row in rows]
+    return facets
@@ -1,11 +1,19 @@
+import hashlib
 import json
 import os
+import time
 from django.core.management.base import BaseCommand
-from core.models import Polo, DRP
+from django.db import transaction
+from core.cache import bump_reference_version
+from core.models import Polo, DRP, ReferenceDataImport
+from core.utils import normalize_text
 
 class Command(BaseCommand):
     help = "Importa polos e DRPs do arquivo polos.json"
 
+    # Chave usada em ReferenceDataImport para guardar o hash da ultima importacao
+    source_name = 'polos.json'
+
     def add_arguments(self, parser):
         parser.add_argument(
             '--file',
@@ -15,43 +23,103 @@ class Command(BaseCommand):
             default=os.path.join('dataset', 'polos.json'),
             help='Caminho para o arquivo polos.json (padrão: dataset/polos.json)',
         )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Mostra o que seria importado sem gravar nada no banco.',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Importa mesmo que o conteúdo do arquivo não tenha mudado desde a última importação.',
+        )
 
     def handle(self, *args, **options):
+        started = time.perf_counter()
         file_path = options['file']
         if not os.path.isabs(file_path):
             file_path = os.path.abspath(file_path)
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
+            with open(file_path, 'rb') as f:
+                content = f.read()
         except FileNotFoundError:
             self.stdout.write(self.style.ERROR(f"Arquivo não encontrado: {file_path}"))
             return
+
+        content_hash = hashlib.sha256(content).hexdigest()
+        last_import = ReferenceDataImport.objects.filter(source=self.source_name).first()
+        if last_import and last_import.content_hash == content_hash and not options['force']:
+            self.stdout.write(self.style.SUCCESS(
+                f'{self.source_name} não mudou desde a última importação ({last_import.imported_at:%Y-%m-%d %H:%M}). '
+                'Nada a fazer.'
+            ))
+            return
+
+        rows = self.parse_rows(json.loads(content.decode('utf-8')))
+
+        # Pre-carrega o que ja existe: uma consulta para DRPs e outra para polos
+        drps_by_numero = {drp.numero: drp for drp in DRP.objects.all()}
+        existing_polos = set(Polo.objects.values_list('drp__numero', 'nome'))
+
+        new_drp_numbers = sorted({drp_num for _, drp_num in rows} - set(drps_by_numero))
+        new_polos = [(nome, drp_num) for nome, drp_num in rows if (drp_num, nome) not in existing_polos]
+        missing_polos = existing_polos - {(drp_num, nome) for nome, drp_num in rows}
+
+        if options['verbosity'] >= 2:
+            for nome, drp_num in new_polos:
+                self.stdout.write(f'Novo polo {nome} com DRP {drp_num}')
+
+        if not options['dry_run']:
+            with transaction.atomic():
+                if new_drp_numbers:
+                    DRP.objects.bulk_create([DRP(numero=numero) for numero in new_drp_numbers], ignore_conflicts=True)
+                    drps_by_numero = {drp.numero: drp for drp in DRP.objects.all()}
+
+                # bulk_create nao chama save(), entao preenchemos o nome normalizado aqui
+                Polo.objects.bulk_create(
+                    [
+                        Polo(nome=nome, nome_normalizado=normalize_text(nome), drp=drps_by_numero[drp_num])
+                        for nome, drp_num in new_polos
+                    ],
+                    batch_size=500,
+                    ignore_conflicts=True,
+                )
+                ReferenceDataImport.objects.update_or_create(
+                    source=self.source_name, defaults={'content_hash': content_hash}
+                )
+                # bulk_create nao dispara signals: invalidamos o cache de referencia manualmente
+                if new_drp_numbers or new_polos:
+                    transaction.on_commit(bump_reference_version)
+
+        elapsed = time.perf_counter() - started
+        prefix = '[dry-run] ' if options['dry_run'] else ''
+        self.stdout.write(f'{prefix}Linhas válidas no arquivo: {len(rows)}')
+        self.stdout.write(f'{prefix}DRPs novas: {len(new_drp_numbers)}')
+        self.stdout.write(f'{prefix}Polos novos: {len(new_polos)}')
+        self.stdout.write(f'{prefix}Polos já existentes: {len(rows) - len(new_polos)}')
+        if missing_polos:
+            self.stdout.write(self.style.WARNING(
+                f'{prefix}Polos no banco que não estão no arquivo (não removidos): {len(missing_polos)}'
+            ))
+        self.stdout.write(self.style.SUCCESS(f'{prefix}Importação finalizada em {elapsed:.2f}s.'))
+
+    def parse_rows(self, data):
+        """Converte as entradas do JSON em pares (nome do polo, numero da DRP), sem duplicatas."""
+        rows = {}
         for entry in data:
             polo_name = entry['name'].strip()
             drp_str = entry['drp'].strip()
 
-            self.stdout.write(self.style.SUCCESS(f'Criando polo {polo_name} com DRP {drp_str}'))
             # Ignora cabeçalhos inválidos
             if polo_name.upper() == "POLO" or drp_str.upper() == "DRP":
                 continue
 
             try:
                 # Extrai o número do tipo "DRP01" → 1
-                drp_num = int(drp_str.replace("DRP", ""))
+                drp_num = int(drp_str.upper().replace("DRP", ""))
             except ValueError:
                 self.stdout.write(self.style.WARNING(f'DRP inválido para o polo {polo_name}: {drp_str}'))
                 continue
 
-            # Cria ou busca DRP com número
-            self.stdout.write(self.style.SUCCESS(f'Criado DRP: {drp_num}'))
-            drp, created_drp = DRP.objects.get_or_create(numero=drp_num)
-
-            # Cria ou busca Polo com DRP relacionado
-            polo, created_polo = Polo.objects.get_or_create(nome=polo_name, drp=drp)
-
-            if created_polo:
-                self.stdout.write(self.style.SUCCESS(f'Criado polo {polo_name} com DRP {drp_str}'))
-            else:
-                self.stdout.write(f'Polo {polo_name} já existe.')
-
-        self.stdout.write(self.style.SUCCESS('Importação finalizada.'))
+            rows[(polo_name, drp_num)] = None
+        return list(rows)
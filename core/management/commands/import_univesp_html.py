@@ -0,0 +1,326 @@
+import os
+import re
+import time
+from collections import defaultdict
+from html.parser import HTMLParser
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from core.cache import bump_reference_version
+from core.models import Polo, DRP, UserProfile, ProjectGroup
+from core.utils import normalize_text
+
+# Tamanho dos pedacos lidos do arquivo e entregues ao parser
+CHUNK_SIZE = 64 * 1024
+
+# Linhas do array JavaScript de dataset/drps.html: { name: "ARUJÁ", drp: "DRP01" },
+DRP_ROW_RE = re.compile(r'\{\s*name:\s*"(?P<name>[^"]+)"\s*,\s*drp:\s*"(?P<drp>[^"]+)"\s*\}')
+
+
+def polo_key(nome):
+    """Chave de comparacao: sem acentos, caixa, espacos ou pontuacao ('SÃO PAULO-UNICEU' == 'Sao Paulo - UniCEU')."""
+    return re.sub(r'[^0-9a-z]', '', normalize_text(nome))
+
+
+class DRPListParser(HTMLParser):
+    """
+    Extrai os pares (polo, DRP) do <script> de dataset/drps.html.
+
+    O conteudo do script chega em pedacos; guardamos apenas a ultima linha incompleta,
+    entao a memoria usada nao depende do tamanho do arquivo.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.in_script = False
+        self.pending = ''
+        self.rows = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'script':
+            self.in_script = True
+            self.pending = ''
+
+    def handle_endtag(self, tag):
+        if tag == 'script':
+            self.consume(self.pending)
+            self.in_script = False
+            self.pending = ''
+
+    def handle_data(self, data):
+        if not self.in_script:
+            return
+        lines = (self.pending + data).split('\n')
+        self.pending = lines.pop()
+        for line in lines:
+            self.consume(line)
+
+    def consume(self, text):
+        for match in DRP_ROW_RE.finditer(text):
+            self.rows.append((match.group('name').strip(), match.group('drp').strip()))
+
+
+class SitePolosParser(HTMLParser):
+    """Extrai os nomes de <p class="... cidade"><strong>Nome</strong></p> de dataset/polos_univesp.html."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.in_cidade = False
+        self.current = []
+        self.rows = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'p' and 'cidade' in (dict(attrs).get('class') or '').split():
+            self.in_cidade = True
+            self.current = []
+
+    def handle_endtag(self, tag):
+        if tag == 'p' and self.in_cidade:
+            nome = ' '.join(''.join(self.current).split())
+            if nome:
+                self.rows.append(nome)
+            self.in_cidade = False
+
+    def handle_data(self, data):
+        if self.in_cidade:
+            self.current.append(data)
+
+
+def stream_parse(parser, file_path):
+    """Alimenta o parser com o arquivo em pedacos e devolve as linhas novas a cada pedaco."""
+    with open(file_path, 'r', encoding='utf-8') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            parser.feed(chunk)
+            if parser.rows:
+                rows, parser.rows = parser.rows, []
+                yield from rows
+    parser.close()
+    yield from parser.rows
+
+
+class Command(BaseCommand):
+    help = "Atualiza DRPs e polos a partir dos HTMLs da UNIVESP (dataset/drps.html e dataset/polos_univesp.html)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--drps-file',
+            type=str,
+            default=os.path.join('dataset', 'drps.html'),
+            help='HTML com a lista de polos por DRP (padrão: dataset/drps.html)',
+        )
+        parser.add_argument(
+            '--site-file',
+            type=str,
+            default=os.path.join('dataset', 'polos_univesp.html'),
+            help='HTML da página de polos da UNIVESP, usado para conferência (padrão: dataset/polos_univesp.html)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Quantidade de polos gravados por lote (padrão: 200)',
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Remove os polos que não estão mais no HTML e não são usados por perfis ou grupos.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Mostra o que seria alterado sem gravar nada no banco.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        drps_file = os.path.abspath(options['drps_file'])
+        if not os.path.exists(drps_file):
+            raise CommandError(f"Arquivo não encontrado: {drps_file}")
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size deve ser maior que zero.')
+
+        self.dry_run = options['dry_run']
+        self.batch_size = options['batch_size']
+        self.verbosity = options['verbosity']
+        self.stats = {'added': 0, 'renamed': 0, 'moved': 0, 'unchanged': 0, 'removed': 0, 'kept': 0}
+
+        # Estado atual carregado uma unica vez: DRPs por numero e polos por chave normalizada e DRP.
+        # O modelo permite o mesmo nome em DRPs diferentes (unique_together = ('drp', 'nome')).
+        self.drps_by_numero = {drp.numero: drp for drp in DRP.objects.all()}
+        self.polos_by_key = defaultdict(dict)
+        # Polos que colidem na mesma DRP ('Sao Paulo' e 'SÃO PAULO'): nao sao atualizados nem removidos
+        self.duplicates = defaultdict(list)
+        for polo in Polo.objects.order_by('pk'):
+            by_drp = self.polos_by_key[polo_key(polo.nome)]
+            if polo.drp_id in by_drp:
+                self.duplicates[(polo.drp_id, polo_key(polo.nome))].append(polo)
+            else:
+                by_drp[polo.drp_id] = polo
+        # Pares (drp_id, chave) ja vistos no HTML
+        self.seen = set()
+
+        with transaction.atomic():
+            batch = []
+            for nome, drp_str in stream_parse(DRPListParser(), drps_file):
+                batch.append((nome, drp_str))
+                if len(batch) >= self.batch_size:
+                    self.upsert_batch(batch)
+                    batch = []
+            if batch:
+                self.upsert_batch(batch)
+
+            if not self.seen:
+                raise CommandError(f'Nenhum polo encontrado em {drps_file}.')
+
+            self.handle_removed(options['prune'])
+
+            if self.dry_run:
+                transaction.set_rollback(True)
+            elif any(self.stats[key] for key in ('added', 'renamed', 'moved', 'removed')):
+                # bulk_create/bulk_update nao disparam signals
+                transaction.on_commit(bump_reference_version)
+
+        self.check_site(options['site_file'])
+        self.report_duplicates()
+
+        elapsed = time.perf_counter() - started
+        prefix = '[dry-run] ' if self.dry_run else ''
+        self.stdout.write(f"{prefix}Polos adicionados: {self.stats['added']}")
+        self.stdout.write(f"{prefix}Polos renomeados: {self.stats['renamed']}")
+        self.stdout.write(f"{prefix}Polos com DRP alterada: {self.stats['moved']}")
+        self.stdout.write(f"{prefix}Polos sem alteração: {self.stats['unchanged']}")
+        self.stdout.write(f"{prefix}Polos removidos: {self.stats['removed']}")
+        if self.stats['kept']:
+            self.stdout.write(self.style.WARNING(
+                f"{prefix}Polos ausentes do HTML mantidos no banco: {self.stats['kept']}"
+            ))
+        self.stdout.write(self.style.SUCCESS(f'{prefix}Importação finalizada em {elapsed:.2f}s.'))
+
+    def get_drp(self, drp_str):
+        try:
+            numero = int(drp_str.upper().replace('DRP', ''))
+        except ValueError:
+            return None
+        if numero not in self.drps_by_numero:
+            drp = DRP(numero=numero)
+            drp.save()
+            self.drps_by_numero[numero] = drp
+        return self.drps_by_numero[numero]
+
+    def upsert_batch(self, batch):
+        to_create, to_update = [], []
+        for nome, drp_str in batch:
+            # Ignora cabeçalhos inválidos
+            if nome.upper() == 'POLO' or drp_str.upper() == 'DRP':
+                continue
+            drp = self.get_drp(drp_str)
+            if drp is None:
+                self.stdout.write(self.style.WARNING(f'DRP inválido para o polo {nome}: {drp_str}'))
+                continue
+            key = polo_key(nome)
+            if (drp.pk, key) in self.seen:
+                continue
+            self.seen.add((drp.pk, key))
+
+            polo = self.match_polo(key, nome, drp)
+            if polo is None:
+                polo = Polo(nome=nome, nome_normalizado=normalize_text(nome), drp=drp)
+                to_create.append(polo)
+                self.polos_by_key[key][drp.pk] = polo
+                self.stats['added'] += 1
+                self.log(f'Novo polo: {nome} ({drp})')
+                continue
+
+            changed = False
+            if polo.nome != nome:
+                self.log(f'Polo renomeado: {polo.nome} -> {nome}')
+                polo.nome = nome
+                polo.nome_normalizado = normalize_text(nome)
+                self.stats['renamed'] += 1
+                changed = True
+            if polo.drp_id != drp.pk:
+                self.log(f'Polo {nome} mudou de DRP: {polo.drp_id} -> {drp}')
+                del self.polos_by_key[key][polo.drp_id]
+                self.polos_by_key[key][drp.pk] = polo
+                polo.drp = drp
+                self.stats['moved'] += 1
+                changed = True
+            if changed:
+                to_update.append(polo)
+            else:
+                self.stats['unchanged'] += 1
+
+        # Atualiza antes de criar: um polo que saiu da DRP libera o (drp, nome) para um novo do lote
+        Polo.objects.bulk_update(to_update, ['nome', 'nome_normalizado', 'drp'])
+        Polo.objects.bulk_create(to_create)
+
+    def match_polo(self, key, nome, drp):
+        """
+        Polo existente para a linha do HTML: o da mesma DRP ou, se nao houver, o unico polo com
+        essa chave em outra DRP que ainda nao apareceu no HTML (mudanca de DRP).
+        """
+        by_drp = self.polos_by_key.get(key, {})
+        polo = by_drp.get(drp.pk)
+        if polo is not None:
+            # Entre duplicatas, fica a que ja tem o nome exato, para o rename nao violar (drp, nome)
+            duplicates = self.duplicates[(drp.pk, key)]
+            exact = next((dup for dup in duplicates if dup.nome == nome), None)
+            if polo.nome != nome and exact is not None:
+                duplicates.remove(exact)
+                duplicates.append(polo)
+                by_drp[drp.pk] = polo = exact
+            return polo
+        movable = [polo for drp_id, polo in by_drp.items() if (drp_id, key) not in self.seen]
+        return movable[0] if len(movable) == 1 else None
+
+    def handle_removed(self, prune):
+        removed = [
+            polo for key, by_drp in self.polos_by_key.items() for drp_id, polo in by_drp.items()
+            if (drp_id, key) not in self.seen
+        ]
+        for polo in removed:
+            self.log(f'Polo ausente do HTML: {polo.nome}')
+        if not prune:
+            self.stats['kept'] = len(removed)
+            return
+
+        # Polos referenciados por perfis ou grupos sao protegidos (on_delete=PROTECT)
+        deletable = Polo.objects.filter(pk__in=[polo.pk for polo in removed]).exclude(
+            Exists(UserProfile.objects.filter(polo=OuterRef('pk')))
+        ).exclude(
+            Exists(ProjectGroup.objects.filter(polo=OuterRef('pk')))
+        )
+        self.stats['removed'], _ = deletable.delete()
+        self.stats['kept'] = len(removed) - self.stats['removed']
+
+    def report_duplicates(self):
+        """Avisa sobre polos com o mesmo nome normalizado na mesma DRP, que precisam de revisão manual."""
+        duplicates = [polo for polos in self.duplicates.values() for polo in polos]
+        if not duplicates:
+            return
+        self.stdout.write(self.style.WARNING(
+            f'Polos duplicados na mesma DRP (não atualizados nem removidos): {len(duplicates)}'
+        ))
+        for polo in duplicates:
+            self.stdout.write(f'  {polo.nome} (DRP {polo.drp_id})')
+
+    def check_site(self, site_file):
+        """Confere a página oficial de polos: nomes que lá aparecem mas não estão na lista de DRPs."""
+        site_file = os.path.abspath(site_file)
+        if not os.path.exists(site_file):
+            return
+        seen_keys = {key for _, key in self.seen}
+        missing = [nome for nome in stream_parse(SitePolosParser(), site_file) if polo_key(nome) not in seen_keys]
+        if missing:
+            self.stdout.write(self.style.WARNING(
+                f'Polos da página da UNIVESP sem DRP correspondente (não importados): {len(missing)}'
+            ))
+            for nome in missing:
+                self.log(f'  {nome}')
+
+    def log(self, message):
+        if self.verbosity >= 2:
+            self.stdout.write(message)
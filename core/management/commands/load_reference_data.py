@@ -0,0 +1,244 @@
+import csv
+import json
+import os
+import time
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from core.cache import bump_reference_version
+from core.models import Curso, Eixo, ProjetoIntegrador, Tags
+from core.utils import normalize_text
+
+# Tamanho dos pedacos lidos ao percorrer um array JSON
+CHUNK_SIZE = 64 * 1024
+
+FORMATS = ('json', 'csv', 'ndjson')
+
+
+def iter_json_array(f):
+    """
+    Percorre um arquivo com um array JSON de objetos sem carrega-lo inteiro na memoria:
+    le pedacos e decodifica um objeto por vez com raw_decode.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    eof = False
+    while True:
+        buffer = buffer.lstrip()
+        if not started:
+            if not buffer and not eof:
+                chunk = f.read(CHUNK_SIZE)
+                eof = not chunk
+                buffer += chunk
+                continue
+            if not buffer.startswith('['):
+                raise CommandError('O arquivo JSON deve conter um array de objetos.')
+            buffer = buffer[1:]
+            started = True
+            continue
+        if buffer.startswith(','):
+            buffer = buffer[1:]
+            continue
+        if buffer.startswith(']'):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise CommandError('JSON inválido ou incompleto.')
+            chunk = f.read(CHUNK_SIZE)
+            eof = not chunk
+            buffer += chunk
+            continue
+        if end == len(buffer) and not eof:
+            # O objeto pode ter sido cortado no fim do pedaco (ex.: um numero); le mais antes de aceitar
+            chunk = f.read(CHUNK_SIZE)
+            if chunk:
+                buffer += chunk
+                continue
+            eof = True
+        yield item
+        buffer = buffer[end:]
+
+
+def iter_rows(f, file_format):
+    if file_format == 'json':
+        yield from iter_json_array(f)
+    elif file_format == 'ndjson':
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                raise CommandError(f'Linha {line_number} não é um JSON válido.')
+    else:
+        yield from csv.DictReader(f)
+
+
+class Command(BaseCommand):
+    help = "Carrega eixos, cursos, PIs ou tags em lote a partir de um arquivo JSON, CSV ou NDJSON"
+
+    def add_arguments(self, parser):
+        parser.add_argument('model', choices=('eixo', 'curso', 'pi', 'tag'), help='Tipo de dado a carregar')
+        parser.add_argument('file', type=str, help='Caminho do arquivo de dados')
+        parser.add_argument(
+            '--format',
+            choices=FORMATS,
+            help='Formato do arquivo (padrão: deduzido da extensão)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Quantidade de linhas gravadas por lote (padrão: 500)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Valida e mostra o que seria carregado sem gravar nada no banco.',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        file_path = os.path.abspath(options['file'])
+        if not os.path.exists(file_path):
+            raise CommandError(f"Arquivo não encontrado: {file_path}")
+        file_format = options['format'] or os.path.splitext(file_path)[1].lstrip('.').lower()
+        if file_format == 'jsonl':
+            file_format = 'ndjson'
+        if file_format not in FORMATS:
+            raise CommandError('Não foi possível deduzir o formato do arquivo; use --format.')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size deve ser maior que zero.')
+
+        self.batch_size = options['batch_size']
+        self.stats = {'read': 0, 'created': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0}
+        loader = getattr(self, f"load_{options['model']}")
+        self.prepare(options['model'])
+
+        with transaction.atomic():
+            with open(file_path, 'r', encoding='utf-8', newline='') as f:
+                batch = []
+                for row in iter_rows(f, file_format):
+                    self.stats['read'] += 1
+                    instance = self.build(options['model'], row)
+                    if instance is not None:
+                        batch.append(instance)
+                    if len(batch) >= self.batch_size:
+                        loader(batch)
+                        batch = []
+                if batch:
+                    loader(batch)
+
+            if options['dry_run']:
+                transaction.set_rollback(True)
+            elif self.stats['created'] or self.stats['updated']:
+                # bulk_create nao dispara signals: invalidamos o cache de referencia manualmente
+                transaction.on_commit(bump_reference_version)
+
+        elapsed = time.perf_counter() - started
+        prefix = '[dry-run] ' if options['dry_run'] else ''
+        self.stdout.write(f"{prefix}Linhas lidas: {self.stats['read']}")
+        self.stdout.write(f"{prefix}Criados: {self.stats['created']}")
+        self.stdout.write(f"{prefix}Atualizados: {self.stats['updated']}")
+        self.stdout.write(f"{prefix}Sem alteração: {self.stats['unchanged']}")
+        if self.stats['skipped']:
+            self.stdout.write(self.style.WARNING(f"{prefix}Linhas ignoradas: {self.stats['skipped']}"))
+        self.stdout.write(self.style.SUCCESS(f'{prefix}Carga finalizada em {elapsed:.2f}s.'))
+
+    def prepare(self, model):
+        """Pre-carrega, com uma consulta por tabela, as chaves existentes e o mapa de eixos."""
+        if model == 'eixo':
+            self.existing = set(Eixo.objects.values_list('nome', flat=True))
+        elif model == 'pi':
+            self.existing = set(ProjetoIntegrador.objects.values_list('numero', flat=True))
+        elif model == 'tag':
+            self.existing = set(Tags.objects.values_list('name', flat=True))
+        else:
+            self.existing = dict(Curso.objects.values_list('nome', 'eixo_id'))
+            self.eixos = {}
+            for pk, nome in Eixo.objects.values_list('pk', 'nome'):
+                self.eixos[str(pk)] = pk
+                self.eixos[normalize_text(nome)] = pk
+        self.seen = set()
+
+    def build(self, model, row):
+        """Monta (sem gravar) a instancia da linha; linhas invalidas ou repetidas sao ignoradas."""
+        try:
+            if model == 'eixo':
+                instance = Eixo(nome=self.clean(Eixo, 'nome', row.get('nome')))
+                key = instance.nome
+            elif model == 'pi':
+                instance = ProjetoIntegrador(numero=self.clean(ProjetoIntegrador, 'numero', row.get('numero')))
+                key = instance.numero
+            elif model == 'tag':
+                name = self.clean(Tags, 'name', row.get('name') or row.get('nome'))
+                # bulk_create nao chama save(), entao preenchemos o nome normalizado aqui
+                instance = Tags(name=name, normalized_name=normalize_text(name))
+                key = instance.name
+            else:
+                nome = self.clean(Curso, 'nome', row.get('nome'))
+                eixo_id = self.eixos.get(normalize_text(str(row.get('eixo') or '')))
+                if eixo_id is None:
+                    raise ValidationError(f"eixo '{row.get('eixo')}' não encontrado")
+                instance = Curso(nome=nome, eixo_id=eixo_id)
+                key = instance.nome
+        except (ValidationError, AttributeError) as e:
+            self.stats['skipped'] += 1
+            messages = e.messages if isinstance(e, ValidationError) else ['linha mal formada']
+            self.stdout.write(self.style.WARNING(f"Linha {self.stats['read']} ignorada: {'; '.join(messages)}"))
+            return None
+
+        if key in self.seen:
+            self.stats['skipped'] += 1
+            return None
+        self.seen.add(key)
+        return instance
+
+    def clean(self, model, field_name, value):
+        field = model._meta.get_field(field_name)
+        if isinstance(value, str):
+            value = value.strip()
+        if value in (None, ''):
+            raise ValidationError(f"campo '{field_name}' é obrigatório")
+        # Executa os validadores do campo (ex.: PI entre 1 e 6), ja que bulk_create nao valida
+        return field.clean(value, None)
+
+    def load_simple(self, model, batch, key_field):
+        new = [instance for instance in batch if getattr(instance, key_field) not in self.existing]
+        self.stats['unchanged'] += len(batch) - len(new)
+        # ignore_conflicts garante a idempotencia mesmo se outra carga inserir as mesmas linhas
+        model.objects.bulk_create(new, ignore_conflicts=True)
+        self.stats['created'] += len(new)
+
+    def load_eixo(self, batch):
+        self.load_simple(Eixo, batch, 'nome')
+
+    def load_pi(self, batch):
+        self.load_simple(ProjetoIntegrador, batch, 'numero')
+
+    def load_tag(self, batch):
+        self.load_simple(Tags, batch, 'name')
+
+    def load_curso(self, batch):
+        changed = []
+        for curso in batch:
+            current_eixo = self.existing.get(curso.nome)
+            if current_eixo is None:
+                self.stats['created'] += 1
+                changed.append(curso)
+            elif current_eixo != curso.eixo_id:
+                self.stats['updated'] += 1
+                changed.append(curso)
+            else:
+                self.stats['unchanged'] += 1
+        # Upsert: cursos ja existentes tem o eixo atualizado em vez de gerar erro de unicidade
+        Curso.objects.bulk_create(
+            changed,
+            update_conflicts=True,
+            unique_fields=['nome'],
+            update_fields=['eixo'],
+        )
@@ -0,0 +1,111 @@
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+from core.models import JoinRequest, Membership, ProjectGroup
+
+
+class Command(BaseCommand):
+    help = (
+        "Remove pedidos de entrada pendentes que nao podem mais ser aprovados e pedidos "
+        "ja processados antigos, em lotes pequenos"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pending-days',
+            type=int,
+            default=90,
+            help='Pedidos pendentes mais antigos que isso são expirados e removidos (padrão: 90)',
+        )
+        parser.add_argument(
+            '--processed-days',
+            type=int,
+            default=30,
+            help='Pedidos aprovados/rejeitados mais antigos que isso são removidos (padrão: 30)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Quantidade de pedidos tratados por transação (padrão: 500)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=0,
+            help='Pausa em segundos entre os lotes, para aliviar o banco (padrão: 0)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas conta o que seria expirado e removido, sem gravar nada.',
+        )
+
+    def handle(self, *args, **options):
+        for option in ('pending_days', 'processed_days', 'batch_size'):
+            if options[option] < 1:
+                raise CommandError(f"--{option.replace('_', '-')} deve ser maior que zero.")
+        self.batch_size = options['batch_size']
+        self.sleep = options['sleep']
+
+        today = timezone.localdate()
+        # Pendentes de quem ja entrou em algum grupo (EXISTS sobre o indice unico de Membership.user)
+        # ou esquecidos ha mais de --pending-days
+        stale = JoinRequest.objects.filter(status=JoinRequest.Status.PENDING).filter(
+            Exists(Membership.objects.filter(user=OuterRef('user_id')))
+            | Q(date_requested__lt=today - timedelta(days=options['pending_days']))
+        )
+        processed = JoinRequest.objects.filter(
+            status__in=[JoinRequest.Status.APPROVED, JoinRequest.Status.REJECTED],
+            date_requested__lt=today - timedelta(days=options['processed_days']),
+        )
+
+        if options['dry_run']:
+            self.stdout.write(f'[dry-run] Pedidos pendentes a expirar: {stale.count()}')
+            self.stdout.write(f'[dry-run] Pedidos processados a remover: {processed.count()}')
+            return
+
+        expired = self.run_in_batches(stale, self.expire_batch)
+        self.stdout.write(f'Pedidos pendentes expirados: {expired}')
+        deleted = self.run_in_batches(processed, self.delete_batch)
+        self.stdout.write(self.style.SUCCESS(f'Pedidos processados removidos: {deleted}'))
+
+    def run_in_batches(self, queryset, handle_batch):
+        """
+        Processa 'queryset' em lotes de --batch-size, cada um em uma transacao curta.
+
+        Os ids sao lidos em ordem de pk: os pedidos antigos tem os menores ids, entao o
+        indice da chave primaria encontra cada lote logo no inicio.
+        """
+        total = 0
+        while True:
+            with transaction.atomic():
+                # skip_locked: pedidos sendo aprovados/rejeitados agora ficam para a proxima execucao
+                rows = list(
+                    queryset.select_for_update(skip_locked=True)
+                    .order_by('pk')
+                    .values_list('pk', 'project_group_id')[:self.batch_size]
+                )
+                if rows:
+                    handle_batch(rows)
+            total += len(rows)
+            if len(rows) < self.batch_size:
+                return total
+            if self.sleep:
+                time.sleep(self.sleep)
+
+    def expire_batch(self, rows):
+        # Removidos, nao rejeitados: o aluno nao deve ver uma rejeicao que nenhum admin fez, e
+        # sem o pedido antigo ele pode pedir de novo (o par usuario/grupo e unico)
+        self.delete_batch(rows)
+        for group_pk, count in Counter(group_pk for _, group_pk in rows).items():
+            ProjectGroup.objects.filter(pk=group_pk).adjust_counters(pending_requests=-count)
+
+    def delete_batch(self, rows):
+        # JoinRequest nao tem dependentes nem signals: o Django apaga com um unico DELETE
+        JoinRequest.objects.filter(pk__in=[pk for pk, _ in rows]).delete()
@@ -0,0 +1,50 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+from core.models import ProjectGroup
+
+
+class Command(BaseCommand):
+    help = "Recalcula member_count e pending_request_count dos grupos que divergem das tabelas de origem"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Quantidade de grupos corrigidos por UPDATE (padrão: 500)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Apenas lista os grupos com contadores divergentes, sem corrigir.',
+        )
+
+    def handle(self, *args, **options):
+        # Uma unica consulta encontra os grupos divergentes; os demais nem sao carregados
+        drifted = list(
+            ProjectGroup.objects.with_actual_counters()
+            .filter(
+                ~Q(member_count=F('actual_member_count'))
+                | ~Q(pending_request_count=F('actual_pending_request_count'))
+            )
+            .only('id', 'name', 'member_count', 'pending_request_count')
+            .order_by('pk')
+        )
+
+        if options['verbosity'] >= 2:
+            for group in drifted:
+                self.stdout.write(
+                    f'{group.name}: membros {group.member_count} -> {group.actual_member_count}, '
+                    f'pedidos pendentes {group.pending_request_count} -> {group.actual_pending_request_count}'
+                )
+
+        prefix = '[dry-run] ' if options['dry_run'] else ''
+        if not options['dry_run']:
+            ids = [group.pk for group in drifted]
+            batch_size = options['batch_size']
+            with transaction.atomic():
+                for start in range(0, len(ids), batch_size):
+                    # Recontagem feita pelo proprio UPDATE, para nao sobrescrever incrementos concorrentes
+                    ProjectGroup.objects.filter(pk__in=ids[start:start + batch_size]).reconcile_counters()
+        self.stdout.write(self.style.SUCCESS(f'{prefix}Grupos com contadores corrigidos: {len(drifted)}'))
@@ -0,0 +1,66 @@
+from collections import Counter, defaultdict
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+from core.models import MAX_TAGS, ProjectGroupTags, UserTags
+from core.signals import adjust_tag_usage, touch_profiles
+from core.tags import delete_tag_links
+
+
+class Command(BaseCommand):
+    help = (
+        f"Lista os perfis e grupos com mais de {MAX_TAGS} tags e, com --delete, remove os vinculos "
+        "mais novos alem do limite. Passo previo a migracao 0014_tag_links_position."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--delete',
+            action='store_true',
+            help=f'Remove os vinculos alem dos {MAX_TAGS} mais antigos de cada dono (sem isso, apenas lista).',
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for label, model, owner_field in (('Perfil', UserTags, 'profile'), ('Grupo', ProjectGroupTags, 'project_group')):
+            excess = self.excess_links(model, f'{owner_field}_id')
+            for owner, links in excess.items():
+                self.stdout.write(f'{label} {owner}: {len(links)} tag(s) além do limite: {sorted(links.values())}')
+            if excess and options['delete']:
+                self.delete_links(model, excess)
+            total += sum(len(links) for links in excess.values())
+
+        if options['delete']:
+            self.stdout.write(self.style.SUCCESS(f'Vínculos removidos: {total}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'[dry-run] Vínculos além do limite: {total} (use --delete para remover)'))
+
+    def excess_links(self, model, owner_id):
+        """
+        Retorna {dono: {pk do vinculo: id da tag}} com os vinculos alem dos MAX_TAGS mais antigos.
+
+        Le apenas pk, dono e tag: roda tambem antes da migracao que cria a coluna 'position'.
+        """
+        owners = (
+            model.objects.values(owner_id).annotate(total=Count('pk')).filter(total__gt=MAX_TAGS)
+            .values_list(owner_id, flat=True)
+        )
+        links = defaultdict(dict)
+        for pk, owner, tag_id in (
+            model.objects.filter(**{f'{owner_id}__in': owners}).order_by(owner_id, 'pk')
+            .values_list('pk', owner_id, 'tag_id')
+        ):
+            links[owner][pk] = tag_id
+        return {owner: dict(list(owner_links.items())[MAX_TAGS:]) for owner, owner_links in links.items()}
+
+    @transaction.atomic
+    def delete_links(self, model, excess):
+        pks = [pk for links in excess.values() for pk in links]
+        # DELETE direto: o post_delete por linha carregaria a coluna 'position', que ainda nao existe
+        delete_tag_links(model, pks, model.objects.db)
+        removed = Counter(tag_id for links in excess.values() for tag_id in links.values())
+        for count in set(removed.values()):
+            adjust_tag_usage([tag_id for tag_id, n in removed.items() if n == count], -count)
+        if model is UserTags:
+            touch_profiles(pk__in=list(excess))
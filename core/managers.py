@@ -1,6 +1,16 @@
+import re
+
 from django.contrib.auth.base_user import BaseUserManager
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connections, models
+from django.db.models import Case, Count, Exists, F, FloatField, IntegerField, OuterRef, Prefetch, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.expressions import RawSQL
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .utils import normalize_text
+
 
 class CustomUserManager(BaseUserManager):
 
@@ -25,3 +35,190 @@ class CustomUserManager(BaseUserManager):
         return self.create_user(email, password, **extra_fields)
 
 
+
+class PoloQuerySet(models.QuerySet):
+
+    def search(self, term):
+        """
+        Busca por nome ignorando acentos e caixa, usando a coluna 'nome_normalizado'.
+
+        Os polos cujo nome comeca com o termo vem primeiro. O prefixo e testado como
+        um intervalo (>= termo e < termo + maior caractere), o que aproveita o indice
+        b-tree tanto no Postgres quanto no SQLite; a busca por substring usa o indice
+        trigram no Postgres (ver migracao 0005).
+        """
+        term = normalize_text(term)
+        if not term:
+            return self
+        is_prefix = Q(nome_normalizado__gte=term, nome_normalizado__lt=term + '\uffff')
+        return self.filter(nome_normalizado__contains=term).annotate(
+            match_rank=Case(When(is_prefix, then=Value(0)), default=Value(1), output_field=IntegerField())
+        ).order_by('match_rank', 'nome_normalizado')
+
+
+class TagsQuerySet(models.QuerySet):
+
+    def autocomplete(self, term):
+        """
+        Tags cujo nome comeca com 'term' (sem acentos/caixa), das mais usadas para as menos usadas.
+
+        A contagem de uso vem da coluna desnormalizada 'usage_count', entao nao ha COUNT
+        sobre UserTags/ProjectGroupTags no momento da consulta.
+        """
+        term = normalize_text(term)
+        queryset = self
+        if term:
+            queryset = queryset.filter(normalized_name__gte=term, normalized_name__lt=term + '\uffff')
+        return queryset.order_by('-usage_count', 'normalized_name')
+
+
+# FKs de ProjectGroup exibidas pelo serializer (como texto)
+PROJECT_GROUP_RELATED_FIELDS = ('creator', 'projeto_integrador', 'drp', 'polo', 'eixo', 'curso')
+
+
+class ProjectGroupQuerySet(models.QuerySet):
+
+    def with_related(self, fields=None):
+        """
+        Carrega tudo o que o ProjectGroupSerializer le: as FKs exibidas como texto em um unico JOIN
+        e as tags/membros (com o email do usuario) em duas consultas extras, qualquer que seja
+        o numero de grupos ou de membros.
+
+        'fields' limita a carga aos campos que serao exibidos (ver DynamicFieldsMixin): relacoes
+        nao pedidas nao entram no JOIN nem geram prefetch.
+        """
+        if fields is None:
+            fields = {*PROJECT_GROUP_RELATED_FIELDS, 'tags', 'memberships', 'description'}
+        queryset = self
+        related = [field for field in PROJECT_GROUP_RELATED_FIELDS if field in fields]
+        if related:
+            # select_related() sem argumentos seguiria todas as FKs
+            queryset = queryset.select_related(*related)
+        if 'tags' in fields:
+            queryset = queryset.prefetch_related('tags')
+        if 'memberships' in fields:
+            Membership = self.model._meta.get_field('memberships').related_model
+            queryset = queryset.prefetch_related(
+                Prefetch('memberships', queryset=Membership.objects.select_related('user'))
+            )
+        # search_vector so e usado pela busca no banco; a descricao pode ser longa
+        deferred = ['search_vector']
+        if 'description' not in fields:
+            deferred.append('description')
+        return queryset.defer(*deferred)
+
+    def adjust_counters(self, members=0, pending_requests=0):
+        """
+        Soma os deltas aos contadores member_count/pending_request_count com um UPDATE atomico
+        (F()), sem ler os grupos antes e sem deixar os contadores ficarem negativos.
+        Entrada ou saida de membros tambem conta como atividade do grupo.
+        """
+        updates = {}
+        if members:
+            updates['member_count'] = Greatest(F('member_count') + members, 0)
+            updates['last_activity_at'] = timezone.now()
+        if pending_requests:
+            updates['pending_request_count'] = Greatest(F('pending_request_count') + pending_requests, 0)
+        if not updates:
+            return 0
+        return self.update(**updates)
+
+    def _actual_counters(self):
+        Membership = self.model._meta.get_field('memberships').related_model
+        JoinRequest = self.model._meta.get_field('join_requests').related_model
+
+        def count_of(queryset):
+            return Coalesce(Subquery(
+                queryset.filter(project_group=OuterRef('pk')).order_by()
+                .values('project_group').annotate(total=Count('pk')).values('total')
+            ), 0)
+
+        return {
+            'member_count': count_of(Membership.objects.all()),
+            'pending_request_count': count_of(JoinRequest.objects.filter(status=JoinRequest.Status.PENDING)),
+        }
+
+    def with_actual_counters(self):
+        """Anota 'actual_member_count' e 'actual_pending_request_count' contados nas tabelas de origem."""
+        return self.annotate(**{f'actual_{field}': expression for field, expression in self._actual_counters().items()})
+
+    def reconcile_counters(self):
+        """Regrava os contadores a partir das tabelas de origem em um unico UPDATE."""
+        return self.update(**self._actual_counters())
+
+    def search(self, term):
+        """
+        Busca textual em nome e descricao, anotando 'search_rank' (maior = mais relevante).
+
+        O indice e mantido pelo banco na escrita (ver migracao 0009): no Postgres a coluna
+        search_vector (tsvector com indice GIN) e no SQLite a tabela FTS5 core_projectgroup_fts.
+        Cada palavra do termo e buscada como prefixo e todas precisam aparecer.
+        """
+        words = re.findall(r'\w+', term)
+        if not words:
+            return self.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+
+        vendor = connections[self.db].vendor
+        if vendor == 'postgresql':
+            query = SearchQuery(' & '.join(f'{word}:*' for word in words), config='portuguese', search_type='raw')
+            return self.filter(search_vector=query).annotate(search_rank=SearchRank(F('search_vector'), query))
+
+        if vendor == 'sqlite':
+            table = self.model._meta.db_table
+            fts_table = f'{table}_fts'
+            match = ' '.join(f'"{word}"*' for word in words)
+            # bm25 retorna valores menores para os mais relevantes, por isso o sinal invertido
+            return self.filter(
+                pk__in=RawSQL(f'SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH %s', (match,))
+            ).annotate(search_rank=RawSQL(
+                f'SELECT -bm25({fts_table}) FROM {fts_table} WHERE {fts_table} MATCH %s AND rowid = {table}.id',
+                (match,),
+                output_field=FloatField(),
+            ))
+
+        # Outros bancos nao tem indice textual: apenas filtra, sem relevancia
+        condition = Q()
+        for word in words:
+            condition &= Q(name__icontains=word) | Q(description__icontains=word)
+        return self.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+
+class UserProfileQuerySet(models.QuerySet):
+
+    def with_related(self, fields=None):
+        """
+        Carrega o perfil e tudo o que o UserProfileDetailSerializer exibe em duas consultas:
+        usuario, polo/DRP, curso/eixo e PI em um JOIN e as tags em um prefetch.
+        'fields' limita a carga aos campos pedidos (ver DynamicFieldsMixin).
+        """
+        if fields is None:
+            fields = {'user', 'polo', 'drp', 'curso', 'eixo', 'projeto_integrador', 'tags'}
+        related = []
+        if 'user' in fields:
+            related.append('user')
+        if 'drp' in fields:
+            related.append('polo__drp')
+        elif 'polo' in fields:
+            related.append('polo')
+        if 'eixo' in fields:
+            related.append('curso__eixo')
+        elif 'curso' in fields:
+            related.append('curso')
+        if 'projeto_integrador' in fields:
+            related.append('projeto_integrador')
+
+        queryset = self.select_related(*related) if related else self
+        if 'tags' in fields:
+            queryset = queryset.prefetch_related('tags')
+        return queryset
+
+    def without_group(self):
+        """
+        Perfis cujo usuario nao e membro de nenhum grupo.
+
+        Usa NOT EXISTS (anti-join) sobre o indice unico de Membership.user, em vez de
+        consultar o vinculo perfil a perfil.
+        """
+        user_model = self.model._meta.get_field('user').related_model
+        Membership = user_model._meta.get_field('membership').related_model
+        return self.filter(~Exists(Membership.objects.filter(user=OuterRef('user_id'))))
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:27
+
+from django.db import migrations, models
+
+from core.utils import normalize_text
+
+
+def preencher_nome_normalizado(apps, schema_editor):
+    Polo = apps.get_model('core', 'Polo')
+    polos = list(Polo.objects.only('id', 'nome'))
+    for polo in polos:
+        polo.nome_normalizado = normalize_text(polo.nome)
+    Polo.objects.bulk_update(polos, ['nome_normalizado'], batch_size=500)
+
+
+def criar_indice_trigram(apps, schema_editor):
+    # No Postgres um indice GIN trigram acelera a busca por substring (LIKE '%termo%').
+    # No SQLite (modo local) ficamos apenas com o indice b-tree, suficiente para o prefixo.
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    schema_editor.execute(
+        'CREATE INDEX IF NOT EXISTS core_polo_nome_norm_trgm '
+        'ON core_polo USING gin (nome_normalizado gin_trgm_ops)'
+    )
+
+
+def remover_indice_trigram(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS core_polo_nome_norm_trgm')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_customuser_is_email_verified_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='polo',
+            name='nome_normalizado',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(preencher_nome_normalizado, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='polo',
+            index=models.Index(fields=['nome_normalizado'], name='core_polo_nome_norm_idx'),
+        ),
+        migrations.RunPython(criar_indice_trigram, remover_indice_trigram),
+    ]
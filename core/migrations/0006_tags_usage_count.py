@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:28
+
+from django.db import migrations, models
+from django.db.models import Count
+
+from core.utils import normalize_text
+
+
+def preencher_tags(apps, schema_editor):
+    # Calcula uma unica vez os contadores que passam a ser mantidos incrementalmente
+    Tags = apps.get_model('core', 'Tags')
+    tags = list(Tags.objects.annotate(
+        usos_perfis=Count('usertags', distinct=True),
+        usos_grupos=Count('projectgrouptags', distinct=True),
+    ))
+    for tag in tags:
+        tag.normalized_name = normalize_text(tag.name)
+        tag.usage_count = tag.usos_perfis + tag.usos_grupos
+    Tags.objects.bulk_update(tags, ['normalized_name', 'usage_count'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_polo_nome_normalizado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tags',
+            name='normalized_name',
+            field=models.CharField(default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='tags',
+            name='usage_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Usos'),
+        ),
+        migrations.RunPython(preencher_tags, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='tags',
+            index=models.Index(fields=['normalized_name'], name='core_tags_norm_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tags',
+            index=models.Index(fields=['-usage_count'], name='core_tags_usage_count_idx'),
+        ),
+    ]
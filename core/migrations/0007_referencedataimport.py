@@ -0,0 +1,26 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_tags_usage_count'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReferenceDataImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=100, unique=True, verbose_name='Origem')),
+                ('content_hash', models.CharField(max_length=64, verbose_name='Hash do conteudo')),
+                ('imported_at', models.DateTimeField(auto_now=True, verbose_name='Importado em')),
+            ],
+            options={
+                'verbose_name': 'Importacao de dados de referencia',
+                'verbose_name_plural': 'Importacoes de dados de referencia',
+            },
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_referencedataimport'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='projectgroup',
+            index=models.Index(fields=['projeto_integrador', 'drp', 'polo'], name='core_group_pi_drp_polo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectgroup',
+            index=models.Index(fields=['projeto_integrador', 'eixo', 'curso'], name='core_group_pi_eixo_curso_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectgroup',
+            index=models.Index(fields=['moderated', 'projeto_integrador'], name='core_group_moderated_pi_idx'),
+        ),
+    ]
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:38
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+from core.search import install_sqlite_fts, uninstall_sqlite_fts
+
+# O indice textual e mantido pelo proprio banco a cada INSERT/UPDATE/DELETE de grupo,
+# entao a busca nunca precisa calcular nada sobre as descricoes no momento da consulta.
+
+POSTGRES_FORWARD = [
+    """
+    CREATE OR REPLACE FUNCTION core_projectgroup_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('portuguese', coalesce(NEW.name, '')), 'A') ||
+            setweight(to_tsvector('portuguese', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    """
+    CREATE TRIGGER core_projectgroup_search_vector_trg
+    BEFORE INSERT OR UPDATE OF name, description ON core_projectgroup
+    FOR EACH ROW EXECUTE FUNCTION core_projectgroup_search_vector_update()
+    """,
+    # Preenche os grupos existentes (o UPDATE dispara o trigger)
+    'UPDATE core_projectgroup SET name = name',
+    'CREATE INDEX IF NOT EXISTS core_group_search_vector_gin ON core_projectgroup USING gin (search_vector)',
+]
+
+POSTGRES_BACKWARD = [
+    'DROP INDEX IF EXISTS core_group_search_vector_gin',
+    'DROP TRIGGER IF EXISTS core_projectgroup_search_vector_trg ON core_projectgroup',
+    'DROP FUNCTION IF EXISTS core_projectgroup_search_vector_update()',
+]
+
+
+def _run(schema_editor, statements):
+    for statement in statements:
+        schema_editor.execute(statement)
+
+
+def criar_indice_textual(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FORWARD)
+    elif vendor == 'sqlite':
+        # No SQLite (modo local) usamos uma tabela FTS5 sincronizada por triggers
+        install_sqlite_fts(schema_editor.connection)
+
+
+def remover_indice_textual(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_BACKWARD)
+    elif vendor == 'sqlite':
+        uninstall_sqlite_fts(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0008_projectgroup_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectgroup',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(criar_indice_textual, remover_indice_textual),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.6 on 2026-10-18 15:44
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def preencher_contadores(apps, schema_editor):
+    # Calcula os contadores uma unica vez; dai em diante as views os mantem com F()
+    ProjectGroup = apps.get_model('core', 'ProjectGroup')
+    Membership = apps.get_model('core', 'Membership')
+    JoinRequest = apps.get_model('core', 'JoinRequest')
+
+    def count_of(queryset):
+        return Coalesce(Subquery(
+            queryset.filter(project_group=OuterRef('pk')).order_by()
+            .values('project_group').annotate(total=Count('pk')).values('total')
+        ), 0)
+
+    ProjectGroup.objects.update(
+        member_count=count_of(Membership.objects.all()),
+        pending_request_count=count_of(JoinRequest.objects.filter(status='PENDING')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_projectgroup_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectgroup',
+            name='member_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Membros'),
+        ),
+        migrations.AddField(
+            model_name='projectgroup',
+            name='pending_request_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Pedidos pendentes'),
+        ),
+        migrations.RunPython(preencher_contadores, migrations.RunPython.noop),
+    ]
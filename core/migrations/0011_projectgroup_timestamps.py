@@ -0,0 +1,33 @@
+# Generated by Django 5.2.6 on 2026-10-18 16:02
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0010_projectgroup_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='projectgroup',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, verbose_name='Criado em'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='projectgroup',
+            name='last_activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False, verbose_name='Última atividade'),
+        ),
+        migrations.AddIndex(
+            model_name='projectgroup',
+            index=models.Index(fields=['created_at', 'id'], name='core_group_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectgroup',
+            index=models.Index(fields=['last_activity_at', 'id'], name='core_group_activity_idx'),
+        ),
+    ]
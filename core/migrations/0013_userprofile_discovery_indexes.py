@@ -0,0 +1,25 @@
+# Generated by Django 5.2.6 on 2026-10-18 18:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0012_userprofile_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['projeto_integrador', 'polo'], name='core_profile_pi_polo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['projeto_integrador', 'curso'], name='core_profile_pi_curso_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['updated_at', 'id'], name='core_profile_updated_idx'),
+        ),
+    ]
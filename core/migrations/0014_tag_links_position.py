@@ -0,0 +1,88 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:05
+
+from django.db import migrations, models
+from django.db.models import Count
+
+MAX_TAGS = 5
+
+BATCH_SIZE = 1000
+
+# Quantos donos com excesso aparecem na mensagem de erro
+REPORTED_OWNERS = 20
+
+
+def owners_over_limit(apps, model_name, owner_field):
+    Link = apps.get_model('core', model_name)
+    owner_id = f'{owner_field}_id'
+    return list(
+        Link.objects.values(owner_id).annotate(total=Count('pk')).filter(total__gt=MAX_TAGS)
+        .order_by(owner_id).values_list(owner_id, 'total')
+    )
+
+
+def check_tag_limit(apps):
+    """
+    Falha (sem alterar nada) se algum perfil ou grupo tiver mais de MAX_TAGS tags.
+
+    Esses vinculos existem porque o serializer antigo nao limitava as tags do perfil. Nao
+    escolhemos aqui quais descartar: o excesso e revisado e removido antes, de forma
+    explicita, com o comando trim_excess_tags.
+    """
+    problems = []
+    for label, model_name, owner_field in (('perfis', 'UserTags', 'profile'), ('grupos', 'ProjectGroupTags', 'project_group')):
+        owners = owners_over_limit(apps, model_name, owner_field)
+        if owners:
+            listed = ', '.join(f'{owner} ({total} tags)' for owner, total in owners[:REPORTED_OWNERS])
+            more = f' e mais {len(owners) - REPORTED_OWNERS}' if len(owners) > REPORTED_OWNERS else ''
+            problems.append(f'{len(owners)} {label} com mais de {MAX_TAGS} tags: {listed}{more}')
+    if problems:
+        raise RuntimeError(
+            'Nao e possivel numerar as tags: ' + '; '.join(problems) + '. Nada foi alterado. '
+            'Revise com "python manage.py trim_excess_tags" e remova o excesso com '
+            '"python manage.py trim_excess_tags --delete" (ou pelo admin) antes de migrar.'
+        )
+
+
+def backfill_model(apps, model_name, owner_field):
+    """Numera os vinculos de cada dono (1, 2, ...) na ordem de criacao."""
+    Link = apps.get_model('core', model_name)
+    owner_id = f'{owner_field}_id'
+    batch = []
+    previous_owner = None
+    position = 0
+    for pk, owner in Link.objects.order_by(owner_id, 'pk').values_list('pk', owner_id).iterator():
+        position = position + 1 if owner == previous_owner else 1
+        previous_owner = owner
+        batch.append(Link(pk=pk, position=position))
+        if len(batch) >= BATCH_SIZE:
+            Link.objects.bulk_update(batch, ['position'])
+            batch = []
+    if batch:
+        Link.objects.bulk_update(batch, ['position'])
+
+
+def backfill_positions(apps, schema_editor):
+    check_tag_limit(apps)
+    backfill_model(apps, 'UserTags', 'profile')
+    backfill_model(apps, 'ProjectGroupTags', 'project_group')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0013_userprofile_discovery_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usertags',
+            name='position',
+            field=models.PositiveSmallIntegerField(editable=False, null=True, verbose_name='Posição'),
+        ),
+        migrations.AddField(
+            model_name='projectgrouptags',
+            name='position',
+            field=models.PositiveSmallIntegerField(editable=False, null=True, verbose_name='Posição'),
+        ),
+        migrations.RunPython(backfill_positions, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0014_tag_links_position'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usertags',
+            name='position',
+            field=models.PositiveSmallIntegerField(editable=False, verbose_name='Posição'),
+        ),
+        migrations.AlterField(
+            model_name='projectgrouptags',
+            name='position',
+            field=models.PositiveSmallIntegerField(editable=False, verbose_name='Posição'),
+        ),
+        migrations.AddConstraint(
+            model_name='usertags',
+            constraint=models.CheckConstraint(
+                condition=models.Q(('position__gte', 1), ('position__lte', 5)),
+                name='core_usertags_position_range',
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='usertags',
+            constraint=models.UniqueConstraint(
+                fields=('profile', 'position'), name='core_usertags_profile_position_uniq'
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='projectgrouptags',
+            constraint=models.CheckConstraint(
+                condition=models.Q(('position__gte', 1), ('position__lte', 5)),
+                name='core_projectgrouptags_position_range',
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name='projectgrouptags',
+            constraint=models.UniqueConstraint(
+                fields=('project_group', 'position'), name='core_projectgrouptags_group_position_uniq'
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.6 on 2026-10-18 19:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_tag_links_position_constraints'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='joinrequest',
+            index=models.Index(fields=['project_group', 'status', 'date_requested'], name='core_joinreq_group_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='joinrequest',
+            index=models.Index(fields=['user', 'status'], name='core_joinreq_user_status_idx'),
+        ),
+    ]
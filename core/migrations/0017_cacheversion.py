@@ -0,0 +1,24 @@
+# Generated by Django 5.2.6 on 2026-10-18 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0016_joinrequest_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CacheVersion',
+            fields=[
+                ('namespace', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='Namespace')),
+                ('version', models.BigIntegerField(verbose_name='Versao')),
+            ],
+            options={
+                'verbose_name': 'Versao do cache',
+                'verbose_name_plural': 'Versoes do cache',
+            },
+        ),
+    ]
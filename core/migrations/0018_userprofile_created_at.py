@@ -0,0 +1,53 @@
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_created_at(apps, schema_editor):
+    # Perfis existentes herdam a data de cadastro do usuario em vez da data da migracao
+    UserProfile = apps.get_model('core', 'UserProfile')
+    CustomUser = apps.get_model('core', 'CustomUser')
+    UserProfile.objects.update(
+        created_at=Subquery(CustomUser.objects.filter(pk=OuterRef('user_id')).values('date_joined')[:1])
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_cacheversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, default=django.utils.timezone.now, verbose_name='Criado em'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(backfill_created_at, migrations.RunPython.noop),
+        migrations.RemoveIndex(
+            model_name='userprofile',
+            name='core_profile_pi_polo_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userprofile',
+            name='core_profile_pi_curso_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='userprofile',
+            name='core_profile_updated_idx',
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['projeto_integrador', 'polo', 'created_at', 'id'], name='core_profile_pi_polo_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['projeto_integrador', 'curso', 'created_at', 'id'], name='core_profile_pi_curso_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['created_at', 'id'], name='core_profile_created_idx'),
+        ),
+    ]
@@ -6,14 +6,29 @@ from datetime import timedelta
 from django.conf import settings
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.models import AbstractUser
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models
-from .managers import CustomUserManager
+from .managers import CustomUserManager, PoloQuerySet, ProjectGroupQuerySet, TagsQuerySet, UserProfileQuerySet
+from .utils import normalize_text
 from django.utils.translation import gettext_lazy as _
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
 
+# Limite de tags por perfil e por grupo, garantido no banco pela coluna 'position' dos vinculos
+MAX_TAGS = 5
+
+
+def next_tag_position(links, message):
+    """Menor posicao livre (1..MAX_TAGS) entre os vinculos 'links' do mesmo dono."""
+    used = set(links.values_list('position', flat=True))
+    for position in range(1, MAX_TAGS + 1):
+        if position not in used:
+            return position
+    raise ValidationError(message)
+
+
 #Modelo de Autenticacao customizado para usar o email
 class CustomUser(AbstractUser):
 
@@ -67,16 +82,30 @@ class DRP(models.Model):
 
 class Polo(models.Model):
     nome = models.CharField(unique=False, max_length=100)
+    #nome sem acentos e em minusculas, usado pela busca (ver PoloQuerySet.search)
+    nome_normalizado = models.CharField(max_length=100, editable=False, default='')
     drp = models.ForeignKey(DRP, on_delete=models.PROTECT, related_name='polos')
 
+    objects = PoloQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Polo"
         verbose_name_plural = "Polos"
         unique_together = ('drp', 'nome')
+        indexes = [
+            models.Index(fields=['nome_normalizado'], name='core_polo_nome_norm_idx'),
+        ]
 
     def __str__(self):
         return self.nome
 
+    def save(self, *args, **kwargs):
+        self.nome_normalizado = normalize_text(self.nome)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'nome' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'nome_normalizado'}
+        super().save(*args, **kwargs)
+
 class Eixo(models.Model):
     nome = models.CharField(
         unique=True,
@@ -102,14 +131,31 @@ class Curso(models.Model):
 
 class Tags(models.Model):
     name = models.CharField(unique=True, max_length=100)
+    #nome sem acentos e em minusculas, usado pelo autocomplete (ver TagsQuerySet.autocomplete)
+    normalized_name = models.CharField(max_length=100, editable=False, default='')
+    #quantas vezes a tag e usada por perfis e grupos; mantido por core/signals.py
+    usage_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Usos")
+
+    objects = TagsQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Tag"
         verbose_name_plural = "Tags"
+        indexes = [
+            models.Index(fields=['normalized_name'], name='core_tags_norm_name_idx'),
+            models.Index(fields=['-usage_count'], name='core_tags_usage_count_idx'),
+        ]
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        self.normalized_name = normalize_text(self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'name' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'normalized_name'}
+        super().save(*args, **kwargs)
+
 # Project_group
 class ProjectGroup(models.Model):
     name = models.CharField(unique=True, max_length=150, verbose_name="Nome Do Grupo")
@@ -162,9 +208,32 @@ class ProjectGroup(models.Model):
 
     moderated = models.BooleanField(default=True, verbose_name="Moderado")
 
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+    # Atualizado quando membros entram/saem e quando o grupo e editado
+    last_activity_at = models.DateTimeField(default=timezone.now, editable=False, verbose_name="Última atividade")
+
+    # Contadores desnormalizados, atualizados com F() pelas views (ver ProjectGroupQuerySet.adjust_counters)
+    # e corrigidos pelo comando reconcile_group_counters
+    member_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Membros")
+    pending_request_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Pedidos pendentes")
+
+    # Preenchido por trigger no Postgres a cada escrita de name/description (ver migracao 0009)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ProjectGroupQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Grupo de Projeto"
         verbose_name_plural = "Grupos de Projeto"
+        #indices compostos para as combinacoes de filtros mais comuns da lista de grupos
+        indexes = [
+            models.Index(fields=['projeto_integrador', 'drp', 'polo'], name='core_group_pi_drp_polo_idx'),
+            models.Index(fields=['projeto_integrador', 'eixo', 'curso'], name='core_group_pi_eixo_curso_idx'),
+            models.Index(fields=['moderated', 'projeto_integrador'], name='core_group_moderated_pi_idx'),
+            #ordenacoes da paginacao por cursor ("mais novos" e "mais ativos")
+            models.Index(fields=['created_at', 'id'], name='core_group_created_idx'),
+            models.Index(fields=['last_activity_at', 'id'], name='core_group_activity_idx'),
+        ]
 
 
     def __str__(self):
@@ -201,9 +270,21 @@ class UserProfile(models.Model):
         related_name='profiles'
     )
 
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Criado em")
+    # Usado na ETag do perfil; tambem e atualizado quando as tags ou o usuario mudam (ver core/signals.py)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Atualizado em")
+
+    objects = UserProfileQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Profile de Usuario"
         verbose_name_plural = "Profiles de Usuarios"
+        #indices da busca de alunos sem grupo: filtros academicos seguidos da ordem do cursor
+        indexes = [
+            models.Index(fields=['projeto_integrador', 'polo', 'created_at', 'id'], name='core_profile_pi_polo_idx'),
+            models.Index(fields=['projeto_integrador', 'curso', 'created_at', 'id'], name='core_profile_pi_curso_idx'),
+            models.Index(fields=['created_at', 'id'], name='core_profile_created_idx'),
+        ]
 
     def __str__(self):
         return self.user.email
@@ -264,6 +345,11 @@ class JoinRequest(models.Model):
         unique_together = ('user', 'project_group')
         verbose_name = "Pedido de entrada"
         verbose_name_plural = "Pedidos de entrada"
+        #lista de pedidos do grupo (por status, mais recentes primeiro) e pedidos do proprio usuario
+        indexes = [
+            models.Index(fields=['project_group', 'status', 'date_requested'], name='core_joinreq_group_status_idx'),
+            models.Index(fields=['user', 'status'], name='core_joinreq_user_status_idx'),
+        ]
 
     def __str__(self):
         return f"Pedido de {self.user.email} para {self.project_group.name}"
@@ -279,20 +365,31 @@ class UserTags(models.Model):
         on_delete=models.CASCADE,
     )
 
+    # Vaga (1..5) ocupada pela tag; a unicidade por perfil limita o total de tags no proprio banco.
+    # Preenchida por save() ou core.tags.set_tags; add()/set() do M2M sao recusados (core/signals.py)
+    position = models.PositiveSmallIntegerField(editable=False, verbose_name="Posição")
+
     class Meta:
         #somente permite 1 tag unica para cada profile
         unique_together = ('profile', 'tag')
         verbose_name = "Tags do usuario"
         verbose_name_plural = "Tags dos usuarios"
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(position__gte=1, position__lte=MAX_TAGS),
+                name='core_usertags_position_range',
+            ),
+            models.UniqueConstraint(fields=['profile', 'position'], name='core_usertags_profile_position_uniq'),
+        ]
 
     def __str__(self):
         return f"#{self.tag}"
 
     def save(self, *args, **kwargs):
-        if self.pk is None:
-            current_tag_count = UserTags.objects.filter(profile=self.profile).count()
-            if current_tag_count >= 5:
-                raise ValidationError("Limite de 5 tags por usuário atingido.")
+        if self.position is None:
+            self.position = next_tag_position(
+                UserTags.objects.filter(profile_id=self.profile_id), "Limite de 5 tags por usuário atingido."
+            )
         super().save(*args, **kwargs)
 
 # project_group_tags vinculo entre o grupo e as tags escolidas
@@ -306,22 +403,67 @@ class ProjectGroupTags(models.Model):
         on_delete=models.CASCADE,
     )
 
+    position = models.PositiveSmallIntegerField(editable=False, verbose_name="Posição")
+
     class Meta:
         unique_together = ('project_group', 'tag')
         verbose_name = "Tags do grupo"
         verbose_name_plural = "Tags dos grupos"
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(position__gte=1, position__lte=MAX_TAGS),
+                name='core_projectgrouptags_position_range',
+            ),
+            models.UniqueConstraint(
+                fields=['project_group', 'position'], name='core_projectgrouptags_group_position_uniq'
+            ),
+        ]
 
     def __str__(self):
         return f"#{self.tag}"
 
     def save(self, *args, **kwargs):
-        if self.pk is None:
-            current_tag_count = ProjectGroupTags.objects.filter(project_group=self.project_group).count()
-            if current_tag_count >= 5:
-                raise ValidationError("Limite de 5 tags por grupo atingido.")
+        if self.position is None:
+            self.position = next_tag_position(
+                ProjectGroupTags.objects.filter(project_group_id=self.project_group_id),
+                "Limite de 5 tags por grupo atingido.",
+            )
         super().save(*args, **kwargs)
 
 
+# Registro das importacoes de dados de referencia (ex.: dataset/polos.json), usado para
+# pular a importacao quando o conteudo do arquivo nao mudou desde a ultima execucao
+class ReferenceDataImport(models.Model):
+    source = models.CharField(max_length=100, unique=True, verbose_name="Origem")
+    content_hash = models.CharField(max_length=64, verbose_name="Hash do conteudo")
+    imported_at = models.DateTimeField(auto_now=True, verbose_name="Importado em")
+
+    class Meta:
+        verbose_name = "Importacao de dados de referencia"
+        verbose_name_plural = "Importacoes de dados de referencia"
+
+    def __str__(self):
+        return f"{self.source} ({self.content_hash[:12]})"
+
+
+class CacheVersion(models.Model):
+    """
+    Versao de um namespace do cache (ver core/cache.py).
+
+    O contador fica no banco porque o incr() do DatabaseCache e um get + set: bumps
+    simultaneos podiam se perder. Aqui o incremento e um UPDATE com F().
+    """
+    namespace = models.CharField(max_length=50, primary_key=True, verbose_name="Namespace")
+    version = models.BigIntegerField(verbose_name="Versao")
+
+    class Meta:
+        verbose_name = "Versao do cache"
+        verbose_name_plural = "Versoes do cache"
+
+    def __str__(self):
+        return f"{self.namespace}: {self.version}"
+
+
 class OTP(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
     otp_code = models.CharField(max_length=6)
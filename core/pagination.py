@@ -0,0 +1,47 @@
+# core/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class ProjectGroupCursorPagination(CursorPagination):
+    """
+    Paginacao por cursor da lista de grupos.
+
+    Cada pagina e uma busca por intervalo no indice da ordenacao
+    (WHERE created_at < cursor ORDER BY created_at DESC LIMIT n), entao o custo por
+    pagina nao cresce com o numero de grupos, ao contrario de OFFSET.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+    def get_ordering(self, request, queryset, view):
+        # A view pode trocar a ordenacao (ex.: pela relevancia quando ha ?search=)
+        get_cursor_ordering = getattr(view, 'get_cursor_ordering', None)
+        if get_cursor_ordering is not None:
+            ordering = get_cursor_ordering()
+            if ordering:
+                return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+        return super().get_ordering(request, queryset, view)
+
+
+class ProfileCursorPagination(CursorPagination):
+    """
+    Paginacao por cursor da busca de alunos sem grupo: perfis criados mais recentemente
+    primeiro, sobre os indices que terminam em (created_at, id).
+
+    O cursor precisa de uma chave imutavel: com updated_at, editar um perfil entre duas
+    paginas faria a linha pular ou se repetir.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class JoinRequestCursorPagination(CursorPagination):
+    """Pedidos de entrada mais recentes primeiro, sobre os indices (grupo|usuario, status, data)."""
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-date_requested', '-id')
@@ -1,5 +1,7 @@
 
 from rest_framework import permissions
+from .context import get_request_context
+from .models import Membership
 
 class IsMemberOfGroup(permissions.BasePermission):
     """
@@ -13,11 +15,8 @@ class IsMemberOfGroup(permissions.BasePermission):
         Verifica a permissão em nível de objeto.
         'obj' aqui é a instância de ProjectGroup.
         """
-        try:
-            Membership.objects.get(user=request.user, project_group=obj)
-            return True
-        except Membership.DoesNotExist:
-            return False
+        # O vinculo do usuario e carregado uma vez por request (ver core/context.py)
+        return get_request_context(request).is_member_of(obj)
 
 class IsAdminOfGroup(permissions.BasePermission):
     """
@@ -33,12 +32,19 @@ class IsAdminOfGroup(permissions.BasePermission):
         """
         if request.method in permissions.SAFE_METHODS:
             return True
-        try:
-            membership = Membership.objects.get(user=request.user, project_group=obj)
-        except Membership.DoesNotExist:
-            return False
+        return get_request_context(request).is_admin_of(obj)
+
+
+class IsAdminOfAnyGroup(permissions.BasePermission):
+    """
+    Permissão para telas dos administradores que não dependem de um grupo específico
+    (ex.: busca de alunos sem grupo).
+    """
+    message = 'Apenas administradores de grupo podem realizar esta ação.'
 
-        return membership.role == Membership.Role.ADMIN
+    def has_permission(self, request, view):
+        membership = get_request_context(request).membership
+        return membership is not None and membership.role == Membership.Role.ADMIN
 
 
 class CanRemoveMembership(permissions.BasePermission):
@@ -53,17 +59,17 @@ class CanRemoveMembership(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         requesting_user = request.user
         membership_to_delete = obj
-        group = membership_to_delete.project_group
-        group_admin = group.creator
+        # Compara apenas ids: o criador e o usuario do vinculo nao precisam ser carregados
+        group_admin_id = membership_to_delete.project_group.creator_id
 
-        if membership_to_delete.user == group_admin:
+        if membership_to_delete.user_id == group_admin_id:
             self.message = 'O administrador não pode ser removido ou sair do grupo. O grupo deve ser deletado.'
             return False
 
-        if requesting_user == membership_to_delete.user:
+        if requesting_user.pk == membership_to_delete.user_id:
             return True
 
-        if requesting_user == group_admin:
+        if requesting_user.pk == group_admin_id:
             return True
 
         self.message = 'Apenas o administrador do grupo pode remover outros membros.'
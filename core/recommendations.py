@@ -0,0 +1,132 @@
+# core/recommendations.py
+"""
+Recomendacao de grupos para o aluno.
+
+As caracteristicas de todos os grupos ficam pre-calculadas em colunas compactas
+(array de inteiros por atributo academico e um bitset de tags por grupo) e guardadas
+no cache sob a versao 'project-groups'. Assim uma requisicao so percorre essas colunas,
+sem nenhuma consulta ou acesso ao ORM por grupo.
+"""
+import heapq
+from array import array
+
+from django.core.cache import cache
+
+from .cache import PROJECT_GROUPS_NAMESPACE, get_project_groups_version
+from .models import ProjectGroup, ProjectGroupTags
+
+# Pesos de cada criterio na pontuacao final
+WEIGHT_PROJETO_INTEGRADOR = 40
+WEIGHT_POLO = 30
+WEIGHT_DRP = 15
+WEIGHT_CURSO = 20
+WEIGHT_EIXO = 10
+WEIGHT_TAG = 10
+
+FEATURES_TIMEOUT = 60 * 60
+
+
+def build_group_features():
+    """Monta as colunas de caracteristicas de todos os grupos com duas consultas."""
+    ids, pis, drps, polos, eixos, cursos = (array('q') for _ in range(6))
+    rows = ProjectGroup.objects.order_by('pk').values_list(
+        'pk', 'projeto_integrador_id', 'drp_id', 'polo_id', 'eixo_id', 'curso_id'
+    )
+    position = {}
+    for pk, pi, drp, polo, eixo, curso in rows.iterator(chunk_size=2000):
+        position[pk] = len(ids)
+        ids.append(pk)
+        pis.append(pi)
+        drps.append(drp)
+        # 0 nunca e um id valido, entao representa "sem polo/curso"
+        polos.append(polo or 0)
+        eixos.append(eixo)
+        cursos.append(curso or 0)
+
+    # Cada tag recebe um bit; o conjunto de tags do grupo vira um unico inteiro
+    tag_bits = {}
+    tags = [0] * len(ids)
+    for group_id, tag_id in ProjectGroupTags.objects.values_list('project_group_id', 'tag_id').iterator(chunk_size=2000):
+        if group_id not in position:
+            continue
+        bit = tag_bits.setdefault(tag_id, len(tag_bits))
+        tags[position[group_id]] |= 1 << bit
+
+    return {
+        'ids': ids,
+        'projeto_integrador': pis,
+        'drp': drps,
+        'polo': polos,
+        'eixo': eixos,
+        'curso': cursos,
+        'tags': tags,
+        'tag_bits': tag_bits,
+    }
+
+
+def get_group_features():
+    key = f'{PROJECT_GROUPS_NAMESPACE}:recommendation-features:{get_project_groups_version()}'
+    features = cache.get(key)
+    if features is None:
+        features = build_group_features()
+        cache.set(key, features, timeout=FEATURES_TIMEOUT)
+    return features
+
+
+def _matches(column, value, weight):
+    """Pontuacao de uma coluna inteira: 'weight' onde o valor coincide, 0 no resto."""
+    if not value:
+        return [0] * len(column)
+    return [weight if item == value else 0 for item in column]
+
+
+def score_groups(features, projeto_integrador_id=None, drp_id=None, polo_id=None, eixo_id=None,
+                 curso_id=None, tag_ids=()):
+    """Retorna a pontuacao de cada grupo, na mesma ordem de features['ids']."""
+    pi_scores = _matches(features['projeto_integrador'], projeto_integrador_id, WEIGHT_PROJETO_INTEGRADOR)
+    polo_scores = _matches(features['polo'], polo_id, WEIGHT_POLO)
+    drp_scores = _matches(features['drp'], drp_id, WEIGHT_DRP)
+    curso_scores = _matches(features['curso'], curso_id, WEIGHT_CURSO)
+    eixo_scores = _matches(features['eixo'], eixo_id, WEIGHT_EIXO)
+
+    tag_mask = 0
+    for tag_id in tag_ids:
+        bit = features['tag_bits'].get(tag_id)
+        if bit is not None:
+            tag_mask |= 1 << bit
+    if tag_mask:
+        tag_scores = [(tags & tag_mask).bit_count() * WEIGHT_TAG for tags in features['tags']]
+    else:
+        tag_scores = [0] * len(features['ids'])
+
+    # Mesmo polo ja implica mesma DRP: a proximidade conta o maior dos dois, nao a soma
+    return array('q', (
+        pi + max(polo, drp) + curso + eixo + tag
+        for pi, polo, drp, curso, eixo, tag in zip(
+            pi_scores, polo_scores, drp_scores, curso_scores, eixo_scores, tag_scores
+        )
+    ))
+
+
+def recommend_group_ids(profile, tag_ids, limit, exclude=()):
+    """
+    Retorna ate 'limit' pares (id do grupo, pontuacao) ordenados da maior para a menor
+    pontuacao (empates favorecem os grupos mais novos). Grupos sem nenhuma afinidade ficam de fora.
+    """
+    features = get_group_features()
+    scores = score_groups(
+        features,
+        projeto_integrador_id=profile.projeto_integrador_id,
+        drp_id=profile.polo.drp_id if profile.polo_id else None,
+        polo_id=profile.polo_id,
+        eixo_id=profile.curso.eixo_id,
+        curso_id=profile.curso_id,
+        tag_ids=tag_ids,
+    )
+    ids = features['ids']
+    exclude = set(exclude)
+    candidates = (
+        (score, group_id) for score, group_id in zip(scores, ids)
+        if score > 0 and group_id not in exclude
+    )
+    return [(group_id, score) for score, group_id in heapq.nlargest(limit, candidates)]
@@ -0,0 +1,69 @@
+# core/search.py
+"""
+Indice textual dos grupos de projeto no SQLite (modo local).
+
+Usamos uma tabela FTS5 de conteudo externo sincronizada por triggers. O SQLite recria a
+tabela core_projectgroup em varias alteracoes de schema (e com ela perde os triggers), por
+isso a instalacao e idempotente e roda tambem apos cada migrate (ver core/signals.py).
+No Postgres o indice e a coluna search_vector, mantida por trigger (migracao 0009).
+"""
+
+SQLITE_FTS_TABLE = 'core_projectgroup_fts'
+
+SQLITE_FTS_CREATE = f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {SQLITE_FTS_TABLE} USING fts5(
+        name, description,
+        content='core_projectgroup', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+"""
+
+SQLITE_FTS_TRIGGERS = {
+    'core_projectgroup_fts_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS core_projectgroup_fts_ai AFTER INSERT ON core_projectgroup BEGIN
+            INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """,
+    'core_projectgroup_fts_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS core_projectgroup_fts_ad AFTER DELETE ON core_projectgroup BEGIN
+            INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+        END
+    """,
+    'core_projectgroup_fts_au': f"""
+        CREATE TRIGGER IF NOT EXISTS core_projectgroup_fts_au AFTER UPDATE OF name, description ON core_projectgroup BEGIN
+            INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}, rowid, name, description)
+            VALUES ('delete', old.id, old.name, old.description);
+            INSERT INTO {SQLITE_FTS_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+        END
+    """,
+}
+
+
+def install_sqlite_fts(connection):
+    """Cria a tabela FTS5 e os triggers que faltarem; reconstroi o indice se algo foi recriado."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = %s OR (type = 'trigger' AND name IN (%s, %s, %s))",
+            [SQLITE_FTS_TABLE, *SQLITE_FTS_TRIGGERS],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in (SQLITE_FTS_TABLE, *SQLITE_FTS_TRIGGERS) if name not in existing]
+        if not missing:
+            return
+        cursor.execute(SQLITE_FTS_CREATE)
+        for statement in SQLITE_FTS_TRIGGERS.values():
+            cursor.execute(statement)
+        # Enquanto faltava algum trigger o indice pode ter ficado desatualizado
+        cursor.execute(f"INSERT INTO {SQLITE_FTS_TABLE}({SQLITE_FTS_TABLE}) VALUES ('rebuild')")
+
+
+def uninstall_sqlite_fts(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for name in SQLITE_FTS_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+        cursor.execute(f'DROP TABLE IF EXISTS {SQLITE_FTS_TABLE}')
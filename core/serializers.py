@@ -5,24 +5,96 @@ from allauth.account.internal.userkit import user_email
 from django.db import models
 from django.contrib.auth.password_validation import validate_password
 from drf_spectacular.utils import extend_schema_field, extend_schema, OpenApiResponse
-from rest_framework import serializers
+from rest_framework import permissions, serializers
 from dj_rest_auth.serializers import LoginSerializer
 from dj_rest_auth.registration.serializers import RegisterSerializer
-from .models import CustomUser, UserProfile, ProjetoIntegrador, DRP, Polo, Curso, Eixo, Tags, UserTags, ProjectGroup, \
+from .models import CustomUser, UserProfile, ProjetoIntegrador, DRP, Polo, Curso, Eixo, Tags, ProjectGroup, \
     Membership, JoinRequest, OTP
 from django.db import transaction
+from .tags import set_tags, validate_tag_limit
 from django.template.loader import render_to_string
 from django.utils import timezone
 from premailer import transform
 import random
 
 
+def _query_param_set(request, name):
+    value = request.query_params.get(name, '') if request is not None else ''
+    return {item.strip() for item in value.split(',') if item.strip()}
+
+
+class DynamicFieldsMixin:
+    """
+    Permite escolher os campos da resposta pela query string:
+
+    - ?fields=id,name devolve apenas esses campos;
+    - ?expand=memberships inclui campos de Meta.expandable_fields, omitidos por padrao.
+
+    Sem ?fields a resposta usa Meta.default_fields (ou todos os campos nao expansiveis).
+    As views usam selected_fields() para nao carregar do banco o que nao sera exibido.
+    So o serializer de nivel mais alto (o que recebe o request no contexto) e afetado, e
+    apenas em leituras: em POST/PUT/PATCH remover campos descartaria dados enviados no corpo.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None:
+            return
+        selected = self.selected_fields(request)
+        if selected is None:
+            return
+        for field_name in list(self.fields):
+            if field_name not in selected:
+                self.fields.pop(field_name)
+
+    @classmethod
+    def selected_fields(cls, request):
+        """Campos da resposta, ou None (todos) fora de metodos de leitura."""
+        if request.method not in permissions.SAFE_METHODS:
+            return None
+        all_fields = list(cls.Meta.fields)
+        expandable = set(getattr(cls.Meta, 'expandable_fields', ()))
+        expand = _query_param_set(request, 'expand') & expandable
+        requested = _query_param_set(request, 'fields')
+        if requested:
+            return (requested & set(all_fields)) | expand
+        default = getattr(cls.Meta, 'default_fields', None)
+        if default is None:
+            default = [field for field in all_fields if field not in expandable]
+        return set(default) | expand
+
+
 #Serializers de Usuario e Profile
 class TagSerializer(serializers.ModelSerializer):
     class Meta:
         model = Tags
         fields = ['id', 'name']
 
+class TagAssignmentMixin:
+    """Grava 'tags' com set_tags (so a diferenca, em lote) em vez de deixar o ModelSerializer reescrever o M2M."""
+
+    @transaction.atomic
+    def create(self, validated_data):
+        tags = validated_data.pop('tags', None)
+        instance = super().create(validated_data)
+        if tags is not None:
+            set_tags(instance, tags)
+        return instance
+
+    @transaction.atomic
+    def update(self, instance, validated_data):
+        tags = validated_data.pop('tags', None)
+        instance = super().update(instance, validated_data)
+        if tags is not None:
+            set_tags(instance, tags)
+        return instance
+
+class TagAutocompleteSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Tags
+        fields = ['id', 'name', 'usage_count']
+
 class CustomRegisterSerializer(RegisterSerializer):
     """
     Serializer personalizado para o registro de usuários, incluindo
@@ -47,9 +119,7 @@ class CustomRegisterSerializer(RegisterSerializer):
 
     def validate_tags(self, value):
         """Validar que o usuário não pode ter mais de 5 tags."""
-        if len(value) > 5:
-            raise serializers.ValidationError("Não é possível associar mais de 5 tags a um usuário.")
-        return value
+        return validate_tag_limit(value, UserProfile)
 
     def get_cleaned_data(self):
         # Pega os dados básicos (email, password, etc.) da classe pai
@@ -80,10 +150,8 @@ class CustomRegisterSerializer(RegisterSerializer):
             curso=self.validated_data.get('curso'),
         )
         
-        # Create UserTags relationships for the provided tags
-        tags = self.validated_data.get('tags', [])
-        for tag in tags:
-            UserTags.objects.create(profile=user_profile, tag=tag)
+        # Vincula as tags escolhidas com um unico INSERT em lote
+        set_tags(user_profile, self.validated_data.get('tags', []))
         
         # Create OTP record for registration verification
         otp_code = str(random.randint(100000, 999999))
@@ -168,7 +236,7 @@ class CustomUserSerializer(serializers.ModelSerializer):
         model = CustomUser
         fields = ('pk', 'email', 'first_name', 'last_name')
 
-class UserProfileDetailSerializer(serializers.ModelSerializer):
+class UserProfileDetailSerializer(DynamicFieldsMixin, serializers.ModelSerializer):
     user = CustomUserSerializer(read_only=True)
     polo = serializers.StringRelatedField()
     curso = serializers.StringRelatedField()
@@ -198,7 +266,7 @@ class UserProfileDetailSerializer(serializers.ModelSerializer):
             return obj.curso.eixo.nome
         return None
 
-class UserProfileUpdateSerializer(serializers.ModelSerializer):
+class UserProfileUpdateSerializer(TagAssignmentMixin, serializers.ModelSerializer):
     polo = serializers.PrimaryKeyRelatedField(queryset=Polo.objects.all())
     curso = serializers.PrimaryKeyRelatedField(queryset=Curso.objects.all())
     projeto_integrador = serializers.PrimaryKeyRelatedField(queryset=ProjetoIntegrador.objects.all())
@@ -211,6 +279,9 @@ class UserProfileUpdateSerializer(serializers.ModelSerializer):
         model = UserProfile
         fields = ['polo', 'curso', 'projeto_integrador', 'tags']
 
+    def validate_tags(self, value):
+        return validate_tag_limit(value, UserProfile)
+
 #Serializers de informacoes base
 class EixoSerializer(serializers.ModelSerializer):
     class Meta:
@@ -241,6 +312,38 @@ class ProjetoIntegradorSerializer(serializers.ModelSerializer):
         model = ProjetoIntegrador
         fields = ['id', 'numero']
 
+#Serializers do documento unico de dados de referencia (reference-data/)
+class CursoResumoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Curso
+        fields = ['id', 'nome']
+
+class PoloResumoSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Polo
+        fields = ['id', 'nome']
+
+class EixoComCursosSerializer(serializers.ModelSerializer):
+    cursos = CursoResumoSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Eixo
+        fields = ['id', 'nome', 'cursos']
+
+class DRPComPolosSerializer(serializers.ModelSerializer):
+    polos = PoloResumoSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = DRP
+        fields = ['id', 'numero', 'polos']
+
+class ReferenceDataSerializer(serializers.Serializer):
+    """Documento com todos os dados de referencia; polos aninhados nas DRPs e cursos nos eixos."""
+    eixos = EixoComCursosSerializer(many=True)
+    drps = DRPComPolosSerializer(many=True)
+    pis = ProjetoIntegradorSerializer(many=True)
+    tags = TagSerializer(many=True)
+
 
 #PROJECT-GROUPS
 class MembershipSerializer(serializers.ModelSerializer):
@@ -266,7 +369,7 @@ class MembershipUserIdSerializer(serializers.ModelSerializer):
         if obj.user:
             return obj.user.email
 
-class ProjectGroupSerializer(serializers.ModelSerializer):
+class ProjectGroupSerializer(TagAssignmentMixin, DynamicFieldsMixin, serializers.ModelSerializer):
 
     creator = serializers.ReadOnlyField(source='creator.email')
     projeto_integrador = serializers.CharField(read_only=True)
@@ -298,16 +401,59 @@ class ProjectGroupSerializer(serializers.ModelSerializer):
             'eixo',
             'curso',
             'moderated',
+            'member_count',
+            'pending_request_count',
+            'created_at',
+            'last_activity_at',
             'tags',
             'memberships'
         ]
 
     def validate_tags(self, value):
-        if len(value) > 5:
-            raise serializers.ValidationError("Não é possível associar mais de 5 tags a um grupo.")
-        return value
+        return validate_tag_limit(value, ProjectGroup)
 
-class ProjectGroupUpdateSerializer(serializers.ModelSerializer):
+class ProjectGroupSummarySerializer(ProjectGroupSerializer):
+    """Representacao enxuta usada nas listas: sem descricao nem membros (use ?fields= ou ?expand=memberships)."""
+
+    class Meta(ProjectGroupSerializer.Meta):
+        default_fields = [
+            'id',
+            'name',
+            'projeto_integrador',
+            'drp',
+            'polo',
+            'eixo',
+            'curso',
+            'moderated',
+            'member_count',
+            'pending_request_count',
+            'created_at',
+            'last_activity_at',
+            'tags',
+        ]
+        expandable_fields = ['memberships']
+
+class FacetValueSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    label = serializers.CharField()
+    count = serializers.IntegerField()
+
+class ProjectGroupFacetsSerializer(serializers.Serializer):
+    total = serializers.IntegerField()
+    projeto_integrador = FacetValueSerializer(many=True)
+    drp = FacetValueSerializer(many=True)
+    polo = FacetValueSerializer(many=True)
+    eixo = FacetValueSerializer(many=True)
+    curso = FacetValueSerializer(many=True)
+    tags = FacetValueSerializer(many=True)
+
+class RecommendedProjectGroupSerializer(ProjectGroupSerializer):
+    score = serializers.IntegerField(source='recommendation_score', read_only=True)
+
+    class Meta(ProjectGroupSerializer.Meta):
+        fields = ProjectGroupSerializer.Meta.fields + ['score']
+
+class ProjectGroupUpdateSerializer(TagAssignmentMixin, serializers.ModelSerializer):
     tags = serializers.PrimaryKeyRelatedField(
         queryset=Tags.objects.all(),
         many=True,
@@ -317,6 +463,9 @@ class ProjectGroupUpdateSerializer(serializers.ModelSerializer):
         model = ProjectGroup
         fields = ['name', 'description','tags']
 
+    def validate_tags(self, value):
+        return validate_tag_limit(value, ProjectGroup)
+
 class MembershipUserIdSerializer(serializers.ModelSerializer):
     user = serializers.ReadOnlyField(source='user.email')
 
@@ -333,6 +482,24 @@ class JoinRequestSerializer(serializers.ModelSerializer):
         model = JoinRequest
         fields = ['id', 'user', 'project_group', 'status', 'date_requested']
 
+# Limite de pedidos tratados por chamada de join-requests/bulk/
+JOIN_REQUEST_BULK_MAX = 100
+
+class JoinRequestBulkActionSerializer(serializers.Serializer):
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=JOIN_REQUEST_BULK_MAX,
+    )
+    action = serializers.ChoiceField(choices=['approve', 'reject'])
+
+class JoinRequestBulkResultSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    result = serializers.ChoiceField(choices=['approved', 'rejected', 'already_member', 'already_processed', 'not_found'])
+
+class JoinRequestBulkResponseSerializer(serializers.Serializer):
+    results = JoinRequestBulkResultSerializer(many=True)
+
 
 
 #Generic serializers
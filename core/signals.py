@@ -0,0 +1,137 @@
+# core/signals.py
+from django.db.models import F
+from django.db import connections, transaction
+from django.db.migrations.recorder import MigrationRecorder
+from django.db.models.signals import post_save, post_delete, post_migrate, m2m_changed
+from django.utils import timezone
+
+from .cache import bump_project_groups_version, bump_reference_version
+from .search import install_sqlite_fts
+from .models import Eixo, Polo, DRP, Curso, ProjetoIntegrador, Tags, UserTags, ProjectGroup, ProjectGroupTags, \
+    Membership, UserProfile, CustomUser
+
+# Modelos cujos dados sao servidos pelos endpoints de referencia (eixos/, polos/, ...)
+REFERENCE_MODELS = (Eixo, Polo, DRP, Curso, ProjetoIntegrador, Tags)
+
+# Tabelas de vinculo que alimentam Tags.usage_count
+TAG_LINK_MODELS = (UserTags, ProjectGroupTags)
+
+# Migracao que cria o indice textual dos grupos
+SEARCH_MIGRATION = ('core', '0009_projectgroup_search')
+
+# Modelos que alteram os dados derivados dos grupos (recomendacoes e facetas)
+PROJECT_GROUP_MODELS = (ProjectGroup, Membership, ProjectGroupTags)
+
+
+def invalidate_reference_data(sender, using=None, **kwargs):
+    """Qualquer alteracao nos dados de referencia (inclusive pelo admin) invalida o cache."""
+    # So depois do commit: antes disso outro request recriaria o cache com os dados antigos
+    transaction.on_commit(bump_reference_version, using=using)
+
+
+def invalidate_project_groups(sender, using=None, **kwargs):
+    transaction.on_commit(bump_project_groups_version, using=using)
+
+
+def restore_search_index(sender, app_config, using, **kwargs):
+    # Migracoes que recriam core_projectgroup no SQLite apagam os triggers da busca textual
+    if app_config.label != 'core':
+        return
+    connection = connections[using]
+    if connection.vendor == 'sqlite' and SEARCH_MIGRATION in MigrationRecorder(connection).applied_migrations():
+        install_sqlite_fts(connection)
+
+
+def touch_profiles(**lookup):
+    """Atualiza updated_at dos perfis (invalida a ETag) sem disparar post_save."""
+    UserProfile.objects.filter(**lookup).update(updated_at=timezone.now())
+
+
+def user_tags_changed(sender, instance, **kwargs):
+    touch_profiles(pk=instance.profile_id)
+
+
+def user_saved(sender, instance, created, update_fields=None, **kwargs):
+    # Nome e email aparecem no perfil; o login (last_login) e trocas de senha nao mudam nada visivel
+    if created or (update_fields and set(update_fields) <= {'last_login', 'password'}):
+        return
+    touch_profiles(user=instance)
+
+
+def adjust_tag_usage(tag_ids, delta):
+    """
+    Soma 'delta' ao contador de uso das tags com um UPDATE atomico.
+
+    Usamos update() e nao save() para nao disparar a invalidacao dos dados de referencia.
+    """
+    if not tag_ids:
+        return
+    queryset = Tags.objects.filter(pk__in=tag_ids)
+    if delta < 0:
+        queryset = queryset.filter(usage_count__gte=-delta)
+    queryset.update(usage_count=F('usage_count') + delta)
+
+
+def tag_link_saved(sender, instance, created, **kwargs):
+    if created:
+        adjust_tag_usage([instance.tag_id], 1)
+
+
+def tag_link_deleted(sender, instance, **kwargs):
+    # Cobre delete direto, remove()/clear() do M2M e deletes em cascata
+    adjust_tag_usage([instance.tag_id], -1)
+
+
+def tag_links_added(sender, instance, pk_set):
+    """
+    Insercao em lote feita por core.tags.set_tags: o bulk_create nao dispara o post_save de
+    cada linha, entao os contadores e o touch/bump sao feitos uma vez para todas as tags.
+    """
+    adjust_tag_usage(pk_set, 1)
+    if sender is UserTags:
+        touch_profiles(pk=instance.pk)
+    else:
+        transaction.on_commit(bump_project_groups_version)
+
+
+def tag_links_removed(sender, instance, pk_set):
+    """
+    Remocao em lote feita por core.tags.set_tags, que apaga os vinculos sem disparar o
+    post_delete de cada linha: um UPDATE dos contadores e um touch/bump para todas as tags.
+    """
+    adjust_tag_usage(pk_set, -1)
+    if sender is UserTags:
+        touch_profiles(pk=instance.pk)
+    else:
+        transaction.on_commit(bump_project_groups_version)
+
+
+def reject_m2m_tag_add(sender, action, **kwargs):
+    """
+    add()/set() do M2M (profile.tags, tag.profiles, ...) nao sabem escolher a posicao da tag
+    e a coluna e obrigatoria. Tags sao gravadas por core.tags.set_tags ou pelo save() do vinculo.
+    """
+    if action == 'pre_add':
+        raise ValueError(
+            f'{sender.__name__}: use core.tags.set_tags ou {sender.__name__}.objects.create() para gravar tags.'
+        )
+
+
+for model in REFERENCE_MODELS:
+    post_save.connect(invalidate_reference_data, sender=model, dispatch_uid=f'reference-save-{model.__name__}')
+    post_delete.connect(invalidate_reference_data, sender=model, dispatch_uid=f'reference-delete-{model.__name__}')
+
+for model in TAG_LINK_MODELS:
+    post_save.connect(tag_link_saved, sender=model, dispatch_uid=f'tag-usage-save-{model.__name__}')
+    post_delete.connect(tag_link_deleted, sender=model, dispatch_uid=f'tag-usage-delete-{model.__name__}')
+    m2m_changed.connect(reject_m2m_tag_add, sender=model, dispatch_uid=f'tag-m2m-add-{model.__name__}')
+
+for model in PROJECT_GROUP_MODELS:
+    post_save.connect(invalidate_project_groups, sender=model, dispatch_uid=f'project-groups-save-{model.__name__}')
+    post_delete.connect(invalidate_project_groups, sender=model, dispatch_uid=f'project-groups-delete-{model.__name__}')
+
+post_migrate.connect(restore_search_index, dispatch_uid='project-groups-search-index')
+
+post_save.connect(user_tags_changed, sender=UserTags, dispatch_uid='profile-touch-usertags-save')
+post_delete.connect(user_tags_changed, sender=UserTags, dispatch_uid='profile-touch-usertags-delete')
+post_save.connect(user_saved, sender=CustomUser, dispatch_uid='profile-touch-user')
@@ -0,0 +1,106 @@
+# core/tags.py
+"""
+Atribuicao de tags a perfis e grupos de projeto.
+
+set_tags compara as tags atuais com as desejadas e grava so a diferenca: um DELETE para
+as removidas e um INSERT em lote para as novas (nas posicoes livres), na mesma transacao.
+O limite de MAX_TAGS tambem e garantido pelo banco (ver UserTags.position). Os contadores
+(Tags.usage_count, updated_at do perfil e versao do cache dos grupos) sao ajustados uma
+vez por lote pelas funcoes de core/signals.py.
+"""
+from django.db import IntegrityError, connections, router, transaction
+from rest_framework import serializers
+
+from .models import MAX_TAGS
+from .signals import tag_links_added, tag_links_removed
+
+# Como o dono das tags aparece nas mensagens de erro
+OWNER_LABELS = {
+    'userprofile': 'um usuário',
+    'projectgroup': 'um grupo',
+}
+
+
+# Resposta quando outra requisicao alterou as mesmas tags ao mesmo tempo
+TAG_CONFLICT_MESSAGE = 'As tags foram alteradas por outra requisição. Tente novamente.'
+
+
+def tag_limit_message(owner_model):
+    return f"Não é possível associar mais de {MAX_TAGS} tags a {OWNER_LABELS[owner_model._meta.model_name]}."
+
+
+def validate_tag_limit(tags, owner_model):
+    """Validacao usada nos serializers (validate_tags), antes de qualquer consulta."""
+    if len({getattr(tag, 'pk', tag) for tag in tags}) > MAX_TAGS:
+        raise serializers.ValidationError(tag_limit_message(owner_model))
+    return tags
+
+
+def delete_tag_links(model, pks, using):
+    """
+    Apaga os vinculos (UserTags/ProjectGroupTags) de 'pks' com um unico DELETE.
+
+    SQL direto de proposito: o delete() do queryset carregaria cada linha e dispararia o
+    post_delete por vinculo (contador da tag, touch do perfil...). Quem chama ajusta os
+    contadores uma vez por lote (ver tag_links_removed em core/signals.py).
+    """
+    if not pks:
+        return
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(pks))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} WHERE {quote(model._meta.pk.column)} IN ({placeholders})',
+            list(pks),
+        )
+
+
+def set_tags(owner, tags):
+    """
+    Substitui as tags de 'owner' (UserProfile ou ProjectGroup) por 'tags' (instancias ou ids).
+
+    Retorna os ids adicionados e removidos. Um conflito com outra alteracao simultanea
+    das mesmas tags vira ValidationError (400), nunca IntegrityError.
+    """
+    manager = owner.tags
+    through = manager.through
+    owner_field = manager.source_field_name
+    desired = {getattr(tag, 'pk', tag) for tag in tags}
+    if len(desired) > MAX_TAGS:
+        raise serializers.ValidationError({'tags': [tag_limit_message(type(owner))]})
+
+    db = router.db_for_write(through, instance=owner)
+    links = through._default_manager.using(db)
+    try:
+        with transaction.atomic(using=db):
+            # Trava o dono: outra troca das mesmas tags espera ate o commit para ler as posicoes
+            list(type(owner)._default_manager.using(db).select_for_update().filter(pk=owner.pk).values_list('pk'))
+            current = {
+                tag_id: (pk, position)
+                for pk, tag_id, position in links.filter(**{owner_field: owner}).values_list('pk', 'tag_id', 'position')
+            }
+            added = desired - current.keys()
+            removed = current.keys() - desired
+            # As novas tags ocupam as posicoes que ficam livres depois das remocoes
+            kept_positions = {position for tag_id, (pk, position) in current.items() if tag_id not in removed}
+            free_positions = [position for position in range(1, MAX_TAGS + 1) if position not in kept_positions]
+
+            if removed:
+                # Um DELETE sem o post_delete por linha; os contadores sao ajustados de uma vez
+                delete_tag_links(through, [current[tag_id][0] for tag_id in removed], db)
+                tag_links_removed(through, owner, removed)
+            if added:
+                # Um INSERT em lote sem o post_save por linha; os contadores sao ajustados de uma vez
+                links.bulk_create([
+                    through(**{owner_field: owner, 'tag_id': tag_id, 'position': position})
+                    for tag_id, position in zip(sorted(added), free_positions)
+                ])
+                tag_links_added(through, owner, added)
+    except IntegrityError:
+        # Sem SELECT ... FOR UPDATE (ex.: SQLite) duas trocas ainda podem disputar a mesma posicao
+        raise serializers.ValidationError({'tags': [TAG_CONFLICT_MESSAGE]})
+
+    # A resposta nao deve reaproveitar tags pre-carregadas (prefetch_related) antes da troca
+    getattr(owner, '_prefetched_objects_cache', {}).pop('tags', None)
+    return added, removed
@@ -0,0 +1,57 @@
+"""
+Base academica e fabricas de usuarios e grupos compartilhadas pelos testes.
+
+create_academic_data cria um eixo, curso, DRP, polo e PI (self.eixo, self.curso, self.drp,
+self.polo e self.pi); create_user e create_group usam esses objetos por padrao.
+"""
+from django.urls import reverse
+
+from core.models import CustomUser, ProjetoIntegrador, DRP, Polo, Curso, Eixo, UserProfile, ProjectGroup, Membership, \
+    ProjectGroupTags
+
+
+class GroupFixturesMixin:
+    def create_academic_data(self, label='Teste'):
+        self.eixo = Eixo.objects.create(nome=f"Eixo {label}")
+        self.curso = Curso.objects.create(nome=f"Curso {label}", eixo=self.eixo)
+        self.drp = DRP.objects.create(numero=1)
+        self.polo = Polo.objects.create(nome=f"Polo {label}", drp=self.drp)
+        self.pi = ProjetoIntegrador.objects.create(numero=1)
+
+    def create_user(self, name, profile=True, **extra_fields):
+        """
+        Usuario '<name>@test.com'. Com profile=True ganha um perfil na base academica; um dict
+        sobrescreve campos desse perfil e profile=False cria o usuario sem perfil.
+        """
+        user = CustomUser.objects.create_user(email=f'{name}@test.com', password='senha123', **extra_fields)
+        if profile:
+            fields = {'projeto_integrador': self.pi, 'polo': self.polo, 'curso': self.curso}
+            if isinstance(profile, dict):
+                fields.update(profile)
+            UserProfile.objects.create(user=user, **fields)
+        return user
+
+    def create_group(self, name, creator=None, tags=(), **fields):
+        """
+        Grupo na base academica com 'creator' como admin. Sem criador, um usuario sem perfil
+        e criado a partir do nome do grupo. DRP e eixo acompanham o polo e o curso informados.
+        """
+        if creator is None:
+            creator = self.create_user(name.replace(' ', '').lower(), profile=False)
+        polo = fields.setdefault('polo', self.polo)
+        curso = fields.setdefault('curso', self.curso)
+        fields.setdefault('drp', polo.drp if polo else self.drp)
+        fields.setdefault('eixo', curso.eixo if curso else self.eixo)
+        fields.setdefault('projeto_integrador', self.pi)
+        group = ProjectGroup.objects.create(name=name, creator=creator, **fields)
+        Membership.objects.create(user=creator, project_group=group, role=Membership.Role.ADMIN)
+        for tag in tags:
+            ProjectGroupTags.objects.create(project_group=group, tag=tag)
+        return group
+
+    def join_url(self, group):
+        return reverse('core:project-group-join', kwargs={'group_pk': group.pk})
+
+    def assertCounters(self, group, members, pending):
+        group.refresh_from_db()
+        self.assertEqual((group.member_count, group.pending_request_count), (members, pending))
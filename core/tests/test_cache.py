@@ -0,0 +1,197 @@
+import gzip
+import json
+
+import brotli
+from django.core.cache import cache
+from django.db import transaction
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from core.cache import get_reference_version, bump_reference_version
+from core.models import Eixo, DRP, Polo, Tags, Membership, ProjectGroupTags
+from core.tests.fixtures import GroupFixturesMixin
+
+
+class ReferenceDataCacheTests(GroupFixturesMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.create_academic_data('Cache')
+
+    def test_lista_retorna_etag(self):
+        response = self.client.get(reverse('core:eixo-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('ETag', response)
+        self.assertEqual(response.data, [{'id': self.eixo.id, 'nome': 'Eixo Cache'}])
+
+    def test_if_none_match_retorna_304_sem_consultas(self):
+        etag = self.client.get(reverse('core:polo-list'))['ETag']
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('core:polo-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_payload_cacheado_nao_consulta_o_banco(self):
+        self.client.get(reverse('core:polo-list'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('core:polo-list'))
+        self.assertEqual(response.data[0]['drp']['numero'], 1)
+
+    def test_salvar_ou_deletar_invalida_o_cache(self):
+        etag = self.client.get(reverse('core:eixo-list'))['ETag']
+
+        version = get_reference_version()
+        # A versao so muda depois do commit de quem alterou os dados
+        with self.captureOnCommitCallbacks() as callbacks:
+            novo = Eixo.objects.create(nome="Gestão")
+        self.assertEqual(get_reference_version(), version)
+        callbacks[0]()
+        self.assertGreater(get_reference_version(), version)
+
+        response = self.client.get(reverse('core:eixo-list'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            novo.delete()
+        response = self.client.get(reverse('core:eixo-list'))
+        self.assertEqual(len(response.data), 1)
+
+
+class CacheVersionTests(APITestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_versao_vem_do_banco_se_o_cache_perder_a_chave(self):
+        version = bump_reference_version()
+        cache.clear()
+        self.assertEqual(get_reference_version(), version)
+        self.assertEqual(bump_reference_version(), version + 1)
+        self.assertEqual(get_reference_version(), version + 1)
+
+    def test_alteracao_desfeita_nao_invalida_o_cache(self):
+        version = get_reference_version()
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError):
+                with transaction.atomic():
+                    Eixo.objects.create(nome="Desfeito")
+                    raise RuntimeError
+        self.assertEqual(callbacks, [])
+        self.assertEqual(get_reference_version(), version)
+
+
+class ReferenceDataViewTests(GroupFixturesMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.create_academic_data('Referencia')
+
+    def test_documento_aninha_polos_e_cursos(self):
+        response = self.client.get(reverse('core:reference-data'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        data = json.loads(response.content)
+        self.assertEqual(data['drps'][0]['polos'], [{'id': self.polo.id, 'nome': 'Polo Referencia'}])
+        self.assertEqual(data['eixos'][0]['cursos'][0]['nome'], 'Curso Referencia')
+        self.assertEqual(set(data), {'eixos', 'drps', 'pis', 'tags'})
+
+    def test_variante_gzip_pre_comprimida(self):
+        response = self.client.get(reverse('core:reference-data'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        data = json.loads(gzip.decompress(response.content))
+        self.assertEqual(data['drps'][0]['numero'], 1)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                reverse('core:reference-data'), HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag']
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_brotli_preferido_quando_aceito(self):
+        response = self.client.get(reverse('core:reference-data'), HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(json.loads(brotli.decompress(response.content))['drps'][0]['numero'], 1)
+
+        response = self.client.get(reverse('core:reference-data'), HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_documento_reconstruido_apos_alteracao(self):
+        self.client.get(reverse('core:reference-data'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Polo.objects.create(nome="Polo B", drp=self.drp)
+
+        data = json.loads(self.client.get(reverse('core:reference-data')).content)
+        self.assertEqual(len(data['drps'][0]['polos']), 2)
+
+
+class ProjectGroupFacetsTests(GroupFixturesMixin, APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.create_academic_data('Facetas')
+        self.drp1, self.polo1 = self.drp, self.polo
+        self.drp2 = DRP.objects.create(numero=2)
+        self.polo2 = Polo.objects.create(nome="Santos", drp=self.drp2)
+        self.python = Tags.objects.create(name='Python')
+        self.web = Tags.objects.create(name='Web')
+
+        self.grupo1 = self.create_group('Grupo 1', tags=[self.python, self.web])
+        self.grupo2 = self.create_group('Grupo 2', tags=[self.python])
+        self.grupo3 = self.create_group('Grupo 3', polo=self.polo2)
+
+        self.user = self.create_user('facetas', profile=False)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('core:project-group-facets')
+
+    def test_contagens_por_faceta(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['total'], 3)
+        self.assertEqual(response.data['drp'], [
+            {'id': self.drp1.id, 'label': 'DRP 1', 'count': 2},
+            {'id': self.drp2.id, 'label': 'DRP 2', 'count': 1},
+        ])
+        self.assertEqual(response.data['projeto_integrador'], [{'id': self.pi.id, 'label': 'PI 1', 'count': 3}])
+        self.assertEqual(response.data['tags'], [
+            {'id': self.python.id, 'label': 'Python', 'count': 2},
+            {'id': self.web.id, 'label': 'Web', 'count': 1},
+        ])
+
+    def test_filtros_restringem_as_contagens(self):
+        response = self.client.get(self.url, {'tags': self.web.id})
+        self.assertEqual(response.data['total'], 1)
+        self.assertEqual(response.data['polo'], [{'id': self.polo1.id, 'label': 'Polo Facetas', 'count': 1}])
+
+        response = self.client.get(self.url, {'search': 'grupo', 'drp': self.drp2.id})
+        self.assertEqual(response.data['total'], 1)
+        self.assertEqual(response.data['tags'], [])
+
+        self.assertEqual(self.client.get(self.url, {'polo': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filtros_equivalentes_dividem_o_cache(self):
+        tags = f'{self.python.id},{self.web.id}'
+        reversed_tags = f'{self.web.id},{self.python.id}'
+        response = self.client.get(self.url, {'tags': tags, 'moderated': '1', 'search': 'grupo'})
+        self.assertEqual(response.data['total'], 2)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, {'search': ' grupo ', 'moderated': 'true', 'tags': reversed_tags})
+        self.assertEqual(response.data['total'], 2)
+
+    def test_resultado_cacheado_ate_grupos_mudarem(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['total'], 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Membership.objects.create(user=self.user, project_group=self.grupo3)
+        with self.assertNumQueries(7):
+            self.client.get(self.url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectGroupTags.objects.create(project_group=self.grupo3, tag=self.web)
+        response = self.client.get(self.url)
+        self.assertIn({'id': self.web.id, 'label': 'Web', 'count': 2}, response.data['tags'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.grupo1.delete()
+        self.assertEqual(self.client.get(self.url).data['total'], 2)
@@ -0,0 +1,364 @@
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+
+from core.models import DRP, Polo, ReferenceDataImport, Eixo, Curso, ProjetoIntegrador, Tags, ProjectGroup, \
+    Membership, JoinRequest, UserTags
+from core.tests.fixtures import GroupFixturesMixin
+
+
+class ImportPolosCommandTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.file_path = os.path.join(self.tmpdir.name, 'polos.json')
+        self.write_polos([
+            {"name": "POLO", "drp": "DRP"},
+            {"name": "ARUJÁ", "drp": "DRP01"},
+            {"name": "BARUERI", "drp": "DRP01"},
+            {"name": "CUBATÃO", "drp": "DRP02"},
+        ])
+
+    def write_polos(self, entries):
+        with open(self.file_path, 'w', encoding='utf-8') as f:
+            json.dump(entries, f)
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('import_polos', '--file', self.file_path, *args, stdout=out)
+        return out.getvalue()
+
+    def test_importa_em_lote(self):
+        DRP.objects.create(numero=1)
+        output = self.run_command()
+
+        self.assertEqual(DRP.objects.count(), 2)
+        self.assertEqual(Polo.objects.count(), 3)
+        self.assertEqual(Polo.objects.get(nome="CUBATÃO").nome_normalizado, 'cubatao')
+        self.assertIn('Polos novos: 3', output)
+        self.assertTrue(ReferenceDataImport.objects.filter(source='polos.json').exists())
+
+    def test_pula_quando_arquivo_nao_mudou(self):
+        self.run_command()
+        with self.assertNumQueries(1):
+            output = self.run_command()
+        self.assertIn('Nada a fazer', output)
+
+        self.write_polos([{"name": "BERTIOGA", "drp": "DRP02"}])
+        output = self.run_command()
+        self.assertIn('Polos novos: 1', output)
+        self.assertEqual(Polo.objects.count(), 4)
+
+    def test_dry_run_nao_grava(self):
+        output = self.run_command('--dry-run')
+        self.assertIn('[dry-run] Polos novos: 3', output)
+        self.assertEqual(Polo.objects.count(), 0)
+        self.assertFalse(ReferenceDataImport.objects.exists())
+
+
+DRPS_HTML = """<html><head><title>Polos DRP</title></head><body>
+<script>
+    const polos = [
+        { name: "POLO", drp: "DRP" },
+        { name: "ARUJÁ", drp: "DRP01" },
+        { name: "SÃO PAULO - VILA RUBI", drp: "DRP14" },
+        { name: "BERTIOGA", drp: "DRP02" }
+    ];
+</script></body></html>"""
+
+SITE_HTML = """<div class="row lista-polos">
+<p class="color-primary cidade"><strong>Arujá </strong></p>
+<p class="color-primary cidade"><strong>Polo Sem DRP</strong></p>
+</div>"""
+
+
+class ImportUnivespHtmlCommandTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.drps_file = os.path.join(self.tmpdir.name, 'drps.html')
+        self.site_file = os.path.join(self.tmpdir.name, 'polos_univesp.html')
+        with open(self.drps_file, 'w', encoding='utf-8') as f:
+            f.write(DRPS_HTML)
+        with open(self.site_file, 'w', encoding='utf-8') as f:
+            f.write(SITE_HTML)
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command(
+            'import_univesp_html', '--drps-file', self.drps_file, '--site-file', self.site_file,
+            '--batch-size', '2', *args, stdout=out
+        )
+        return out.getvalue()
+
+    def test_adiciona_renomeia_e_remove(self):
+        drp1 = DRP.objects.create(numero=1)
+        Polo.objects.create(nome="Sao Paulo-Vila Rubi", drp=drp1)
+        Polo.objects.create(nome="POLO EXTINTO", drp=drp1)
+
+        output = self.run_command('--prune')
+
+        self.assertIn('Polos adicionados: 2', output)
+        self.assertIn('Polos renomeados: 1', output)
+        self.assertIn('Polos com DRP alterada: 1', output)
+        self.assertIn('Polos removidos: 1', output)
+        self.assertIn('sem DRP correspondente (não importados): 1', output)
+        vila_rubi = Polo.objects.get(nome="SÃO PAULO - VILA RUBI")
+        self.assertEqual(vila_rubi.drp.numero, 14)
+        self.assertEqual(vila_rubi.nome_normalizado, 'sao paulo - vila rubi')
+        self.assertFalse(Polo.objects.filter(nome="POLO EXTINTO").exists())
+
+    def test_mesmo_nome_em_drps_diferentes(self):
+        drp1 = DRP.objects.create(numero=1)
+        drp2 = DRP.objects.create(numero=2)
+        aruja_drp2 = Polo.objects.create(nome="ARUJÁ", drp=drp2)
+        # Colisao na mesma DRP: fica a que ja tem o nome exato, a outra e so reportada
+        aruja_drp1 = Polo.objects.create(nome="ARUJÁ", drp=drp1)
+        duplicate = Polo.objects.create(nome="Aruja", drp=drp1)
+        with open(self.drps_file, 'w', encoding='utf-8') as f:
+            f.write(DRPS_HTML.replace(
+                '{ name: "BERTIOGA", drp: "DRP02" }',
+                '{ name: "Arujá", drp: "DRP02" },\n        { name: "BERTIOGA", drp: "DRP02" }',
+            ))
+
+        output = self.run_command('--prune')
+
+        self.assertIn('Polos adicionados: 2', output)
+        self.assertIn('Polos renomeados: 1', output)
+        self.assertIn('Polos com DRP alterada: 0', output)
+        self.assertIn('Polos removidos: 0', output)
+        self.assertIn('Polos duplicados na mesma DRP (não atualizados nem removidos): 1', output)
+        aruja_drp1.refresh_from_db()
+        aruja_drp2.refresh_from_db()
+        duplicate.refresh_from_db()
+        self.assertEqual((aruja_drp1.nome, aruja_drp1.drp), ("ARUJÁ", drp1))
+        self.assertEqual((aruja_drp2.nome, aruja_drp2.drp), ("Arujá", drp2))
+        self.assertEqual((duplicate.nome, duplicate.drp), ("Aruja", drp1))
+
+    def test_dry_run_nao_grava(self):
+        output = self.run_command('--dry-run')
+        self.assertIn('[dry-run] Polos adicionados: 3', output)
+        self.assertFalse(Polo.objects.exists())
+        self.assertFalse(DRP.objects.exists())
+
+
+class LoadReferenceDataCommandTests(TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmpdir.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return path
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('load_reference_data', *args, stdout=out)
+        return out.getvalue()
+
+    def test_carrega_eixos_json_e_cursos_csv(self):
+        eixos = self.write('eixos.json', json.dumps([{"nome": "Computação"}, {"nome": "Licenciatura"}]))
+        self.run_command('eixo', eixos)
+        self.assertEqual(Eixo.objects.count(), 2)
+
+        cursos = self.write('cursos.csv', "nome,eixo\nCiência de Dados,computacao\nPedagogia,Licenciatura\nX,Inexistente\n")
+        output = self.run_command('curso', cursos, '--batch-size', '1')
+        self.assertIn('Criados: 2', output)
+        self.assertIn('Linhas ignoradas: 1', output)
+        self.assertEqual(Curso.objects.get(nome="Pedagogia").eixo.nome, "Licenciatura")
+
+    def test_cursos_existentes_sao_atualizados_com_numero_constante_de_consultas(self):
+        computacao = Eixo.objects.create(nome="Computação")
+        licenciatura = Eixo.objects.create(nome="Licenciatura")
+        Curso.objects.create(nome="Matemática", eixo=computacao)
+        linhas = [{"nome": "Matemática", "eixo": licenciatura.pk}]
+        linhas += [{"nome": f"Curso {i}", "eixo": "Computação"} for i in range(50)]
+        cursos = self.write('cursos.ndjson', '\n'.join(json.dumps(linha) for linha in linhas))
+
+        # savepoint + 2 pre-cargas + 1 upsert por lote (batch padrao de 500)
+        with self.assertNumQueries(5):
+            output = self.run_command('curso', cursos)
+        self.assertIn('Atualizados: 1', output)
+        self.assertEqual(Curso.objects.get(nome="Matemática").eixo, licenciatura)
+        self.assertEqual(Curso.objects.count(), 51)
+
+    def test_pis_e_tags_idempotentes(self):
+        pis = self.write('pis.json', json.dumps([{"numero": n} for n in range(1, 7)] + [{"numero": 9}]))
+        output = self.run_command('pi', pis)
+        self.assertIn('Criados: 6', output)
+        self.assertIn('Linhas ignoradas: 1', output)
+
+        tags = self.write('tags.ndjson', '{"name": "Python"}\n{"name": "Análise de Dados"}\n{"name": "Python"}\n')
+        self.run_command('tag', tags)
+        output = self.run_command('tag', tags)
+        self.assertIn('Criados: 0', output)
+        self.assertEqual(ProjetoIntegrador.objects.count(), 6)
+        self.assertEqual(Tags.objects.get(name="Análise de Dados").normalized_name, 'analise de dados')
+
+
+class ReconcileGroupCountersCommandTests(GroupFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_academic_data('Contadores')
+        self.group = self.create_group('Grupo Contadores', self.create_user('admin', profile=False))
+        for i in range(2):
+            JoinRequest.objects.create(user=self.create_user(f'pedido{i}', profile=False), project_group=self.group)
+        rejected = self.create_user('rejeitado', profile=False)
+        JoinRequest.objects.create(user=rejected, project_group=self.group, status=JoinRequest.Status.REJECTED)
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('reconcile_group_counters', *args, stdout=out)
+        return out.getvalue()
+
+    def test_corrige_contadores_divergentes(self):
+        output = self.run_command()
+        self.assertIn('Grupos com contadores corrigidos: 1', output)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.member_count, 1)
+        self.assertEqual(self.group.pending_request_count, 2)
+
+        self.assertIn('Grupos com contadores corrigidos: 0', self.run_command())
+
+    def test_dry_run_nao_grava(self):
+        output = self.run_command('--dry-run')
+        self.assertIn('[dry-run] Grupos com contadores corrigidos: 1', output)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.member_count, 0)
+
+
+class PurgeJoinRequestsCommandTests(GroupFixturesMixin, TestCase):
+    def setUp(self):
+        self.create_academic_data('Limpeza')
+        self.groups = [self.create_group(name, member_count=1) for name in ('Grupo A', 'Grupo B')]
+        group_a, group_b = self.groups
+        today = timezone.localdate()
+
+        # Pendente recente, de quem ainda nao tem grupo: deve ficar
+        self.fresh = self.request('recente', group_a, today)
+        # Pendente esquecido ha mais de 90 dias: expira
+        self.forgotten = self.request('esquecido', group_a, today - timedelta(days=120))
+        # Pendentes de quem ja entrou em outro grupo: expiram mesmo sendo recentes
+        member = self.create_user('membro', profile=False)
+        Membership.objects.create(user=member, project_group=group_b)
+        self.stale = JoinRequest.objects.create(user=member, project_group=group_a)
+        # Processados antigos sao removidos; o recente fica
+        self.old_rejected = self.request('rejeitado', group_b, today - timedelta(days=40), JoinRequest.Status.REJECTED)
+        self.old_approved = self.request('aprovado', group_b, today - timedelta(days=40), JoinRequest.Status.APPROVED)
+        self.new_rejected = self.request('novo-rejeitado', group_b, today, JoinRequest.Status.REJECTED)
+        ProjectGroup.objects.filter(pk=group_a.pk).update(pending_request_count=3)
+
+    def request(self, name, group, date_requested, status=JoinRequest.Status.PENDING):
+        user = self.create_user(name, profile=False)
+        join_request = JoinRequest.objects.create(user=user, project_group=group, status=status)
+        # date_requested usa auto_now_add: a data antiga so entra via update()
+        JoinRequest.objects.filter(pk=join_request.pk).update(date_requested=date_requested)
+        return join_request
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('purge_join_requests', *args, stdout=out)
+        return out.getvalue()
+
+    def test_expira_pendentes_e_remove_processados_antigos(self):
+        output = self.run_command('--batch-size', '1')
+        self.assertIn('Pedidos pendentes expirados: 2', output)
+        self.assertIn('Pedidos processados removidos: 2', output)
+
+        # Expirados sao removidos, nao viram rejeicoes; a rejeicao recente feita pelo admin fica intacta
+        self.assertEqual(
+            set(JoinRequest.objects.values_list('pk', 'status')),
+            {
+                (self.fresh.pk, JoinRequest.Status.PENDING),
+                (self.new_rejected.pk, JoinRequest.Status.REJECTED),
+            },
+        )
+        self.groups[0].refresh_from_db()
+        self.assertEqual(self.groups[0].pending_request_count, 1)
+
+        output = self.run_command()
+        self.assertIn('Pedidos pendentes expirados: 0', output)
+        self.assertIn('Pedidos processados removidos: 0', output)
+
+    def test_lotes_tem_numero_constante_de_consultas(self):
+        # Por lote: savepoint, SELECT dos ids, DELETE, 1 UPDATE de contador por grupo e release
+        # (a remocao dos processados nao encontra nada com --processed-days 365)
+        with self.assertNumQueries(5 + 3):
+            self.run_command('--processed-days', '365')
+        self.assertEqual(JoinRequest.objects.filter(status=JoinRequest.Status.PENDING).count(), 1)
+        self.assertEqual(JoinRequest.objects.filter(status=JoinRequest.Status.REJECTED).count(), 2)
+        self.assertEqual(JoinRequest.objects.count(), 4)
+
+    def test_dry_run_nao_grava(self):
+        output = self.run_command('--dry-run')
+        self.assertIn('[dry-run] Pedidos pendentes a expirar: 2', output)
+        self.assertIn('[dry-run] Pedidos processados a remover: 2', output)
+        self.assertEqual(JoinRequest.objects.count(), 6)
+        self.groups[0].refresh_from_db()
+        self.assertEqual(self.groups[0].pending_request_count, 3)
+
+
+class TrimExcessTagsCommandTests(TransactionTestCase):
+    """
+    O excesso de tags so existe antes da migracao 0014 (depois dela o banco impede), entao
+    o teste volta o schema para 0013, onde o serializer antigo permitia mais de 5 tags.
+    """
+    before = [('core', '0013_userprofile_discovery_indexes')]
+
+    def setUp(self):
+        self.migrate(self.before)
+        self.addCleanup(self.migrate, None)
+        apps = MigrationExecutor(connection).loader.project_state(self.before).apps
+        Eixo, Curso = apps.get_model('core', 'Eixo'), apps.get_model('core', 'Curso')
+        user = apps.get_model('core', 'CustomUser').objects.create(email='muitas@test.com', password='x')
+        profile = apps.get_model('core', 'UserProfile').objects.create(
+            user=user, curso=Curso.objects.create(nome='Curso', eixo=Eixo.objects.create(nome='Eixo')),
+        )
+        self.profile_pk = profile.pk
+        Tags, UserTags = apps.get_model('core', 'Tags'), apps.get_model('core', 'UserTags')
+        self.tag_pks = []
+        for i in range(7):
+            tag = Tags.objects.create(name=f'Tag {i}', normalized_name=f'tag {i}', usage_count=1)
+            UserTags.objects.create(profile=profile, tag=tag)
+            self.tag_pks.append(tag.pk)
+
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.migrate(targets or executor.loader.graph.leaf_nodes())
+
+    def run_command(self, *args):
+        out = StringIO()
+        call_command('trim_excess_tags', *args, stdout=out)
+        return out.getvalue()
+
+    def test_migracao_falha_sem_apagar_e_o_comando_remove_o_excesso(self):
+        with self.assertRaisesMessage(RuntimeError, f'{self.profile_pk} (7 tags)'):
+            self.migrate(None)
+        self.migrate(self.before)
+
+        output = self.run_command()
+        self.assertIn(f'Perfil {self.profile_pk}: 2 tag(s) além do limite: {sorted(self.tag_pks[5:])}', output)
+        self.assertIn('[dry-run] Vínculos além do limite: 2', output)
+        self.assertEqual(UserTags.objects.filter(profile_id=self.profile_pk).count(), 7)
+
+        self.assertIn('Vínculos removidos: 2', self.run_command('--delete'))
+        self.assertEqual(
+            sorted(UserTags.objects.filter(profile_id=self.profile_pk).values_list('tag_id', flat=True)),
+            self.tag_pks[:5],
+        )
+        self.assertEqual(dict(Tags.objects.values_list('pk', 'usage_count'))[self.tag_pks[6]], 0)
+
+        self.migrate(None)
+        self.assertEqual(
+            list(UserTags.objects.filter(profile_id=self.profile_pk).order_by('position').values_list('position', flat=True)),
+            [1, 2, 3, 4, 5],
+        )
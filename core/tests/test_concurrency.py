@@ -0,0 +1,241 @@
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from unittest import mock
+
+from django.db import connection
+from django.db.models.signals import pre_save
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from core.views import JoinRequestRejectView
+from core.models import ProjectGroup, Membership, JoinRequest
+from core.tests.fixtures import GroupFixturesMixin
+
+# Comandos de uma entrada direta: leitura, vinculo, UPDATE + INSERT do pedido e contadores
+JOIN_QUERIES = 5
+
+# BEGIN/COMMIT/SAVEPOINT... nao contam no orcamento: em TestCase viram SAVEPOINT/RELEASE
+TRANSACTION_CONTROL = re.compile(r'^\s*(BEGIN|COMMIT|ROLLBACK|SAVEPOINT|RELEASE)', re.IGNORECASE)
+
+
+class ConcurrencyFixturesMixin(GroupFixturesMixin):
+    def create_fixtures(self):
+        self.create_academic_data('Concorrencia')
+        self.admin = self.create_user('admin')
+        self.open_group = self.create_group('Grupo Aberto', self.admin, moderated=False, member_count=1)
+        self.moderated_group = self.create_group(
+            'Grupo Moderado', self.create_user('moderador'), moderated=True, member_count=1,
+        )
+        self.student = self.create_user('aluno')
+
+
+@contextmanager
+def concurrent_insert(instance):
+    """
+    Simula outro request que grava 'instance' entre a leitura e o INSERT da view: ela e
+    gravada logo antes do proximo objeto do mesmo modelo ser salvo. Como entra na mesma
+    transacao da view, tambem e desfeita junto com ela.
+    """
+    model = type(instance)
+
+    def insert_first(sender, **kwargs):
+        pre_save.disconnect(insert_first, sender=model)
+        model.objects.bulk_create([instance])
+
+    pre_save.connect(insert_first, sender=model, weak=False)
+    try:
+        yield
+    finally:
+        pre_save.disconnect(insert_first, sender=model)
+
+
+def concurrent_membership(user, group):
+    """Outro request coloca 'user' em 'group' ao mesmo tempo (ver concurrent_insert)."""
+    return concurrent_insert(Membership(user=user, project_group=group))
+
+
+class ConflictMappingTests(ConcurrencyFixturesMixin, APITestCase):
+    """Conflitos detectados pelas restricoes unicas viram 400, nunca 500."""
+
+    def setUp(self):
+        self.create_fixtures()
+        self.client.force_authenticate(user=self.student)
+
+    def test_entrada_direta_em_uma_consulta_de_leitura(self):
+        # JOIN_QUERIES + SAVEPOINT/RELEASE da transacao (o bump do cache so roda apos o commit)
+        with self.assertNumQueries(JOIN_QUERIES + 2):
+            response = self.client.post(self.join_url(self.open_group))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertCounters(self.open_group, members=2, pending=0)
+
+        with self.assertNumQueries(1):
+            response = self.client.post(self.join_url(self.moderated_group))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_entrada_concorrente_retorna_400(self):
+        with concurrent_membership(self.student, self.moderated_group):
+            response = self.client.post(self.join_url(self.open_group))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(JoinRequest.objects.filter(user=self.student, project_group=self.open_group).exists())
+        self.assertCounters(self.open_group, members=1, pending=0)
+
+    def test_pedido_repetido_e_pedido_rejeitado_reaberto(self):
+        url = self.join_url(self.moderated_group)
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertCounters(self.moderated_group, members=1, pending=1)
+
+        JoinRequest.objects.filter(user=self.student).update(status=JoinRequest.Status.REJECTED)
+        self.moderated_group.pending_request_count = 0
+        self.moderated_group.save(update_fields=['pending_request_count'])
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(JoinRequest.objects.get(user=self.student).status, JoinRequest.Status.PENDING)
+        self.assertCounters(self.moderated_group, members=1, pending=1)
+
+    def test_criacao_de_grupo_concorrente_retorna_400(self):
+        with concurrent_membership(self.student, self.open_group):
+            response = self.client.post(
+                reverse('core:project-group-list-create'), {'name': 'Grupo Novo', 'tags': []}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], 'Você já faz parte de um grupo e não pode criar outro.')
+        self.assertFalse(ProjectGroup.objects.filter(name='Grupo Novo').exists())
+
+    def test_nome_duplicado_concorrente_retorna_erro_no_nome(self):
+        rival = ProjectGroup(
+            name='Grupo Novo', creator=self.create_user('rival'), projeto_integrador=self.pi, drp=self.drp,
+            polo=self.polo, eixo=self.eixo, curso=self.curso,
+        )
+        with concurrent_insert(rival):
+            response = self.client.post(
+                reverse('core:project-group-list-create'), {'name': 'Grupo Novo', 'tags': []}, format='json'
+            )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('name', response.data)
+        self.assertNotIn('detail', response.data)
+        self.assertFalse(Membership.objects.filter(user=self.student).exists())
+
+    def test_aprovacao_repetida_ou_de_quem_ja_tem_grupo(self):
+        join_request = JoinRequest.objects.create(user=self.student, project_group=self.moderated_group)
+        ProjectGroup.objects.filter(pk=self.moderated_group.pk).update(pending_request_count=1)
+        approve = reverse('core:join-request-approve', kwargs={'request_pk': join_request.pk})
+        self.client.force_authenticate(user=self.moderated_group.creator)
+
+        with concurrent_membership(self.student, self.open_group):
+            response = self.client.post(approve)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(JoinRequest.objects.get(pk=join_request.pk).status, JoinRequest.Status.REJECTED)
+        self.assertCounters(self.moderated_group, members=1, pending=0)
+
+        self.assertEqual(self.client.post(approve).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(JoinRequest.objects.get(pk=join_request.pk).status, JoinRequest.Status.REJECTED)
+
+    def test_rejeicao_concorrente_com_aprovacao_nao_sobrescreve(self):
+        join_request = JoinRequest.objects.create(user=self.student, project_group=self.moderated_group)
+        ProjectGroup.objects.filter(pk=self.moderated_group.pk).update(pending_request_count=1)
+        reject = reverse('core:join-request-reject', kwargs={'request_pk': join_request.pk})
+        self.client.force_authenticate(user=self.moderated_group.creator)
+
+        # Outro request aprova o pedido depois que a view de rejeicao ja o leu como pendente
+        check_permissions = JoinRequestRejectView.check_object_permissions
+
+        def approve_meanwhile(view, request, obj):
+            check_permissions(view, request, obj)
+            JoinRequest.objects.filter(pk=join_request.pk).update(status=JoinRequest.Status.APPROVED)
+            ProjectGroup.objects.filter(pk=obj.pk).adjust_counters(pending_requests=-1)
+
+        with mock.patch.object(JoinRequestRejectView, 'check_object_permissions', approve_meanwhile):
+            response = self.client.post(reject)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(JoinRequest.objects.get(pk=join_request.pk).status, JoinRequest.Status.APPROVED)
+        self.assertCounters(self.moderated_group, members=1, pending=0)
+
+
+class ConcurrentJoinStressTests(ConcurrencyFixturesMixin, TransactionTestCase):
+    """
+    Dispara centenas de requests simultaneos para o mesmo grupo e usuario e confere o
+    estado final, os status devolvidos e o numero de consultas de cada request.
+
+    Roda com o banco de testes padrao: no SQLite ele fica em arquivo (TEST.NAME em
+    GruPI/settings.py) para que cada thread abra sua propria conexao.
+    """
+    REQUESTS = 200
+    WORKERS = 20
+    # Maior custo de um request de entrada: JOIN_QUERIES mais o UPDATE + SELECT do bump da
+    # versao do cache, que aqui roda de verdade depois do commit
+    MAX_QUERIES = JOIN_QUERIES + 2
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        if connection.vendor == 'sqlite':
+            # Com BEGIN IMMEDIATE cada transacao pega o lock de escrita ja no inicio: as threads
+            # esperam a vez (OPTIONS.timeout) em vez de colidirem ao promover um lock de leitura.
+            # Fica restrito a estes testes para nao serializar todo atomic() do SQLite de dev.
+            # As conexoes das threads sao criadas com este mesmo settings_dict.
+            patcher = mock.patch.dict(connection.settings_dict['OPTIONS'], transaction_mode='IMMEDIATE')
+            patcher.start()
+            cls.addClassCleanup(patcher.stop)
+
+    def setUp(self):
+        self.create_fixtures()
+
+    def fire(self, user, method, url, data=None):
+        start = threading.Event()
+
+        def request():
+            client = APIClient()
+            client.force_authenticate(user=user)
+            start.wait()
+            try:
+                with CaptureQueriesContext(connection) as queries:
+                    response = getattr(client, method)(url, data, format='json')
+                return response.status_code, sum(
+                    1 for query in queries if not TRANSACTION_CONTROL.match(query['sql'])
+                )
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=self.WORKERS) as executor:
+            futures = [executor.submit(request) for _ in range(self.REQUESTS)]
+            start.set()
+            results = [future.result() for future in futures]
+        return [code for code, _ in results], max(count for _, count in results)
+
+    def test_entradas_simultaneas_em_grupo_aberto(self):
+        codes, max_queries = self.fire(self.student, 'post', self.join_url(self.open_group))
+        self.assertEqual(codes.count(status.HTTP_201_CREATED), 1)
+        self.assertEqual(codes.count(status.HTTP_400_BAD_REQUEST), self.REQUESTS - 1)
+        self.assertLessEqual(max_queries, self.MAX_QUERIES)
+        self.assertEqual(Membership.objects.filter(user=self.student).count(), 1)
+        self.assertEqual(JoinRequest.objects.filter(user=self.student).count(), 1)
+        self.assertCounters(self.open_group, members=2, pending=0)
+
+    def test_pedidos_simultaneos_em_grupo_moderado(self):
+        codes, max_queries = self.fire(self.student, 'post', self.join_url(self.moderated_group))
+        self.assertEqual(codes.count(status.HTTP_202_ACCEPTED), 1)
+        self.assertEqual(codes.count(status.HTTP_400_BAD_REQUEST), self.REQUESTS - 1)
+        self.assertLessEqual(max_queries, self.MAX_QUERIES)
+        self.assertEqual(JoinRequest.objects.filter(user=self.student).count(), 1)
+        self.assertCounters(self.moderated_group, members=1, pending=1)
+
+    def test_aprovacoes_simultaneas_do_mesmo_pedido(self):
+        join_request = JoinRequest.objects.create(user=self.student, project_group=self.moderated_group)
+        ProjectGroup.objects.filter(pk=self.moderated_group.pk).update(pending_request_count=1)
+        url = reverse('core:join-request-approve', kwargs={'request_pk': join_request.pk})
+        codes, _ = self.fire(self.moderated_group.creator, 'post', url)
+        self.assertEqual(codes.count(status.HTTP_200_OK), 1)
+        self.assertEqual(codes.count(status.HTTP_400_BAD_REQUEST), self.REQUESTS - 1)
+        self.assertEqual(Membership.objects.get(user=self.student).project_group, self.moderated_group)
+        self.assertCounters(self.moderated_group, members=2, pending=0)
+
+    def test_criacoes_simultaneas_de_grupo(self):
+        url = reverse('core:project-group-list-create')
+        codes, _ = self.fire(self.student, 'post', url, {'name': 'Grupo Disputado', 'tags': []})
+        self.assertEqual(codes.count(status.HTTP_201_CREATED), 1)
+        self.assertEqual(codes.count(status.HTTP_400_BAD_REQUEST), self.REQUESTS - 1)
+        self.assertEqual(ProjectGroup.objects.filter(name='Grupo Disputado').count(), 1)
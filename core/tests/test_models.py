@@ -1,10 +1,12 @@
 # core/tests/test_models.py
 from django.test import TestCase
 from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction
 from core.models import (
     CustomUser, ProjetoIntegrador, DRP, Polo, Eixo, Curso, Tags,
-    ProjectGroup, ProjectGroupTags, UserProfile, Membership, JoinRequest
+    ProjectGroup, ProjectGroupTags, UserProfile, UserTags, Membership, JoinRequest
 )
+from core.tags import set_tags
 
 class ModelCreationTests(TestCase):
 
@@ -107,3 +109,33 @@ class ModelCreationTests(TestCase):
         )
         self.assertEqual(membership.role, "ADMIN")
         self.assertIn(self.user.email, str(membership))
+
+
+class TagPositionConstraintTests(TestCase):
+
+    def setUp(self):
+        user = CustomUser.objects.create_user(email="posicao@exemplo.com", password="senha123")
+        curso = Curso.objects.create(nome="Curso", eixo=Eixo.objects.create(nome="Eixo"))
+        self.profile = UserProfile.objects.create(user=user, curso=curso)
+        self.tags = [Tags.objects.create(name=f"Tag {i}") for i in range(1, 8)]
+
+    def test_save_ocupa_a_menor_posicao_livre(self):
+        for tag in self.tags[:3]:
+            UserTags.objects.create(profile=self.profile, tag=tag)
+        UserTags.objects.filter(profile=self.profile, position=2).delete()
+        link = UserTags.objects.create(profile=self.profile, tag=self.tags[3])
+        self.assertEqual(link.position, 2)
+
+    def test_banco_rejeita_sexta_tag_mesmo_em_bulk_create(self):
+        set_tags(self.profile, self.tags[:5])
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            UserTags.objects.bulk_create([UserTags(profile=self.profile, tag=self.tags[5], position=6)])
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            UserTags.objects.bulk_create([UserTags(profile=self.profile, tag=self.tags[5], position=3)])
+        self.assertEqual(self.profile.tags.count(), 5)
+
+    def test_set_tags_reaproveita_posicoes_liberadas(self):
+        set_tags(self.profile, self.tags[:5])
+        set_tags(self.profile, [self.tags[0], self.tags[2], self.tags[4], self.tags[5], self.tags[6]])
+        positions = dict(UserTags.objects.filter(profile=self.profile).values_list('tag__name', 'position'))
+        self.assertEqual(positions, {'Tag 1': 1, 'Tag 3': 3, 'Tag 5': 5, 'Tag 6': 2, 'Tag 7': 4})
@@ -3,7 +3,7 @@ from django.contrib.auth import get_user_model
 from rest_framework.request import Request
 from rest_framework.test import APIRequestFactory
 from core.models import ProjectGroup, Membership, DRP, Polo, Eixo, Curso, ProjetoIntegrador
-from core.permissions import IsAdminOfGroup, CanRemoveMembership
+from core.permissions import IsAdminOfGroup, CanRemoveMembership, IsMemberOfGroup
 
 User = get_user_model()
 
@@ -80,3 +80,25 @@ class PermissionTests(TestCase):
         # Outro usuário tentando remover membro — NEGADO
         request.user = self.third_user
         self.assertFalse(permission.has_object_permission(request, None, self.member_membership))
+
+    def test_permissoes_compartilham_o_vinculo_do_request(self):
+        request = Request(self.factory.delete('/'))
+        request.user = self.member_user
+
+        # Um unico SELECT do vinculo (com o grupo) atende as duas permissoes
+        with self.assertNumQueries(1):
+            self.assertTrue(IsMemberOfGroup().has_object_permission(request, None, self.group))
+            self.assertFalse(IsAdminOfGroup().has_object_permission(request, None, self.group))
+            self.assertTrue(IsMemberOfGroup().has_object_permission(request, None, self.group))
+
+        # Trocar o usuario do request descarta o contexto anterior
+        request.user = self.admin_user
+        with self.assertNumQueries(1):
+            self.assertTrue(IsAdminOfGroup().has_object_permission(request, None, self.group))
+
+    def test_can_remove_membership_sem_consultas(self):
+        request = self.factory.delete('/')
+        request.user = self.third_user
+        membership = Membership.objects.select_related('project_group').get(pk=self.member_membership.pk)
+        with self.assertNumQueries(0):
+            self.assertFalse(CanRemoveMembership().has_object_permission(request, None, membership))
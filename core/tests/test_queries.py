@@ -0,0 +1,169 @@
+import uuid
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from core.cache import get_reference_version
+from core.models import Membership, Tags, UserTags
+from core.tests.fixtures import GroupFixturesMixin
+from core.views import PROFILE_BATCH_MAX_USERS
+
+
+class ProjectGroupQueryBudgetTests(GroupFixturesMixin, APITestCase):
+    """
+    Garante que as telas de grupo fazem um numero fixo de consultas,
+    independente de quantos grupos, tags e membros existem.
+    """
+
+    def setUp(self):
+        self.create_academic_data('Consultas')
+        self.tags = [Tags.objects.create(name=f'Tag {i}') for i in range(3)]
+        self.user = self.create_user('consultas', profile=False)
+        self.client.force_authenticate(user=self.user)
+
+    def create_groups(self, total, members_per_group, tags=None):
+        groups = []
+        for i in range(total):
+            creator = self.create_user(f'admin{i}-{total}', profile=False)
+            group = self.create_group(f'Grupo {i} de {total}', creator, tags=self.tags if tags is None else tags)
+            for j in range(members_per_group):
+                member = self.create_user(f'membro{i}-{j}-{total}', profile=False)
+                Membership.objects.create(user=member, project_group=group)
+            groups.append(group)
+        return groups
+
+    def test_lista_de_grupos_tem_custo_fixo(self):
+        url = reverse('core:project-group-list-create')
+        self.create_groups(2, members_per_group=1)
+        # grupos (com JOINs) + tags
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        self.create_groups(6, members_per_group=3)
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 8)
+        self.assertNotIn('memberships', response.data['results'][0])
+
+        # + membros (com usuarios)
+        with self.assertNumQueries(3):
+            response = self.client.get(url, {'expand': 'memberships'})
+        self.assertEqual(len(response.data['results'][0]['memberships']), 4)
+
+    def test_campos_nao_pedidos_nao_sao_consultados(self):
+        url = reverse('core:project-group-list-create')
+        self.create_groups(3, members_per_group=2)
+        with self.assertNumQueries(1) as context:
+            response = self.client.get(url, {'fields': 'id,name,member_count'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name', 'member_count'})
+        sql = context.captured_queries[0]['sql']
+        self.assertNotIn('core_eixo', sql)
+        self.assertNotIn('description', sql)
+
+    def test_detalhe_do_grupo_tem_custo_fixo(self):
+        # Mesmo orcamento com 1 membro e 1 tag e com 4 membros e 3 tags
+        for total, members, tags in ((1, 1, self.tags[:1]), (2, 4, self.tags)):
+            group = self.create_groups(total, members_per_group=members, tags=tags)[-1]
+            with self.assertNumQueries(3):
+                response = self.client.get(reverse('core:project-group-detail', kwargs={'pk': group.pk}))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response.data['creator'], group.creator.email)
+            self.assertEqual(response.data['polo'], str(self.polo))
+            self.assertEqual(len(response.data['memberships']), members + 1)
+            self.assertEqual(len(response.data['tags']), len(tags))
+
+    def test_meu_grupo_tem_custo_fixo(self):
+        for total, members, tags in ((1, 1, self.tags[:1]), (2, 4, self.tags)):
+            group = self.create_groups(total, members_per_group=members, tags=tags)[-1]
+            Membership.objects.update_or_create(user=self.user, defaults={'project_group': group})
+            with self.assertNumQueries(3):
+                response = self.client.get(reverse('core:project-group-me'))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            # membros + admin + o proprio usuario
+            self.assertEqual(len(response.data['memberships']), members + 2)
+            self.assertEqual(len(response.data['tags']), len(tags))
+
+    def test_meu_grupo_sem_vinculo_retorna_404(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('core:project-group-me'))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ProfileQueryBudgetTests(GroupFixturesMixin, APITestCase):
+    def setUp(self):
+        self.create_academic_data('Perfil')
+        self.user = self.create_user('perfil')
+        self.profile = self.user.profile
+        # A ETag usa a versao dos dados de referencia; com o cache frio, a primeira leitura grava
+        # a versao no banco. O orcamento mede o caso comum, com a versao ja em cache
+        get_reference_version()
+        for i in range(4):
+            UserTags.objects.create(profile=self.profile, tag=Tags.objects.create(name=f'Perfil {i}'))
+        self.client.force_authenticate(user=self.user)
+
+    def test_perfil_proprio_em_duas_consultas(self):
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('core:profile-me'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['drp'], 'DRP 1')
+        self.assertEqual(response.data['eixo'], 'Eixo Perfil')
+        self.assertEqual(len(response.data['tags']), 4)
+
+    def test_perfil_de_outro_usuario_em_duas_consultas(self):
+        self.client.force_authenticate(user=self.create_user('visitante', profile=False))
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('core:profile-detail', kwargs={'user_pk': self.user.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['user']['email'], 'perfil@test.com')
+
+    def test_revalidacao_em_uma_consulta(self):
+        etag = self.client.get(reverse('core:profile-me'))['ETag']
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('core:profile-me'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class ProfileBatchTests(GroupFixturesMixin, APITestCase):
+    def setUp(self):
+        self.create_academic_data('Lote')
+        tags = [Tags.objects.create(name=f'Lote {i}') for i in range(3)]
+        self.users = []
+        for i in range(6):
+            user = self.create_user(f'lote{i}')
+            for tag in tags[:i % 3 + 1]:
+                UserTags.objects.create(profile=user.profile, tag=tag)
+            self.users.append(user)
+        self.client.force_authenticate(user=self.users[0])
+        self.url = reverse('core:profile-batch')
+
+    def get_batch(self, users, **params):
+        return self.client.get(self.url, {'users': ','.join(str(user.pk) for user in users), **params})
+
+    def test_consultas_constantes_na_ordem_pedida(self):
+        with self.assertNumQueries(2):
+            response = self.get_batch(self.users[:2])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        users = list(reversed(self.users))
+        with self.assertNumQueries(2):
+            response = self.get_batch(users)
+        self.assertEqual([item['user']['email'] for item in response.data], [user.email for user in users])
+        self.assertEqual(response.data[0]['drp'], 'DRP 1')
+        self.assertEqual(len(response.data[0]['tags']), 3)
+
+    def test_usuarios_sem_perfil_sao_omitidos(self):
+        sem_perfil = self.create_user('loteextra', profile=False)
+        response = self.get_batch([sem_perfil, self.users[1], self.users[1]])
+        self.assertEqual([item['user']['email'] for item in response.data], [self.users[1].email])
+
+    def test_fields_limita_a_carga(self):
+        with self.assertNumQueries(1):
+            response = self.get_batch(self.users, fields='id,curso')
+        self.assertEqual(set(response.data[0]), {'id', 'curso'})
+
+    def test_parametro_invalido_ou_acima_do_limite(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'users': 'abc'}).status_code, status.HTTP_400_BAD_REQUEST)
+        users = ','.join(str(uuid.uuid4()) for _ in range(PROFILE_BATCH_MAX_USERS + 1))
+        self.assertEqual(self.client.get(self.url, {'users': users}).status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,99 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from core.models import ProjetoIntegrador, DRP, Polo, Curso, Eixo, UserTags, Membership, Tags, ProjectGroupTags
+from core.recommendations import get_group_features, score_groups, WEIGHT_PROJETO_INTEGRADOR, WEIGHT_POLO, \
+    WEIGHT_DRP, WEIGHT_CURSO, WEIGHT_EIXO, WEIGHT_TAG
+from core.tests.fixtures import GroupFixturesMixin
+
+
+class RecommendationFixtureMixin(GroupFixturesMixin):
+    def create_base(self):
+        cache.clear()
+        self.create_academic_data('Computação')
+        self.outro_eixo = Eixo.objects.create(nome="Licenciatura")
+        self.curso_irmao = Curso.objects.create(nome="Ciência de Dados", eixo=self.eixo)
+        self.outro_curso = Curso.objects.create(nome="Pedagogia", eixo=self.outro_eixo)
+        self.drp1, self.drp2 = self.drp, DRP.objects.create(numero=2)
+        self.polo_vizinho = Polo.objects.create(nome="Sumaré", drp=self.drp1)
+        self.polo_longe = Polo.objects.create(nome="Santos", drp=self.drp2)
+        self.pi1, self.pi2 = self.pi, ProjetoIntegrador.objects.create(numero=2)
+        self.python = Tags.objects.create(name='Python')
+        self.web = Tags.objects.create(name='Web')
+
+
+class ScoreGroupsTests(RecommendationFixtureMixin, TestCase):
+    def setUp(self):
+        self.create_base()
+
+    def test_pontuacao_combina_criterios(self):
+        completo = self.create_group('Completo', tags=[self.python, self.web])
+        vizinho = self.create_group('Vizinho', polo=self.polo_vizinho, curso=self.curso_irmao)
+        distante = self.create_group('Distante', projeto_integrador=self.pi2, polo=self.polo_longe, curso=self.outro_curso)
+
+        features = get_group_features()
+        scores = dict(zip(features['ids'], score_groups(
+            features, projeto_integrador_id=self.pi1.id, drp_id=self.drp1.id, polo_id=self.polo.id,
+            eixo_id=self.eixo.id, curso_id=self.curso.id, tag_ids=[self.python.id, self.web.id],
+        )))
+        self.assertEqual(
+            scores[completo.id],
+            WEIGHT_PROJETO_INTEGRADOR + WEIGHT_POLO + WEIGHT_CURSO + WEIGHT_EIXO + 2 * WEIGHT_TAG,
+        )
+        self.assertEqual(scores[vizinho.id], WEIGHT_PROJETO_INTEGRADOR + WEIGHT_DRP + WEIGHT_EIXO)
+        self.assertEqual(scores[distante.id], 0)
+
+    def test_caracteristicas_sao_invalidadas_ao_alterar_grupos(self):
+        self.create_group('Primeiro')
+        self.assertEqual(len(get_group_features()['ids']), 1)
+        with self.assertNumQueries(0):
+            get_group_features()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            segundo = self.create_group('Segundo')
+        self.assertEqual(len(get_group_features()['ids']), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ProjectGroupTags.objects.create(project_group=segundo, tag=self.python)
+        features = get_group_features()
+        self.assertIn(self.python.id, features['tag_bits'])
+
+
+class RecommendedProjectGroupsViewTests(RecommendationFixtureMixin, APITestCase):
+    def setUp(self):
+        self.create_base()
+        self.user = self.create_user('aluno')
+        self.profile = self.user.profile
+        UserTags.objects.create(profile=self.profile, tag=self.python)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('core:project-group-recommended')
+
+    def test_grupos_ordenados_por_afinidade(self):
+        self.create_group('Mesmo PI longe', polo=self.polo_longe, curso=self.outro_curso)
+        self.create_group('Mesmo polo e tag', tags=[self.python])
+        self.create_group('Mesmo polo')
+        self.create_group('Sem afinidade', projeto_integrador=self.pi2, polo=self.polo_longe, curso=self.outro_curso)
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [grupo['name'] for grupo in response.data],
+            ['Mesmo polo e tag', 'Mesmo polo', 'Mesmo PI longe'],
+        )
+        self.assertEqual(response.data[-1]['score'], WEIGHT_PROJETO_INTEGRADOR)
+
+        response = self.client.get(self.url, {'limit': 1})
+        self.assertEqual(len(response.data), 1)
+
+    def test_nao_recomenda_o_proprio_grupo(self):
+        grupo = self.create_group('Meu grupo')
+        Membership.objects.create(user=self.user, project_group=grupo)
+        response = self.client.get(self.url)
+        self.assertEqual(response.data, [])
+
+    def test_usuario_sem_perfil(self):
+        outro = self.create_user('semperfil', profile=False)
+        self.client.force_authenticate(user=outro)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
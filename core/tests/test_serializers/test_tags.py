@@ -1,6 +1,11 @@
+from unittest import mock
+
+from django.db import transaction
+from django.db.models import QuerySet
 from django.test import TestCase
 from core.models import *
-from core.serializers import ProjectGroupSerializer
+from core.serializers import ProjectGroupSerializer, ProjectGroupUpdateSerializer
+from core.tags import set_tags
 from django.contrib.auth import get_user_model
 from rest_framework.exceptions import ValidationError
 
@@ -39,3 +44,108 @@ class ProjectGroupSerializerTest(TestCase):
         serializer = ProjectGroupSerializer(instance=group, data=data)
         self.assertFalse(serializer.is_valid())
         self.assertIn('tags', serializer.errors)
+
+
+class SetTagsTest(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create_user(email="tags@faculdade.edu", password="senha123")
+        self.eixo = Eixo.objects.create(nome="Eixo 1")
+        self.drp = DRP.objects.create(numero=1)
+        self.polo = Polo.objects.create(nome="Polo", drp=self.drp)
+        self.curso = Curso.objects.create(nome="Curso", eixo=self.eixo)
+        self.projeto = ProjetoIntegrador.objects.create(numero=1)
+        self.profile = UserProfile.objects.create(user=self.user, polo=self.polo, curso=self.curso)
+        self.tags = [Tags.objects.create(name=f"Tag {i}") for i in range(7)]
+
+    def usage(self):
+        return dict(Tags.objects.values_list('name', 'usage_count'))
+
+    def test_aplica_apenas_a_diferenca(self):
+        set_tags(self.profile, self.tags[:3])
+        added, removed = set_tags(self.profile, self.tags[1:4])
+        self.assertEqual(added, {self.tags[3].pk})
+        self.assertEqual(removed, {self.tags[0].pk})
+        self.assertEqual(set(self.profile.tags.values_list('pk', flat=True)), {t.pk for t in self.tags[1:4]})
+
+        usage = self.usage()
+        self.assertEqual(usage['Tag 0'], 0)
+        self.assertEqual(usage['Tag 1'], 1)
+        self.assertEqual(usage['Tag 3'], 1)
+
+    def test_sem_mudanca_faz_apenas_a_leitura(self):
+        set_tags(self.profile, self.tags[:5])
+        # Apenas a trava do perfil e a leitura das tags atuais (mais o SAVEPOINT/RELEASE da transacao)
+        with self.assertNumQueries(4):
+            self.assertEqual(set_tags(self.profile, [t.pk for t in self.tags[:5]]), (set(), set()))
+
+    def test_remocao_custa_o_mesmo_para_uma_ou_varias_tags(self):
+        # trava, leitura, DELETE, UPDATE dos contadores e touch do perfil (+ SAVEPOINT/RELEASE)
+        set_tags(self.profile, self.tags[:5])
+        with self.assertNumQueries(7):
+            set_tags(self.profile, self.tags[:4])
+        with self.assertNumQueries(7):
+            set_tags(self.profile, [])
+
+        self.assertEqual(self.profile.tags.count(), 0)
+        self.assertEqual(set(self.usage().values()), {0})
+
+    def test_conflito_simultaneo_vira_erro_de_validacao(self):
+        # Simula outra requisicao gravando uma tag na mesma posicao entre a leitura e o INSERT
+        bulk_create = QuerySet.bulk_create
+
+        def concurrent_insert(queryset, objs, *args, **kwargs):
+            UserTags(profile=self.profile, tag=self.tags[6], position=1).save()
+            return bulk_create(queryset, objs, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, 'bulk_create', autospec=True, side_effect=concurrent_insert):
+            with self.assertRaises(ValidationError) as context:
+                set_tags(self.profile, self.tags[:2])
+        self.assertIn('tags', context.exception.detail)
+        self.assertEqual(self.profile.tags.count(), 0)
+
+    def test_tags_gravadas_por_set_tags_ou_save_e_nao_pelo_m2m(self):
+        # add()/set() do M2M nao escolhem a posicao: sao recusados antes de gravar
+        for write in (
+            lambda: self.profile.tags.add(self.tags[0]),
+            lambda: self.tags[0].profiles.add(self.profile),
+            lambda: self.profile.tags.set(self.tags[:2]),
+        ):
+            with self.assertRaises(ValueError), transaction.atomic():
+                write()
+        self.assertEqual(self.profile.tags.count(), 0)
+
+        set_tags(self.profile, self.tags[:2])
+        UserTags.objects.create(profile=self.profile, tag=self.tags[2])
+        self.assertEqual(
+            sorted(UserTags.objects.filter(profile=self.profile).values_list('position', flat=True)), [1, 2, 3]
+        )
+        # remove() do M2M continua valido: o post_delete de cada vinculo ajusta os contadores
+        self.profile.tags.remove(self.tags[0])
+        usage = self.usage()
+        self.assertEqual((usage['Tag 0'], usage['Tag 1'], usage['Tag 2']), (0, 1, 1))
+
+    def test_limite_verificado_uma_vez_sem_gravar(self):
+        set_tags(self.profile, self.tags[:2])
+        with self.assertRaises(ValidationError):
+            set_tags(self.profile, self.tags[:6])
+        self.assertEqual(self.profile.tags.count(), 2)
+
+    def test_atualizacao_do_grupo_reescreve_so_a_diferenca(self):
+        group = ProjectGroup.objects.create(
+            name="Grupo Tags", creator=self.user, projeto_integrador=self.projeto, drp=self.drp,
+            polo=self.polo, eixo=self.eixo, curso=self.curso,
+        )
+        set_tags(group, self.tags[:4])
+        serializer = ProjectGroupUpdateSerializer(
+            instance=group, data={'name': 'Grupo Tags', 'tags': [t.pk for t in self.tags[2:6]]}, partial=True,
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        self.assertEqual(set(group.tags.values_list('pk', flat=True)), {t.pk for t in self.tags[2:6]})
+        self.assertEqual(self.usage()['Tag 0'], 0)
+        self.assertEqual(self.usage()['Tag 5'], 1)
+
+        serializer = ProjectGroupUpdateSerializer(instance=group, data={'tags': [t.pk for t in self.tags]}, partial=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('tags', serializer.errors)
@@ -1,7 +1,12 @@
+from datetime import timedelta
+
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.urls import reverse
-from core.models import CustomUser, ProjetoIntegrador, DRP, Polo, Curso, Eixo, UserProfile, ProjectGroup, Membership, Tags
+from core.models import CustomUser, ProjetoIntegrador, DRP, Polo, Curso, Eixo, UserProfile, ProjectGroup, Membership, Tags, \
+    UserTags, ProjectGroupTags, JoinRequest
+from core.tests.fixtures import GroupFixturesMixin
 
 class ViewsTestCase(APITestCase):
     def setUp(self):
@@ -99,3 +104,513 @@ class ViewsTestCase(APITestCase):
         self.client.force_authenticate(user=user2)
         response = self.client.post(url)
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+
+class PoloSearchTests(APITestCase):
+    def setUp(self):
+        self.drp1 = DRP.objects.create(numero=1)
+        self.drp2 = DRP.objects.create(numero=2)
+        Polo.objects.create(nome="SÃO JOSÉ DOS CAMPOS", drp=self.drp1)
+        Polo.objects.create(nome="SÃO PAULO - VILA RUBI", drp=self.drp1)
+        Polo.objects.create(nome="RIBEIRÃO PIRES", drp=self.drp2)
+        Polo.objects.create(nome="CAMPOS DO JORDÃO", drp=self.drp2)
+
+    def test_busca_ignora_acentos_e_prioriza_prefixo(self):
+        response = self.client.get(reverse('core:polo-list'), {'q': 'campos'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        nomes = [polo['nome'] for polo in response.data]
+        self.assertEqual(nomes, ["CAMPOS DO JORDÃO", "SÃO JOSÉ DOS CAMPOS"])
+
+        response = self.client.get(reverse('core:polo-list'), {'q': 'sao jose'})
+        self.assertEqual([polo['nome'] for polo in response.data], ["SÃO JOSÉ DOS CAMPOS"])
+
+    def test_filtro_por_drp_e_limite(self):
+        response = self.client.get(reverse('core:polo-list'), {'drp': self.drp2.id})
+        self.assertEqual(len(response.data), 2)
+
+        response = self.client.get(reverse('core:polo-list'), {'q': 's', 'limit': 1})
+        self.assertEqual(len(response.data), 1)
+
+    def test_parametro_invalido(self):
+        response = self.client.get(reverse('core:polo-list'), {'drp': 'abc'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TagAutocompleteTests(GroupFixturesMixin, APITestCase):
+    def setUp(self):
+        self.create_academic_data()
+        self.python = Tags.objects.create(name="Python")
+        self.pyspark = Tags.objects.create(name="PySpark")
+        self.php = Tags.objects.create(name="PHP")
+        self.profiles = [self.create_user(f'aluno{i}').profile for i in range(3)]
+
+    def test_contador_atualizado_em_insercao_e_remocao(self):
+        for profile in self.profiles:
+            UserTags.objects.create(profile=profile, tag=self.pyspark)
+        UserTags.objects.create(profile=self.profiles[0], tag=self.python)
+        self.pyspark.refresh_from_db()
+        self.python.refresh_from_db()
+        self.assertEqual(self.pyspark.usage_count, 3)
+        self.assertEqual(self.python.usage_count, 1)
+
+        self.profiles[0].tags.remove(self.pyspark)
+        self.profiles[1].delete()
+        self.pyspark.refresh_from_db()
+        self.assertEqual(self.pyspark.usage_count, 1)
+
+    def test_autocomplete_por_prefixo_ordenado_por_uso(self):
+        for profile in self.profiles[:2]:
+            UserTags.objects.create(profile=profile, tag=self.pyspark)
+        UserTags.objects.create(profile=self.profiles[0], tag=self.python)
+
+        response = self.client.get(reverse('core:tag-autocomplete'), {'q': 'py'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([tag['name'] for tag in response.data], ['PySpark', 'Python'])
+        self.assertEqual(response.data[0]['usage_count'], 2)
+
+        response = self.client.get(reverse('core:tag-autocomplete'), {'q': 'p', 'limit': 1})
+        self.assertEqual([tag['name'] for tag in response.data], ['PySpark'])
+
+
+class ProjectGroupListFilterTests(GroupFixturesMixin, APITestCase):
+    def setUp(self):
+        self.create_academic_data('Filtro')
+        self.user = self.create_user('lista', profile=False)
+        self.client.force_authenticate(user=self.user)
+        self.drp1, self.drp2 = self.drp, DRP.objects.create(numero=2)
+        self.pi1, self.pi2 = self.pi, ProjetoIntegrador.objects.create(numero=2)
+        self.tag_python = Tags.objects.create(name='Python')
+        self.tag_django = Tags.objects.create(name='Django')
+
+        self.grupo_a = self.create_group('Grupo A', projeto_integrador=self.pi1, polo=None, drp=self.drp1)
+        self.grupo_b = self.create_group('Grupo B', projeto_integrador=self.pi1, polo=None, drp=self.drp2, moderated=False)
+        self.grupo_c = self.create_group('Grupo C', projeto_integrador=self.pi2, polo=None, drp=self.drp1)
+        ProjectGroupTags.objects.create(project_group=self.grupo_a, tag=self.tag_python)
+        ProjectGroupTags.objects.create(project_group=self.grupo_a, tag=self.tag_django)
+        ProjectGroupTags.objects.create(project_group=self.grupo_c, tag=self.tag_django)
+
+    def names(self, response):
+        return [grupo['name'] for grupo in response.data['results']]
+
+    def test_lista_paginada_por_cursor(self):
+        url = reverse('core:project-group-list-create')
+        response = self.client.get(url, {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.names(response), ['Grupo C', 'Grupo B'])
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(self.names(response), ['Grupo A'])
+        self.assertIsNone(response.data['next'])
+
+    def test_filtros_academicos(self):
+        url = reverse('core:project-group-list-create')
+        response = self.client.get(url, {'projeto_integrador': self.pi1.id, 'drp': self.drp1.id})
+        self.assertEqual(self.names(response), ['Grupo A'])
+        response = self.client.get(url, {'moderated': 'false'})
+        self.assertEqual(self.names(response), ['Grupo B'])
+
+    def test_filtro_por_tags_nao_duplica_grupos(self):
+        url = reverse('core:project-group-list-create')
+        response = self.client.get(url, {'tags': f'{self.tag_python.id},{self.tag_django.id}'})
+        self.assertEqual(self.names(response), ['Grupo C', 'Grupo A'])
+
+    def test_filtro_invalido_retorna_400(self):
+        url = reverse('core:project-group-list-create')
+        self.assertEqual(self.client.get(url, {'drp': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'tags': '1,a'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {'moderated': 'talvez'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProjectGroupSearchTests(GroupFixturesMixin, APITestCase):
+    def setUp(self):
+        self.create_academic_data('Busca')
+        self.user = self.create_user('busca', profile=False)
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('core:project-group-list-create')
+
+    def names(self, response):
+        return [grupo['name'] for grupo in response.data['results']]
+
+    def test_busca_por_nome_e_descricao_ordenada_por_relevancia(self):
+        self.create_group('Horta comunitária', description='Aplicativo para gestão de hortas')
+        self.create_group('Robótica', description='Braço robótico para separar lixo reciclável')
+        self.create_group('Sensores', description='Estação meteorológica com sensores de umidade para a horta da escola')
+
+        response = self.client.get(self.url, {'search': 'horta'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.names(response), ['Horta comunitária', 'Sensores'])
+
+        # Sem acentos e por prefixo
+        response = self.client.get(self.url, {'search': 'robo'})
+        self.assertEqual(self.names(response), ['Robótica'])
+
+    def test_indice_acompanha_alteracoes_e_remocoes(self):
+        grupo = self.create_group('Biblioteca', description='Catálogo de livros')
+        grupo.description = 'Empréstimo de bicicletas'
+        grupo.save()
+        self.assertEqual(self.names(self.client.get(self.url, {'search': 'livros'})), [])
+        self.assertEqual(self.names(self.client.get(self.url, {'search': 'bicicleta'})), ['Biblioteca'])
+
+        grupo.delete()
+        self.assertEqual(self.names(self.client.get(self.url, {'search': 'bicicleta'})), [])
+
+    def test_busca_combinada_com_paginacao(self):
+        for i in range(3):
+            self.create_group(f'Reciclagem {i}', description='Coleta seletiva')
+        response = self.client.get(self.url, {'search': 'reciclagem', 'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+
+    def test_busca_sem_palavras_nao_retorna_nada(self):
+        self.create_group('Qualquer', description='Grupo')
+        self.assertEqual(self.names(self.client.get(self.url, {'search': '%%'})), [])
+
+
+class ProjectGroupCountersTests(GroupFixturesMixin, APITestCase):
+    def setUp(self):
+        self.create_academic_data('Contadores')
+        self.admin = self.create_user('admin')
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(reverse('core:project-group-list-create'), {'name': 'Grupo Contado', 'tags': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['member_count'], 1)
+        self.group = ProjectGroup.objects.get(name='Grupo Contado')
+
+    def join(self, user):
+        self.client.force_authenticate(user=user)
+        return self.client.post(self.join_url(self.group))
+
+    def test_contadores_acompanham_pedidos_e_membros(self):
+        aluno1, aluno2 = self.create_user('aluno1'), self.create_user('aluno2')
+        self.assertEqual(self.join(aluno1).status_code, status.HTTP_202_ACCEPTED)
+        self.join(aluno2)
+        self.assertCounters(self.group, members=1, pending=2)
+
+        self.client.force_authenticate(user=self.admin)
+        approve = reverse('core:join-request-approve', kwargs={'request_pk': JoinRequest.objects.get(user=aluno1).pk})
+        self.assertEqual(self.client.post(approve).status_code, status.HTTP_200_OK)
+        self.assertCounters(self.group, members=2, pending=1)
+
+        reject = reverse('core:join-request-reject', kwargs={'request_pk': JoinRequest.objects.get(user=aluno2).pk})
+        self.assertEqual(self.client.post(reject).status_code, status.HTTP_200_OK)
+        self.assertCounters(self.group, members=2, pending=0)
+
+        self.client.force_authenticate(user=aluno1)
+        self.assertEqual(self.client.post(reverse('core:leave-group')).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertCounters(self.group, members=1, pending=0)
+
+    def test_grupo_sem_moderacao_e_remocao_de_membro(self):
+        ProjectGroup.objects.filter(pk=self.group.pk).update(moderated=False)
+        aluno = self.create_user('aluno')
+        self.assertEqual(self.join(aluno).status_code, status.HTTP_201_CREATED)
+        self.assertCounters(self.group, members=2, pending=0)
+
+        self.client.force_authenticate(user=self.admin)
+        url = reverse('core:project-group-member-delete', kwargs={'group_pk': self.group.pk, 'user_pk': aluno.pk})
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertCounters(self.group, members=1, pending=0)
+
+
+class SparseFieldsetTests(GroupFixturesMixin, APITestCase):
+    def setUp(self):
+        self.create_academic_data('Campos')
+        self.user = self.create_user('campos')
+        self.group = self.create_group('Grupo Campos', self.user, description='Descrição longa')
+        self.client.force_authenticate(user=self.user)
+
+    def test_lista_usa_resumo(self):
+        response = self.client.get(reverse('core:project-group-list-create'))
+        grupo = response.data['results'][0]
+        self.assertIn('member_count', grupo)
+        self.assertNotIn('description', grupo)
+        self.assertNotIn('memberships', grupo)
+
+        response = self.client.get(reverse('core:project-group-list-create'), {'fields': 'name,description'})
+        self.assertEqual(response.data['results'][0], {'name': 'Grupo Campos', 'description': 'Descrição longa'})
+
+    def test_detalhe_continua_completo_e_aceita_fields(self):
+        url = reverse('core:project-group-detail', kwargs={'pk': self.group.pk})
+        response = self.client.get(url)
+        self.assertIn('memberships', response.data)
+        self.assertEqual(response.data['description'], 'Descrição longa')
+
+        response = self.client.get(url, {'fields': 'id,memberships'})
+        self.assertEqual(set(response.data), {'id', 'memberships'})
+
+    def test_perfil_aceita_fields(self):
+        response = self.client.get(reverse('core:profile-me'), {'fields': 'polo,curso,campo_inexistente'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(dict(response.data), {'polo': 'Polo Campos', 'curso': 'Curso Campos'})
+
+    def test_fields_nao_descarta_dados_da_escrita(self):
+        tag = Tags.objects.create(name='Python')
+        self.client.force_authenticate(user=self.create_user('criador'))
+        response = self.client.post(
+            reverse('core:project-group-list-create') + '?fields=id,name',
+            {'name': 'Grupo Novo', 'description': 'Descrição enviada', 'tags': [tag.pk]}, format='json',
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['description'], 'Descrição enviada')
+        group = ProjectGroup.objects.get(name='Grupo Novo')
+        self.assertEqual(group.description, 'Descrição enviada')
+        self.assertEqual(list(group.tags.all()), [tag])
+
+
+class ProjectGroupOrderingTests(GroupFixturesMixin, APITestCase):
+    def setUp(self):
+        self.create_academic_data('Ordem')
+        self.antigo = self.create_group('Antigo', moderated=False)
+        self.novo = self.create_group('Novo')
+        self.url = reverse('core:project-group-list-create')
+
+    def names(self, ordering=None):
+        params = {'ordering': ordering} if ordering else {}
+        return [grupo['name'] for grupo in self.client.get(self.url, params).data['results']]
+
+    def test_ordenacao_por_criacao_e_atividade(self):
+        aluno = self.create_user('aluno', profile=False)
+        self.client.force_authenticate(user=self.antigo.creator)
+        self.assertEqual(self.names(), ['Novo', 'Antigo'])
+        self.assertEqual(self.names('active'), ['Novo', 'Antigo'])
+
+        # Entrada de membro atualiza a atividade do grupo
+        self.client.force_authenticate(user=aluno)
+        response = self.client.post(reverse('core:project-group-join', kwargs={'group_pk': self.antigo.pk}))
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.names('newest'), ['Novo', 'Antigo'])
+        self.assertEqual(self.names('active'), ['Antigo', 'Novo'])
+
+    def test_edicao_atualiza_atividade(self):
+        before = self.novo.last_activity_at
+        self.client.force_authenticate(user=self.antigo.creator)
+        url = reverse('core:project-group-detail', kwargs={'pk': self.antigo.pk})
+        response = self.client.patch(url, {'description': 'Nova descrição', 'tags': []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.antigo.refresh_from_db()
+        self.assertGreater(self.antigo.last_activity_at, before)
+        self.assertEqual(self.names('active'), ['Antigo', 'Novo'])
+
+    def test_ordenacao_invalida(self):
+        self.client.force_authenticate(user=self.antigo.creator)
+        response = self.client.get(self.url, {'ordering': 'name'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProfileConditionalTests(GroupFixturesMixin, APITestCase):
+    def setUp(self):
+        self.create_academic_data('ETag')
+        self.user = self.create_user('etag')
+        self.profile = self.user.profile
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse('core:profile-detail', kwargs={'user_pk': self.user.pk})
+
+    def test_respostas_tem_etag_sem_last_modified(self):
+        response = self.client.get(self.url)
+        self.assertIn('ETag', response)
+        # A ETag depende tambem da versao dos dados de referencia; uma data so do perfil seria enganosa
+        self.assertNotIn('Last-Modified', response)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_MODIFIED_SINCE='Sun, 01 Jan 2090 00:00:00 GMT').status_code,
+            status.HTTP_200_OK,
+        )
+
+    def test_etag_muda_quando_o_perfil_muda(self):
+        etag = self.client.get(self.url)['ETag']
+
+        UserTags.objects.create(profile=self.profile, tag=Tags.objects.create(name='Nova'))
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['tags']), 1)
+
+        etag = response['ETag']
+        self.user.first_name = 'Maria'
+        self.user.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+        etag = self.client.get(self.url)['ETag']
+        self.polo.nome = 'Polo Renomeado'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.polo.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.data['polo'], 'Polo Renomeado')
+
+    def test_usuario_sem_perfil_retorna_404(self):
+        self.client.force_authenticate(user=self.create_user('semperfil', profile=False))
+        self.assertEqual(self.client.get(reverse('core:profile-me')).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ProfileAvailableListTests(GroupFixturesMixin, APITestCase):
+    def setUp(self):
+        self.create_academic_data('Busca')
+        self.outro_curso = Curso.objects.create(nome="Outro Curso", eixo=Eixo.objects.create(nome="Outro Eixo"))
+        self.outro_polo = Polo.objects.create(nome="Outro Polo", drp=DRP.objects.create(numero=2))
+        self.tag = Tags.objects.create(name='Python')
+
+        self.admin = self.create_user('admin')
+        grupo = self.create_group('Grupo', self.admin)
+        Membership.objects.create(user=self.create_user('membro'), project_group=grupo)
+
+        # Contas nascem inativas (is_active=False) ate o e-mail ser verificado
+        self.ana = self.create_user('ana', is_active=True)
+        self.bia = self.create_user('bia', profile={'polo': self.outro_polo}, is_active=True)
+        self.caio = self.create_user('caio', profile={'curso': self.outro_curso}, is_active=True)
+        self.create_user('inativo')
+        UserTags.objects.create(profile=self.bia.profile, tag=self.tag)
+
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse('core:profile-available')
+
+    def emails(self, response):
+        return {perfil['user']['email'] for perfil in response.data['results']}
+
+    def test_lista_apenas_alunos_ativos_sem_grupo(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.emails(response), {'ana@test.com', 'bia@test.com', 'caio@test.com'})
+
+    def test_filtros_academicos_e_tags(self):
+        self.assertEqual(self.emails(self.client.get(self.url, {'drp': self.drp.pk})), {'ana@test.com', 'caio@test.com'})
+        self.assertEqual(self.emails(self.client.get(self.url, {'eixo': self.eixo.pk})), {'ana@test.com', 'bia@test.com'})
+        self.assertEqual(
+            self.emails(self.client.get(self.url, {'polo': self.polo.pk, 'curso': self.curso.pk})), {'ana@test.com'}
+        )
+        self.assertEqual(self.emails(self.client.get(self.url, {'tags': str(self.tag.pk)})), {'bia@test.com'})
+        self.assertEqual(self.client.get(self.url, {'polo': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_paginacao_por_cursor_em_consultas_constantes(self):
+        # vinculo do usuario (permissao), perfis e tags
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        vistos = self.emails(response)
+
+        # Editar um perfil entre as paginas nao muda a posicao dele no cursor
+        UserProfile.objects.filter(user__email__in=vistos).update(updated_at=timezone.now())
+        UserProfile.objects.exclude(user__email__in=vistos).update(updated_at=timezone.now() - timedelta(days=1))
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(vistos | self.emails(response), {'ana@test.com', 'bia@test.com', 'caio@test.com'})
+
+    def test_apenas_administradores_de_grupo(self):
+        self.client.force_authenticate(user=self.ana)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        membro = CustomUser.objects.get(email='membro@test.com')
+        self.client.force_authenticate(user=membro)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class JoinRequestBulkActionTests(GroupFixturesMixin, APITestCase):
+    def setUp(self):
+        self.create_academic_data('Lote')
+        self.admin = self.create_user('adminlote', profile=False)
+        self.group = self.create_group('Grupo Lote', self.admin)
+        self.alunos = [self.create_user(f'pedido{i}', profile=False) for i in range(4)]
+        self.requests = [JoinRequest.objects.create(user=aluno, project_group=self.group) for aluno in self.alunos]
+        ProjectGroup.objects.filter(pk=self.group.pk).update(member_count=1, pending_request_count=4)
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse('core:join-request-bulk')
+
+    def results(self, response):
+        return {item['id']: item['result'] for item in response.data['results']}
+
+    def test_aprovacao_em_lote_informa_o_resultado_de_cada_pedido(self):
+        # aluno 2 ja entrou em outro grupo; o pedido 3 ja foi rejeitado antes
+        outro = self.create_group('Outro Grupo')
+        Membership.objects.create(user=self.alunos[2], project_group=outro)
+        JoinRequest.objects.filter(pk=self.requests[3].pk).update(status=JoinRequest.Status.REJECTED)
+        de_outro_grupo = JoinRequest.objects.create(user=self.alunos[0], project_group=outro)
+
+        ids = [jr.pk for jr in self.requests] + [de_outro_grupo.pk, 99999]
+        response = self.client.post(self.url, {'ids': ids, 'action': 'approve'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.results(response), {
+            self.requests[0].pk: 'approved',
+            self.requests[1].pk: 'approved',
+            self.requests[2].pk: 'already_member',
+            self.requests[3].pk: 'already_processed',
+            de_outro_grupo.pk: 'not_found',
+            99999: 'not_found',
+        })
+        self.assertEqual(
+            set(Membership.objects.filter(project_group=self.group).values_list('user__email', flat=True)),
+            {'adminlote@test.com', 'pedido0@test.com', 'pedido1@test.com'},
+        )
+        self.assertEqual(JoinRequest.objects.get(pk=self.requests[2].pk).status, JoinRequest.Status.REJECTED)
+        self.group.refresh_from_db()
+        self.assertEqual((self.group.member_count, self.group.pending_request_count), (3, 1))
+
+    def test_rejeicao_em_lote_com_numero_fixo_de_consultas(self):
+        ids = [jr.pk for jr in self.requests]
+        # vinculo do admin (reaproveitado pela permissao), SELECT ... FOR UPDATE, UPDATE dos pedidos
+        # e dos contadores (+ savepoint)
+        with self.assertNumQueries(6):
+            response = self.client.post(self.url, {'ids': ids, 'action': 'reject'}, format='json')
+        self.assertEqual(set(self.results(response).values()), {'rejected'})
+        self.assertFalse(JoinRequest.objects.filter(status=JoinRequest.Status.PENDING).exists())
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.pending_request_count, 0)
+
+    def test_apenas_admin_e_dados_validos(self):
+        invalid = self.client.post(self.url, {'ids': [], 'action': 'approve'}, format='json')
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+        invalid = self.client.post(self.url, {'ids': [1], 'action': 'delete'}, format='json')
+        self.assertEqual(invalid.status_code, status.HTTP_400_BAD_REQUEST)
+
+        membro = self.alunos[0]
+        Membership.objects.create(user=membro, project_group=self.group)
+        self.client.force_authenticate(user=membro)
+        response = self.client.post(self.url, {'ids': [self.requests[1].pk], 'action': 'approve'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(user=self.alunos[1])
+        response = self.client.post(self.url, {'ids': [self.requests[1].pk], 'action': 'approve'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class JoinRequestListTests(GroupFixturesMixin, APITestCase):
+    def setUp(self):
+        self.create_academic_data('Pedidos')
+        self.admin = self.create_user('adminpedidos', profile=False)
+        self.groups = [
+            self.create_group('Grupo Pedidos 0', self.admin),
+            self.create_group('Grupo Pedidos 1', self.create_user('outroadmin', profile=False)),
+        ]
+        self.aluno = self.create_user('alunopedidos', profile=False)
+        JoinRequest.objects.create(user=self.aluno, project_group=self.groups[1], status=JoinRequest.Status.REJECTED)
+        for i in range(5):
+            user = self.aluno if i == 0 else self.create_user(f'pedinte{i}', profile=False)
+            JoinRequest.objects.create(user=user, project_group=self.groups[0])
+        JoinRequest.objects.filter(user__email='pedinte4@test.com').update(status=JoinRequest.Status.APPROVED)
+
+    def test_lista_do_grupo_paginada_sem_consultas_por_linha(self):
+        self.client.force_authenticate(user=self.admin)
+        url = reverse('core:join-request-list')
+        with self.assertNumQueries(2):
+            response = self.client.get(url, {'page_size': 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data['results']), 3)
+        self.assertEqual(response.data['results'][0]['project_group'], 'Grupo Pedidos 0')
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertIsNone(response.data['next'])
+
+    def test_lista_do_grupo_exige_vinculo(self):
+        self.client.force_authenticate(user=self.aluno)
+        self.assertEqual(self.client.get(reverse('core:join-request-list')).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_pedidos_proprios_filtrados_por_status(self):
+        self.client.force_authenticate(user=self.aluno)
+        url = reverse('core:join-request-me')
+        with self.assertNumQueries(1):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data['results']), 2)
+
+        response = self.client.get(url, {'status': 'pending'})
+        self.assertEqual([jr['project_group'] for jr in response.data['results']], ['Grupo Pedidos 0'])
+        self.assertEqual(self.client.get(url, {'status': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
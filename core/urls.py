@@ -4,7 +4,8 @@ from .views import EixoListView, PoloListView, DRPListView, CursoListView, Proje
     MembershipDeleteView, ProjectGroupSelfView, LeaveGroupView, JoinGroupView, ProjectGroupMembersListView, \
     JoinRequestListView, JoinRequestApproveView, JoinRequestRejectView, JoinRequestSelfView, PasswordResetRequestView, \
     PasswordResetValidateOTPView, PasswordResetSetNewPasswordView, RegistrationValidateOTPView, RegistrationRequestOTPView, \
-    AccountInactiveView
+    AccountInactiveView, ReferenceDataView, TagAutocompleteView, RecommendedProjectGroupsView, ProjectGroupFacetsView, \
+    ProfileBatchView, ProfileAvailableListView, JoinRequestBulkActionView
 
 app_name = 'core'
 
@@ -16,18 +17,24 @@ urlpatterns = [
     path('cursos/', CursoListView.as_view(), name='curso-list'),
     path('pis/', ProjetoIntegradorListView.as_view(), name='pi-list'),
     path('tags/', TagsListView.as_view(), name='tag-list'),
+    path('tags/autocomplete/', TagAutocompleteView.as_view(), name='tag-autocomplete'),
+    path('reference-data/', ReferenceDataView.as_view(), name='reference-data'),
 
     # --- Perfis de Usuário (Recurso: 'profiles') ---
     path('profiles/me/', ProfileSelfView.as_view(), name='profile-me'),
     path('profiles/me/tags/', UserTagsListView.as_view(), name='profile-me-tags'),
+    path('profiles/batch/', ProfileBatchView.as_view(), name='profile-batch'),
+    path('profiles/available/', ProfileAvailableListView.as_view(), name='profile-available'),
     path('profiles/<uuid:user_pk>/', ProfileDetailsView.as_view(), name='profile-detail'),
     # <-- 'user' mudado para 'user_pk' por clareza
 
     # --- Grupos de Projeto (Recurso: 'project-groups') ---
     path('project-groups/', ProjectGroupView.as_view(), name='project-group-list-create'),
     path('project-groups/me/', ProjectGroupSelfView.as_view(), name='project-group-me'),
+    path('project-groups/recommended/', RecommendedProjectGroupsView.as_view(), name='project-group-recommended'),
+    path('project-groups/facets/', ProjectGroupFacetsView.as_view(), name='project-group-facets'),
     path('project-groups/<int:pk>/', ProjectGroupDetailView.as_view(), name='project-group-detail'),
-    path('project-groups/<int:pk>/join/', JoinGroupView.as_view(), name='project-group-join'),
+    path('project-groups/<int:group_pk>/join/', JoinGroupView.as_view(), name='project-group-join'),
 
     # --- Membros (Aninhado sob 'project-groups') ---
     path('project-groups/<int:group_pk>/members/', ProjectGroupMembersListView.as_view(), name='project-group-member-list'),
@@ -36,8 +43,9 @@ urlpatterns = [
     # --- Pedidos de Entrada (Recurso: 'join-requests') ---
     path('join-requests/', JoinRequestListView.as_view(), name='join-request-list'),
     path('join-requests/me/', JoinRequestSelfView.as_view(), name='join-request-me'),
-    path('join-requests/<int:pk>/approve/', JoinRequestApproveView.as_view(), name='join-request-approve'),
-    path('join-requests/<int:pk>/reject/', JoinRequestRejectView.as_view(), name='join-request-reject'),
+    path('join-requests/bulk/', JoinRequestBulkActionView.as_view(), name='join-request-bulk'),
+    path('join-requests/<int:request_pk>/approve/', JoinRequestApproveView.as_view(), name='join-request-approve'),
+    path('join-requests/<int:request_pk>/reject/', JoinRequestRejectView.as_view(), name='join-request-reject'),
 
     # --- Ações de Nível Superior ---
     path('leave-group/', LeaveGroupView.as_view(), name='leave-group'),
@@ -0,0 +1,28 @@
+# core/utils.py
+import unicodedata
+
+
+def normalize_text(value):
+    """
+    Normaliza um texto para buscas: remove acentos, ignora caixa e espacos repetidos.
+
+    Ex.: '  São  José dos Campos ' -> 'sao jose dos campos'
+    """
+    if not value:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', value)
+    without_accents = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(without_accents.casefold().split())
+
+
+def violates_unique(error, model, field_name):
+    """
+    Diz se o IntegrityError 'error' veio de uma restricao unica que envolve 'model.field_name'.
+
+    O Postgres cita a restricao pelo nome ('core_projectgroup_name_key') e o SQLite pela
+    coluna ('core_projectgroup.name'); os dois comecam com a tabela e a coluna.
+    """
+    table = model._meta.db_table
+    column = model._meta.get_field(field_name).column
+    message = str(error)
+    return f'{table}.{column}' in message or f'{table}_{column}' in message
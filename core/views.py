@@ -5,10 +5,12 @@ from datetime import timedelta
 from datetime import datetime
 from django.template.defaulttags import querystring
 from django.core.mail import send_mail
-from django.http import Http404
+from django.http import Http404, HttpResponse
 from django.db import transaction, IntegrityError
+from django.db.models import Exists, OuterRef
 from django.conf import settings
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
 from rest_framework import generics, serializers, permissions, status
 from drf_spectacular.utils import extend_schema_field, extend_schema, extend_schema_view, OpenApiResponse, OpenApiParameter
 from drf_spectacular.types import OpenApiTypes
@@ -16,13 +18,56 @@ from rest_framework.views import APIView
 from rest_framework.generics import get_object_or_404
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.renderers import JSONRenderer
 from .models import Eixo, Polo, DRP, Curso, ProjetoIntegrador, Tags, UserProfile, UserTags, ProjectGroup, Membership, \
     CustomUser, JoinRequest, OTP
-from .permissions import IsAdminOfGroup, CanRemoveMembership, IsMemberOfGroup
+from .permissions import IsAdminOfGroup, CanRemoveMembership, IsMemberOfGroup, IsAdminOfAnyGroup
+from .context import get_request_context
+from .filters import choice_query_param, int_query_param, uuid_list_query_param, filter_profiles, filter_project_groups, \
+    project_group_filters, apply_project_group_filters, project_group_facets, project_group_filters_key
+from .pagination import JoinRequestCursorPagination, ProfileCursorPagination, ProjectGroupCursorPagination
+from .recommendations import recommend_group_ids
+from .utils import violates_unique
+from .cache import get_reference_version, get_reference_etag, get_reference_payload, build_encoded_variants, \
+    get_project_groups_payload, make_etag, bump_project_groups_version
 from .serializers import *
 from premailer import transform
 from django.template.loader import render_to_string
 
+
+class ReferenceDataCacheMixin:
+    """
+    Serve a lista de dados de referencia a partir do cache versionado (core/cache.py).
+
+    A resposta leva um ETag derivado da versao, entao um cliente que ja tem a lista
+    recebe 304 sem que o banco ou o serializer sejam tocados.
+    """
+    reference_name = None
+
+    def use_reference_cache(self, request):
+        return True
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_reference_cache(request):
+            return super().list(request, *args, **kwargs)
+
+        version = get_reference_version()
+        etag = get_reference_etag(self.reference_name, version)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            data = get_reference_payload(self.reference_name, self.build_reference_payload, version)
+            response = Response(data)
+
+        response['ETag'] = etag
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    def build_reference_payload(self):
+        queryset = self.filter_queryset(self.get_queryset())
+        # Convertemos para lista simples para que o payload possa ser guardado no cache
+        return list(self.get_serializer(queryset, many=True).data)
+
 @extend_schema_view(
     get=extend_schema(
         summary="Listar eixos",
@@ -31,21 +76,52 @@ from django.template.loader import render_to_string
         responses={200: EixoSerializer(many=True)}
     )
 )
-class EixoListView(generics.ListAPIView):
+class EixoListView(ReferenceDataCacheMixin, generics.ListAPIView):
+    reference_name = 'eixos'
     queryset = Eixo.objects.all()
     serializer_class = EixoSerializer
 
 @extend_schema_view(
     get=extend_schema(
         summary="Listar polos",
-        description="Retorna lista de todos os polos presenciais com suas DRPs.",
+        description=(
+            "Retorna lista de todos os polos presenciais com suas DRPs.\n\n"
+            "Sem parâmetros a lista completa é servida do cache. Para autocomplete use `q` "
+            "(busca por prefixo/substring, sem acentos), `drp` e `limit`."
+        ),
         tags=['Dados Acadêmicos'],
+        parameters=[
+            OpenApiParameter(name='q', type=OpenApiTypes.STR, description='Trecho do nome do polo (ignora acentos e caixa)'),
+            OpenApiParameter(name='drp', type=OpenApiTypes.INT, description='ID da DRP'),
+            OpenApiParameter(name='limit', type=OpenApiTypes.INT, description='Número máximo de polos retornados (máx. 100)'),
+        ],
         responses={200: PoloSerializer(many=True)}
     )
 )
-class PoloListView(generics.ListAPIView):
-    queryset = Polo.objects.all()
+class PoloListView(ReferenceDataCacheMixin, generics.ListAPIView):
+    reference_name = 'polos'
+    queryset = Polo.objects.select_related('drp')
     serializer_class = PoloSerializer
+    max_limit = 100
+
+    def use_reference_cache(self, request):
+        return not any(param in request.query_params for param in ('q', 'drp', 'limit'))
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+
+        drp = int_query_param(self.request, 'drp')
+        if drp is not None:
+            queryset = queryset.filter(drp_id=drp)
+
+        term = self.request.query_params.get('q')
+        if term:
+            queryset = queryset.search(term)
+
+        limit = int_query_param(self.request, 'limit')
+        if limit is not None:
+            queryset = queryset[:max(1, min(limit, self.max_limit))]
+        return queryset
 
 @extend_schema_view(
     get=extend_schema(
@@ -55,7 +131,8 @@ class PoloListView(generics.ListAPIView):
         responses={200: DRPSerializer(many=True)}
     )
 )
-class DRPListView(generics.ListAPIView):
+class DRPListView(ReferenceDataCacheMixin, generics.ListAPIView):
+    reference_name = 'drps'
     queryset = DRP.objects.all()
     serializer_class = DRPSerializer
 
@@ -67,8 +144,9 @@ class DRPListView(generics.ListAPIView):
         responses={200: CursoSerializer(many=True)}
     )
 )
-class CursoListView(generics.ListAPIView):
-    queryset = Curso.objects.all()
+class CursoListView(ReferenceDataCacheMixin, generics.ListAPIView):
+    reference_name = 'cursos'
+    queryset = Curso.objects.select_related('eixo')
     serializer_class = CursoSerializer
 
 @extend_schema_view(
@@ -79,7 +157,8 @@ class CursoListView(generics.ListAPIView):
         responses={200: ProjetoIntegradorSerializer(many=True)}
     )
 )
-class ProjetoIntegradorListView(generics.ListAPIView):
+class ProjetoIntegradorListView(ReferenceDataCacheMixin, generics.ListAPIView):
+    reference_name = 'pis'
     queryset = ProjetoIntegrador.objects.all()
     serializer_class = ProjetoIntegradorSerializer
 
@@ -91,15 +170,164 @@ class ProjetoIntegradorListView(generics.ListAPIView):
         responses={200: TagSerializer(many=True)}
     )
 )
-class TagsListView(generics.ListAPIView):
+class TagsListView(ReferenceDataCacheMixin, generics.ListAPIView):
+    reference_name = 'tags'
     queryset = Tags.objects.all()
     serializer_class = TagSerializer
 
+@extend_schema_view(
+    get=extend_schema(
+        summary="Autocomplete de tags",
+        description=(
+            "Retorna as tags cujo nome começa com `q` (ignorando acentos e caixa), "
+            "ordenadas pela quantidade de perfis e grupos que as usam."
+        ),
+        tags=['Dados Acadêmicos'],
+        parameters=[
+            OpenApiParameter(name='q', type=OpenApiTypes.STR, description='Início do nome da tag'),
+            OpenApiParameter(name='limit', type=OpenApiTypes.INT, description='Número máximo de tags retornadas (padrão 10, máx. 50)'),
+        ],
+        responses={200: TagAutocompleteSerializer(many=True)}
+    )
+)
+class TagAutocompleteView(generics.ListAPIView):
+    serializer_class = TagAutocompleteSerializer
+    default_limit = 10
+    max_limit = 50
+
+    def get_queryset(self):
+        limit = int_query_param(self.request, 'limit') or self.default_limit
+        queryset = Tags.objects.autocomplete(self.request.query_params.get('q', ''))
+        return queryset[:max(1, min(limit, self.max_limit))]
+
+# Ordem de preferencia das codificacoes pre-comprimidas
+REFERENCE_DATA_ENCODINGS = ('br', 'gzip')
+
+def _accepted_encodings(request):
+    """Retorna as codificacoes aceitas pelo cliente (ignorando as marcadas com q=0)."""
+    accepted = set()
+    for item in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = item.partition(';')
+        coding = coding.strip().lower()
+        quality = params.strip()
+        if quality.startswith('q='):
+            try:
+                if float(quality[2:]) == 0:
+                    continue
+            except ValueError:
+                continue
+        if coding:
+            accepted.add(coding)
+    return accepted
+
+class ReferenceDataView(APIView):
+    """
+    Documento unico com eixos (e seus cursos), DRPs (e seus polos), PIs e tags.
+
+    O JSON e montado uma vez por versao dos dados de referencia, ja em bytes e com
+    as variantes gzip/brotli prontas; cada requisicao apenas escolhe a variante.
+    """
+    @extend_schema(
+        summary="Obter todos os dados acadêmicos",
+        description=(
+            "Retorna em um único documento todos os dados necessários para as telas de cadastro e perfil: "
+            "eixos com seus cursos, DRPs com seus polos, Projetos Integradores e tags.\n\n"
+            "A resposta suporta `If-None-Match` (304) e compressão gzip/brotli."
+        ),
+        tags=['Dados Acadêmicos'],
+        responses={200: ReferenceDataSerializer}
+    )
+    def get(self, request, format=None):
+        accepted = _accepted_encodings(request)
+        version = get_reference_version()
+        variants = get_reference_payload('bundle', self.build_variants, version)
+
+        encoding = next(
+            (coding for coding in REFERENCE_DATA_ENCODINGS if coding in variants and coding in accepted),
+            'identity'
+        )
+        etag = get_reference_etag(f'bundle-{encoding}', version)
+
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(variants[encoding], content_type='application/json')
+            if encoding != 'identity':
+                response['Content-Encoding'] = encoding
+
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Accept-Encoding',))
+        patch_cache_control(response, no_cache=True)
+        return response
+
+    def build_variants(self):
+        data = ReferenceDataSerializer({
+            'eixos': Eixo.objects.prefetch_related('cursos').order_by('nome'),
+            'drps': DRP.objects.prefetch_related('polos'),
+            'pis': ProjetoIntegrador.objects.all(),
+            'tags': Tags.objects.order_by('name'),
+        }).data
+        return build_encoded_variants(JSONRenderer().render(data))
+
+SPARSE_FIELDSET_PARAMETERS = [
+    OpenApiParameter(name='fields', type=OpenApiTypes.STR, description='Campos retornados, separados por vírgula (ex.: id,name)'),
+    OpenApiParameter(name='expand', type=OpenApiTypes.STR, description='Campos extras a incluir (ex.: memberships)'),
+]
+
+class ProfileRetrieveMixin:
+    """
+    Leitura de perfil em no maximo duas consultas (JOIN + prefetch das tags), com ETag.
+
+    Quando o cliente revalida (If-None-Match) basta uma consulta pelo updated_at do perfil
+    para decidir se a resposta e 304, sem carregar o resto. Nao enviamos Last-Modified: a
+    ETag tambem depende da versao dos dados de referencia, que nao e uma data.
+    """
+    lookup_field = 'user'
+    lookup_url_kwarg = 'user_pk'
+
+    def get_profile_lookup(self):
+        return {self.lookup_field: self.kwargs[self.lookup_url_kwarg]}
+
+    def get_queryset(self):
+        fields = UserProfileDetailSerializer.selected_fields(self.request) if self.request.method == 'GET' else None
+        return UserProfile.objects.with_related(fields)
+
+    def get_object(self):
+        profile = get_object_or_404(self.get_queryset(), **self.get_profile_lookup())
+        self.check_object_permissions(self.request, profile)
+        return profile
+
+    def get_profile_etag(self, pk, updated_at):
+        params = self.request.query_params
+        # A versao dos dados de referencia entra na ETag porque nomes de polo/curso aparecem no perfil
+        return make_etag(
+            'profile', pk, updated_at.isoformat(), get_reference_version(),
+            params.get('fields', ''), params.get('expand', ''),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        if 'HTTP_IF_NONE_MATCH' in request.META:
+            state = UserProfile.objects.filter(**self.get_profile_lookup()).values_list('pk', 'updated_at').first()
+            if state is not None:
+                etag = self.get_profile_etag(*state)
+                response = get_conditional_response(request, etag=etag)
+                if response is not None:
+                    return self.set_profile_validators(response, etag)
+
+        profile = self.get_object()
+        response = Response(self.get_serializer(profile).data)
+        return self.set_profile_validators(response, self.get_profile_etag(profile.pk, profile.updated_at))
+
+    def set_profile_validators(self, response, etag):
+        response['ETag'] = etag
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
 @extend_schema_view(
     get=extend_schema(
         summary="Obter perfil próprio",
         description="Retorna o perfil completo do usuário autenticado.",
         tags=['Perfil de Usuário'],
+        parameters=SPARSE_FIELDSET_PARAMETERS,
         responses={200: UserProfileDetailSerializer}
     ),
     patch=extend_schema(
@@ -113,7 +341,7 @@ class TagsListView(generics.ListAPIView):
         }
     )
 )
-class ProfileSelfView(generics.RetrieveUpdateAPIView):
+class ProfileSelfView(ProfileRetrieveMixin, generics.RetrieveUpdateAPIView):
     http_method_names = ['get', 'patch', 'head', 'options']
     permission_classes = [IsAuthenticated]
     serializer_class = UserProfileDetailSerializer
@@ -123,8 +351,8 @@ class ProfileSelfView(generics.RetrieveUpdateAPIView):
             return UserProfileUpdateSerializer
         return UserProfileDetailSerializer
 
-    def get_object(self):
-        return self.request.user.profile
+    def get_profile_lookup(self):
+        return {'user': self.request.user}
 
 @extend_schema_view(
     get=extend_schema(
@@ -133,23 +361,97 @@ class ProfileSelfView(generics.RetrieveUpdateAPIView):
         tags=['Perfil de Usuário'],
         parameters=[
             OpenApiParameter(
-                name='user',
+                name='user_pk',
                 type=OpenApiTypes.UUID,
                 location=OpenApiParameter.PATH,
                 description='UUID do usuário'
             )
-        ],
+        ] + SPARSE_FIELDSET_PARAMETERS,
         responses={
             200: UserProfileDetailSerializer,
             404: OpenApiResponse(description="Usuário não encontrado")
         }
     )
 )
-class ProfileDetailsView(generics.RetrieveAPIView):
+class ProfileDetailsView(ProfileRetrieveMixin, generics.RetrieveAPIView):
     permission_classes = [IsAuthenticated]
     queryset = UserProfile.objects.all()
     serializer_class = UserProfileDetailSerializer
-    lookup_field = 'user'
+
+# Limite de usuarios por chamada de profiles/batch/
+PROFILE_BATCH_MAX_USERS = 50
+
+@extend_schema_view(
+    get=extend_schema(
+        summary="Obter perfis em lote",
+        description=(
+            "Retorna os perfis dos usuários informados em ?users=<uuid>,<uuid> (no máximo "
+            f"{PROFILE_BATCH_MAX_USERS}), na ordem pedida. Usuários sem perfil são omitidos. "
+            "O número de consultas não depende da quantidade de usuários."
+        ),
+        tags=['Perfil de Usuário'],
+        parameters=[
+            OpenApiParameter(name='users', type=OpenApiTypes.STR, required=True,
+                             description='UUIDs dos usuários, separados por vírgula'),
+            *SPARSE_FIELDSET_PARAMETERS,
+        ],
+        responses={
+            200: UserProfileDetailSerializer(many=True),
+            400: OpenApiResponse(description="Lista de usuários inválida ou acima do limite")
+        }
+    )
+)
+class ProfileBatchView(generics.ListAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = UserProfileDetailSerializer
+    pagination_class = None
+
+    def get_queryset(self):
+        self.user_ids = uuid_list_query_param(self.request, 'users', PROFILE_BATCH_MAX_USERS)
+        if not self.user_ids:
+            raise serializers.ValidationError({'users': 'Informe ao menos um usuário.'})
+        fields = UserProfileDetailSerializer.selected_fields(self.request)
+        return UserProfile.objects.with_related(fields).filter(user__in=self.user_ids)
+
+    def list(self, request, *args, **kwargs):
+        profiles = {profile.user_id: profile for profile in self.get_queryset()}
+        ordered = [profiles[user_id] for user_id in self.user_ids if user_id in profiles]
+        return Response(self.get_serializer(ordered, many=True).data)
+
+@extend_schema_view(
+    get=extend_schema(
+        summary="Listar alunos sem grupo",
+        description=(
+            "Lista os perfis de alunos ativos que ainda não fazem parte de nenhum grupo, "
+            "para que os administradores encontrem possíveis membros. Restrito a administradores "
+            "de grupo. Paginado por cursor, com os perfis criados mais recentemente primeiro."
+        ),
+        tags=['Perfil de Usuário'],
+        parameters=[
+            OpenApiParameter(name='projeto_integrador', type=OpenApiTypes.INT, description='ID do Projeto Integrador'),
+            OpenApiParameter(name='drp', type=OpenApiTypes.INT, description='ID da DRP'),
+            OpenApiParameter(name='polo', type=OpenApiTypes.INT, description='ID do polo'),
+            OpenApiParameter(name='eixo', type=OpenApiTypes.INT, description='ID do eixo'),
+            OpenApiParameter(name='curso', type=OpenApiTypes.INT, description='ID do curso'),
+            OpenApiParameter(name='tags', type=OpenApiTypes.STR, description='IDs de tags separados por vírgula (alunos com qualquer uma delas)'),
+            *SPARSE_FIELDSET_PARAMETERS,
+        ],
+        responses={
+            200: UserProfileDetailSerializer(many=True),
+            403: OpenApiResponse(description="Usuário não administra nenhum grupo"),
+        }
+    )
+)
+class ProfileAvailableListView(generics.ListAPIView):
+    # O e-mail aparece no perfil: a lista nao pode ser percorrida por qualquer aluno
+    permission_classes = [IsAuthenticated, IsAdminOfAnyGroup]
+    serializer_class = UserProfileDetailSerializer
+    pagination_class = ProfileCursorPagination
+
+    def get_queryset(self):
+        fields = UserProfileDetailSerializer.selected_fields(self.request)
+        queryset = UserProfile.objects.with_related(fields).without_group().filter(user__is_active=True)
+        return filter_profiles(queryset, self.request)
 
 @extend_schema_view(
     get=extend_schema(
@@ -164,15 +466,47 @@ class UserTagsListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        profile = self.request.user.profile
+        profile = get_request_context(self.request).profile
+        if profile is None:
+            raise Http404
         return profile.tags.all()
 
+PROJECT_GROUP_FILTER_PARAMETERS = [
+    OpenApiParameter(name='projeto_integrador', type=OpenApiTypes.INT, description='ID do Projeto Integrador'),
+    OpenApiParameter(name='drp', type=OpenApiTypes.INT, description='ID da DRP'),
+    OpenApiParameter(name='polo', type=OpenApiTypes.INT, description='ID do polo'),
+    OpenApiParameter(name='eixo', type=OpenApiTypes.INT, description='ID do eixo'),
+    OpenApiParameter(name='curso', type=OpenApiTypes.INT, description='ID do curso'),
+    OpenApiParameter(name='tags', type=OpenApiTypes.STR, description='IDs de tags separados por vírgula (grupos com qualquer uma delas)'),
+    OpenApiParameter(name='moderated', type=OpenApiTypes.BOOL, description='Filtra grupos moderados ou não'),
+    OpenApiParameter(name='search', type=OpenApiTypes.STR, description='Busca no nome e na descrição; resultados ordenados por relevância'),
+]
+
+# Ordenacoes aceitas pela lista de grupos (?ordering=); cada uma tem um indice proprio
+PROJECT_GROUP_ORDERINGS = {
+    'newest': ('-created_at', '-id'),
+    'active': ('-last_activity_at', '-id'),
+}
+
 @extend_schema_view(
     get=extend_schema(
         summary="Listar grupos de projeto",
-        description="Retorna lista de todos os grupos de projeto.",
+        description=(
+            "Retorna os grupos de projeto paginados por cursor (use o link `next`/`previous` da resposta).\n\n"
+            "Aceita filtros por dados acadêmicos, tags e moderação. Cada grupo vem em formato resumido "
+            "(sem descrição e membros); use `?fields=` para escolher os campos e `?expand=memberships` para incluir os membros."
+        ),
         tags=['Grupos de Projeto'],
-        responses={200: ProjectGroupSerializer(many=True)}
+        parameters=PROJECT_GROUP_FILTER_PARAMETERS + SPARSE_FIELDSET_PARAMETERS + [
+            OpenApiParameter(
+                name='ordering',
+                type=OpenApiTypes.STR,
+                enum=list(PROJECT_GROUP_ORDERINGS),
+                description='`newest` (padrão): mais novos primeiro; `active`: atividade mais recente primeiro. '
+                            'Ignorado quando há `search`.'
+            ),
+        ],
+        responses={200: ProjectGroupSummarySerializer(many=True)}
     ),
     post=extend_schema(
         summary="Criar grupo de projeto",
@@ -196,38 +530,77 @@ class ProjectGroupView(generics.ListCreateAPIView):
     http_method_names = ['get', 'post', 'head', 'options']
     queryset = ProjectGroup.objects.all()
     serializer_class = ProjectGroupSerializer
+    pagination_class = ProjectGroupCursorPagination
+
+    def get_serializer_class(self):
+        if self.request.method == 'GET':
+            return ProjectGroupSummarySerializer
+        return super().get_serializer_class()
 
-    def create(self, request, *args, **kwargs):
-        user_is_already_in_a_group = Membership.objects.filter(user=self.request.user).exists()
-        if user_is_already_in_a_group:
+    def get_queryset(self):
+        fields = self.get_serializer_class().selected_fields(self.request)
+        queryset = super().get_queryset().with_related(fields)
+        if self.request.method == 'GET':
+            queryset = filter_project_groups(queryset, self.request)
+        return queryset
+
+    def get_cursor_ordering(self):
+        if self.request.query_params.get('search', '').strip():
+            return ('-search_rank', '-id')
+        ordering = self.request.query_params.get('ordering') or 'newest'
+        if ordering not in PROJECT_GROUP_ORDERINGS:
             raise serializers.ValidationError(
-                {'detail': 'Você já faz parte de um grupo e não pode criar outro.'}
+                {'ordering': f"Use um destes valores: {', '.join(PROJECT_GROUP_ORDERINGS)}."}
             )
-        return super().create(request, *args, **kwargs)
+        return PROJECT_GROUP_ORDERINGS[ordering]
 
     def perform_create(self, serializer):
-        profile = self.request.user.profile
-        with transaction.atomic():
-            project_group_instance = serializer.save(
-                creator=self.request.user,
-                projeto_integrador=profile.projeto_integrador,
-                drp=profile.polo.drp,
-                polo=profile.polo,
-                eixo=profile.curso.eixo,
-                curso=profile.curso,
-            )
+        profile = get_request_context(self.request).profile
+        if profile is None:
+            raise Http404
+        # Sem checagem previa: o indice unico de Membership.user rejeita quem ja esta em um
+        # grupo (inclusive em requests simultaneos) e o grupo criado e desfeito junto
+        try:
+            with transaction.atomic():
+                project_group_instance = serializer.save(
+                    creator=self.request.user,
+                    projeto_integrador=profile.projeto_integrador,
+                    drp=profile.polo.drp,
+                    polo=profile.polo,
+                    eixo=profile.curso.eixo,
+                    curso=profile.curso,
+                )
 
-            membership_instance = Membership.objects.create(
-                user=self.request.user,
-                project_group=project_group_instance,
-                role=Membership.Role.ADMIN,
+                Membership.objects.create(
+                    user=self.request.user,
+                    project_group=project_group_instance,
+                    role=Membership.Role.ADMIN,
+                )
+                ProjectGroup.objects.filter(pk=project_group_instance.pk).adjust_counters(members=1)
+        except IntegrityError as error:
+            raise self.creation_conflict(error)
+        project_group_instance.member_count = 1
+
+    def creation_conflict(self, error):
+        """Traduz a restricao unica que barrou a criacao no erro de validacao correspondente."""
+        # Um grupo por usuario: vale para o vinculo e para o criador do grupo
+        if violates_unique(error, Membership, 'user') or violates_unique(error, ProjectGroup, 'creator'):
+            return serializers.ValidationError(
+                {'detail': 'Você já faz parte de um grupo e não pode criar outro.'}
             )
+        if violates_unique(error, ProjectGroup, 'name'):
+            # Outro request criou um grupo com o mesmo nome depois da validacao do serializer
+            return serializers.ValidationError({'name': ['Já existe um grupo com este nome.']})
+        return serializers.ValidationError(
+            {'detail': 'Não foi possível criar o grupo por um conflito com outra operação. Tente novamente.'}
+        )
 
 @extend_schema_view(
     get=extend_schema(
         summary="Obter detalhes de um grupo",
         description="Retorna informações completas de um grupo específico.",
         tags=['Grupos de Projeto'],
+        parameters=SPARSE_FIELDSET_PARAMETERS,
         responses={
             200: ProjectGroupSerializer,
             404: OpenApiResponse(description="Grupo não encontrado")
@@ -268,11 +641,20 @@ class ProjectGroupDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = ProjectGroup.objects.all()
     serializer_class = ProjectGroupSerializer
 
+    def get_queryset(self):
+        # No GET carrega apenas os campos pedidos; PATCH/DELETE respondem com o grupo completo
+        fields = ProjectGroupSerializer.selected_fields(self.request) if self.request.method == 'GET' else None
+        return super().get_queryset().with_related(fields)
+
     def get_serializer_class(self):
         if self.request.method == 'PATCH':
             return ProjectGroupUpdateSerializer
         return  super().get_serializer_class()
 
+    def perform_update(self, serializer):
+        # Editar o grupo conta como atividade (ordenacao ?ordering=active)
+        serializer.save(last_activity_at=timezone.now())
+
     def update(self, request, *args, **kwargs):
         response = super().update(request, *args, **kwargs)
 
@@ -310,11 +692,84 @@ class ProjectGroupMembersListView(generics.ListAPIView):
         group_pk = self.kwargs['group_pk']
         return Membership.objects.filter(project_group__pk=group_pk)
 
+class ProjectGroupFacetsView(APIView):
+    """
+    Contagem de grupos por PI, DRP, polo, eixo, curso e tag para a barra de filtros.
+
+    O resultado de cada combinacao de filtros fica em cache sob a versao 'project-groups',
+    incrementada quando grupos, membros ou tags de grupos mudam (ver core/signals.py).
+    """
+    permission_classes = [IsAuthenticated]
+
+    @extend_schema(
+        summary="Contagens para filtros de grupos",
+        description=(
+            "Retorna quantos grupos existem por Projeto Integrador, DRP, polo, eixo, curso e tag.\n\n"
+            "Aceita os mesmos filtros da lista de grupos, para que as contagens acompanhem os filtros já aplicados."
+        ),
+        tags=['Grupos de Projeto'],
+        parameters=PROJECT_GROUP_FILTER_PARAMETERS,
+        responses={200: ProjectGroupFacetsSerializer}
+    )
+    def get(self, request, format=None):
+        # Os filtros sao validados antes de consultar o cache (parametros invalidos -> 400)
+        filters = project_group_filters(request)
+        queryset = apply_project_group_filters(ProjectGroup.objects.all(), filters)
+        facets = get_project_groups_payload(
+            f'facets:{project_group_filters_key(filters)}',
+            lambda: project_group_facets(queryset),
+        )
+        return Response(facets)
+
+@extend_schema_view(
+    get=extend_schema(
+        summary="Grupos recomendados",
+        description=(
+            "Retorna os grupos mais compatíveis com o perfil do usuário autenticado, "
+            "considerando o mesmo Projeto Integrador, proximidade de polo/DRP, curso/eixo e tags em comum.\n\n"
+            "O grupo do próprio usuário não é recomendado."
+        ),
+        tags=['Grupos de Projeto'],
+        parameters=[
+            OpenApiParameter(name='limit', type=OpenApiTypes.INT, description='Número máximo de grupos retornados (padrão 10, máx. 50)'),
+        ],
+        responses={
+            200: RecommendedProjectGroupSerializer(many=True),
+            404: OpenApiResponse(description="Usuário sem perfil")
+        }
+    )
+)
+class RecommendedProjectGroupsView(generics.ListAPIView):
+    permission_classes = [IsAuthenticated]
+    serializer_class = RecommendedProjectGroupSerializer
+    default_limit = 10
+    max_limit = 50
+
+    def get_queryset(self):
+        context = get_request_context(self.request)
+        profile = context.profile
+        if profile is None:
+            raise Http404
+        limit = int_query_param(self.request, 'limit') or self.default_limit
+        tag_ids = UserTags.objects.filter(profile=profile).values_list('tag_id', flat=True)
+        own_group = [context.membership.project_group_id] if context.membership else []
+
+        ranking = recommend_group_ids(profile, list(tag_ids), max(1, min(limit, self.max_limit)), exclude=own_group)
+        groups = ProjectGroup.objects.with_related().in_bulk([group_id for group_id, _ in ranking])
+        recommended = []
+        for group_id, score in ranking:
+            # O grupo pode ter sido removido depois que as caracteristicas foram cacheadas
+            if group_id in groups:
+                groups[group_id].recommendation_score = score
+                recommended.append(groups[group_id])
+        return recommended
+
 @extend_schema_view(
     get=extend_schema(
         summary="Obter grupo do usuário",
         description="Retorna o grupo de projeto do qual o usuário faz parte.",
         tags=['Grupos de Projeto'],
+        parameters=SPARSE_FIELDSET_PARAMETERS,
         responses={
             200: ProjectGroupSerializer,
             404: OpenApiResponse(description='Usuário não faz parte de nenhum grupo')
@@ -326,23 +781,25 @@ class ProjectGroupSelfView(generics.RetrieveAPIView):
     serializer_class = ProjectGroupSerializer
     queryset = ProjectGroup.objects.all()
 
+    def get_queryset(self):
+        return super().get_queryset().with_related(ProjectGroupSerializer.selected_fields(self.request))
+
     def get_object(self):
-        try:
-            membership = self.request.user.membership
-            return membership.project_group
-        except Membership.DoesNotExist:
+        # Busca o grupo pelo vinculo do usuario direto no queryset otimizado (sem carregar o Membership antes)
+        group = self.get_queryset().filter(memberships__user=self.request.user).first()
+        if group is None:
             raise Http404('Você não faz parte de nenhum grupo.')
+        return group
 
 class MembershipDeleteView(APIView):
     permission_classes = [IsAuthenticated, CanRemoveMembership]
 
 
     def get_object(self, group_pk, user_pk):
-        group = get_object_or_404(ProjectGroup, pk=group_pk)
-        user = get_object_or_404(CustomUser, pk=user_pk)
-
-        # Retorna o objeto Membership que será o alvo
-        return get_object_or_404(Membership, project_group=group, user=user)
+        # Retorna o objeto Membership que será o alvo, ja com o grupo usado por CanRemoveMembership
+        return get_object_or_404(
+            Membership.objects.select_related('project_group'), project_group_id=group_pk, user_id=user_pk
+        )
 
     @extend_schema(
         summary="Remover membro do grupo",
@@ -379,7 +836,9 @@ class MembershipDeleteView(APIView):
 
         self.check_object_permissions(self.request, membership_to_delete)
 
-        membership_to_delete.delete()
+        with transaction.atomic():
+            membership_to_delete.delete()
+            ProjectGroup.objects.filter(pk=membership_to_delete.project_group_id).adjust_counters(members=-1)
 
         return Response(status=status.HTTP_204_NO_CONTENT)
 
@@ -405,22 +864,23 @@ class LeaveGroupView(APIView):
         }
     )
     def post(self, request, format=None):
-        try:
-            membership_to_delete = request.user.membership
-        except Membership.DoesNotExist:
+        membership_to_delete = get_request_context(request).membership
+        if membership_to_delete is None:
             return Response(
                 {'detail': 'Você não faz parte de nenhum grupo.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
         user = request.user
         group = membership_to_delete.project_group
-        if group.creator == user:
+        if group.creator_id == user.pk:
             return Response(
                 {'detail': 'O administrador não pode sair do grupo. O grupo deve ser deletado.'},
                 status=status.HTTP_403_FORBIDDEN
             )
 
-        membership_to_delete.delete()
+        with transaction.atomic():
+            membership_to_delete.delete()
+            ProjectGroup.objects.filter(pk=group.pk).adjust_counters(members=-1)
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 class JoinGroupView(APIView):
@@ -456,60 +916,87 @@ class JoinGroupView(APIView):
     )
     def post(self, request, group_pk, format=None):
         user = self.request.user
-        group = get_object_or_404(ProjectGroup, pk=group_pk)
+        # Uma consulta traz o grupo e o que precisamos saber do usuario; as insercoes abaixo
+        # dependem das restricoes unicas (Membership.user e JoinRequest(user, project_group))
+        # para resolver cliques simultaneos, sem checagem previa separada.
+        group = get_object_or_404(
+            ProjectGroup.objects.only('pk', 'moderated').annotate(
+                requester_is_member=Exists(Membership.objects.filter(user=user)),
+                requester_is_pending=Exists(JoinRequest.objects.filter(
+                    user=user, project_group=OuterRef('pk'), status=JoinRequest.Status.PENDING,
+                )),
+            ),
+            pk=group_pk,
+        )
 
-        user_is_already_in_a_group = Membership.objects.filter(user=user).exists()
-        if user_is_already_in_a_group:
-            return Response(
-                {'detail': 'Você já faz parte de um grupo e não pode entrar em outro.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        if group.requester_is_member:
+            return self.already_member_response()
+        if group.moderated and group.requester_is_pending:
+            return self.already_pending_response()
 
-        user_aready_asked_to_join_this_group = JoinRequest.objects.filter(
-            user=user,
-            project_group=group,
-            status=JoinRequest.Status.PENDING,
-        ).exists()
-        if user_aready_asked_to_join_this_group:
-            return Response(
-                {'detail': 'Você já enviou uma solicitação para entrar neste grupo. Aguarde a aprovação.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
         #se o grupo for moderado solicita a entrada criando uma joinrequest pending
         if group.moderated:
-            JoinRequest.objects.create(
-                user=user,
-                project_group=group,
-                status=JoinRequest.Status.PENDING,
-            )
-            return Response(
-                {'detail': 'Solicitação enviada. Aguarde a aprovação do administrador do grupo.'},
-                status=status.HTTP_202_ACCEPTED
-            )
-        #se o grupo nao for moderado entra direto no grupo (usa transaction para criar os 2 objetos)
-        else:
             try:
                 with transaction.atomic():
-                    Membership.objects.create(
+                    JoinRequest.objects.create(
                         user=user,
                         project_group=group,
-                        role=Membership.Role.MEMBER,
+                        status=JoinRequest.Status.PENDING,
                     )
+                    ProjectGroup.objects.filter(pk=group.pk).adjust_counters(pending_requests=1)
+            except IntegrityError:
+                # Ja existe um pedido para este grupo: reabre se ja tinha sido analisado
+                with transaction.atomic():
+                    reopened = JoinRequest.objects.filter(user=user, project_group=group).exclude(
+                        status=JoinRequest.Status.PENDING
+                    ).update(status=JoinRequest.Status.PENDING, date_requested=timezone.localdate())
+                    if reopened:
+                        ProjectGroup.objects.filter(pk=group.pk).adjust_counters(pending_requests=1)
+                if not reopened:
+                    return self.already_pending_response()
+            return Response(
+                {'detail': 'Solicitação enviada. Aguarde a aprovação do administrador do grupo.'},
+                status=status.HTTP_202_ACCEPTED
+            )
+        #se o grupo nao for moderado entra direto no grupo (usa transaction para criar os 2 objetos)
+        try:
+            with transaction.atomic():
+                Membership.objects.create(
+                    user=user,
+                    project_group=group,
+                    role=Membership.Role.MEMBER,
+                )
+                # Depois do INSERT acima nenhum outro request deste usuario passa daqui ate o commit
+                if not JoinRequest.objects.filter(user=user, project_group=group).update(
+                    status=JoinRequest.Status.APPROVED
+                ):
                     JoinRequest.objects.create(
                         user=user,
                         project_group=group,
                         status=JoinRequest.Status.APPROVED,
                     )
-                return Response(
-                    {'detail': 'Você entrou no grupo com sucesso.'},
-                    status=status.HTTP_201_CREATED
+                ProjectGroup.objects.filter(pk=group.pk).adjust_counters(
+                    members=1, pending_requests=-1 if group.requester_is_pending else 0
                 )
+        except IntegrityError:
+            # Outro request colocou o usuario em um grupo ao mesmo tempo
+            return self.already_member_response()
+        return Response(
+            {'detail': 'Você entrou no grupo com sucesso.'},
+            status=status.HTTP_201_CREATED
+        )
 
-            except IntegrityError:
-                return Response(
-                    {'detail': 'Erro ao entrar no grupo. Tente novamente mais tarde.'},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
+    def already_member_response(self):
+        return Response(
+            {'detail': 'Você já faz parte de um grupo e não pode entrar em outro.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    def already_pending_response(self):
+        return Response(
+            {'detail': 'Você já enviou uma solicitação para entrar neste grupo. Aguarde a aprovação.'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
 @extend_schema_view(
     get=extend_schema(
@@ -519,17 +1006,10 @@ class JoinGroupView(APIView):
             "**Permissões:** Apenas admins de grupos podem ver pedidos"
         ),
         tags=['Pedidos de Entrada'],
-        parameters=[
-            OpenApiParameter(
-                name='group_pk',
-                type=OpenApiTypes.INT,
-                location=OpenApiParameter.PATH,
-                description='ID do grupo'
-            )
-        ],
         responses={
             200: JoinRequestSerializer(many=True),
-            403: OpenApiResponse(description="Usuário não é admin de nenhum grupo")
+            403: OpenApiResponse(description="Usuário não é admin de nenhum grupo"),
+            404: OpenApiResponse(description="Usuário não faz parte de um grupo")
         }
     )
 )
@@ -539,11 +1019,16 @@ class JoinRequestListView(generics.ListAPIView):
     """
     permission_classes = [IsAuthenticated, IsMemberOfGroup]
     serializer_class = JoinRequestSerializer
+    pagination_class = JoinRequestCursorPagination
 
     def get_queryset(self):
-        group_pk = self.request.user.membership.project_group.pk
-        group = get_object_or_404(ProjectGroup, pk=group_pk)
-        return JoinRequest.objects.filter(project_group=group, status=JoinRequest.Status.PENDING)
+        group = get_request_context(self.request).group
+        if group is None:
+            raise Http404
+        # Busca por intervalo no indice (project_group, status, date_requested)
+        return JoinRequest.objects.filter(
+            project_group=group, status=JoinRequest.Status.PENDING
+        ).select_related('user', 'project_group')
 
 class JoinRequestApproveView(APIView):
 
@@ -584,43 +1069,42 @@ class JoinRequestApproveView(APIView):
         }
     )
     def post(self, request, request_pk, format=None):
-        join_request = get_object_or_404(JoinRequest, pk=request_pk)
+        join_request = get_object_or_404(JoinRequest.objects.select_related('project_group'), pk=request_pk)
 
         self.check_object_permissions(self.request, join_request.project_group)
 
-        user = join_request.user
         group = join_request.project_group
-
-        #se um user ja estiver em um grupo rejeita a solicitação automaticamente
-        user_is_already_in_a_group = Membership.objects.filter(user=user).exists()
-        if user_is_already_in_a_group:
-            join_request.status = JoinRequest.Status.REJECTED
-            join_request.save()
-            return Response(
-                {'detail': 'O usuário já faz parte de outro grupo. A solicitação foi rejeitada.'},
-                status=status.HTTP_400_BAD_REQUEST
+        with transaction.atomic():
+            # UPDATE condicional: entre aprovacoes simultaneas do mesmo pedido so uma "ganha"
+            claimed = JoinRequest.objects.filter(pk=join_request.pk, status=JoinRequest.Status.PENDING).update(
+                status=JoinRequest.Status.APPROVED
             )
-
-        try:
-            with transaction.atomic():
-                Membership.objects.create(
-                    user=user,
-                    project_group=group,
-                    role=Membership.Role.MEMBER,
+            if not claimed:
+                return Response(
+                    {'detail': 'Esta solicitação já foi processada.'},
+                    status=status.HTTP_400_BAD_REQUEST
                 )
-                join_request.status = JoinRequest.Status.APPROVED
-                join_request.save()
-
-            return Response(
-                {'detail': 'Solicitação aprovada. O usuário agora é membro do grupo.'},
-                status=status.HTTP_200_OK
-            )
+            try:
+                with transaction.atomic():
+                    Membership.objects.create(
+                        user_id=join_request.user_id,
+                        project_group=group,
+                        role=Membership.Role.MEMBER,
+                    )
+            except IntegrityError:
+                #se um user ja estiver em um grupo rejeita a solicitação automaticamente
+                JoinRequest.objects.filter(pk=join_request.pk).update(status=JoinRequest.Status.REJECTED)
+                ProjectGroup.objects.filter(pk=group.pk).adjust_counters(pending_requests=-1)
+                return Response(
+                    {'detail': 'O usuário já faz parte de outro grupo. A solicitação foi rejeitada.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            ProjectGroup.objects.filter(pk=group.pk).adjust_counters(members=1, pending_requests=-1)
 
-        except IntegrityError:
-            return Response(
-                {'detail': 'Erro ao aprovar a solicitação. Tente novamente mais tarde.'},
-                status=status.HTTP_400_BAD_REQUEST
-            )
+        return Response(
+            {'detail': 'Solicitação aprovada. O usuário agora é membro do grupo.'},
+            status=status.HTTP_200_OK
+        )
 
 class JoinRequestRejectView(APIView):
     permission_classes = [IsAuthenticated, IsAdminOfGroup]
@@ -649,30 +1133,147 @@ class JoinRequestRejectView(APIView):
         }
     )
     def post(self, request, request_pk, format=None):
-        join_request = get_object_or_404(JoinRequest, pk=request_pk)
+        join_request = get_object_or_404(JoinRequest.objects.select_related('project_group'), pk=request_pk)
 
         self.check_object_permissions(self.request, join_request.project_group)
 
+        with transaction.atomic():
+            # UPDATE condicional, como na aprovacao: rejeicoes repetidas ou uma aprovacao simultanea
+            # nao decrementam o contador duas vezes nem sobrescrevem um pedido ja aprovado
+            rejected = JoinRequest.objects.filter(pk=join_request.pk, status=JoinRequest.Status.PENDING).update(
+                status=JoinRequest.Status.REJECTED
+            )
+            if rejected:
+                ProjectGroup.objects.filter(pk=join_request.project_group_id).adjust_counters(pending_requests=-1)
+
         # se a solicitação já foi processada, retorna erro
-        if join_request.status != JoinRequest.Status.PENDING:
+        if not rejected:
             return Response(
                 {'detail': 'Esta solicitação já foi processada.'},
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        join_request.status = JoinRequest.Status.REJECTED
-        join_request.save()
-
         return Response(
             {'detail': 'Solicitação rejeitada com sucesso.'},
             status=status.HTTP_200_OK
         )
 
+class JoinRequestBulkActionView(APIView):
+    """
+    Aprova ou rejeita varios pedidos do grupo do admin de uma vez.
+
+    Os pedidos sao travados uma unica vez (select_for_update), os conflitos de "um grupo
+    por usuario" sao verificados em uma so consulta e os vinculos criados com bulk_create.
+    """
+    permission_classes = [IsAuthenticated, IsAdminOfGroup]
+
+    @extend_schema(
+        summary="Aprovar ou rejeitar pedidos em lote",
+        description=(
+            "Aplica `approve` ou `reject` a uma lista de pedidos de entrada do grupo do usuário "
+            f"(no máximo {JOIN_REQUEST_BULK_MAX}). O resultado de cada ID é informado em `results`:\n\n"
+            "- `approved` / `rejected`: pedido processado\n"
+            "- `already_member`: o usuário já está em outro grupo; o pedido foi rejeitado\n"
+            "- `already_processed`: o pedido não estava pendente\n"
+            "- `not_found`: o pedido não existe ou é de outro grupo\n\n"
+            "**Permissões:** Apenas o admin do grupo"
+        ),
+        tags=['Pedidos de Entrada'],
+        request=JoinRequestBulkActionSerializer,
+        responses={
+            200: JoinRequestBulkResponseSerializer,
+            400: OpenApiResponse(response=MessageResponseSerializer, description="Dados inválidos"),
+            403: OpenApiResponse(response=MessageResponseSerializer, description="Usuário não é admin de um grupo"),
+            409: OpenApiResponse(response=MessageResponseSerializer, description="Conflito com outra operação; nada foi gravado"),
+        }
+    )
+    def post(self, request, format=None):
+        serializer = JoinRequestBulkActionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))
+        approve = serializer.validated_data['action'] == 'approve'
+
+        # O mesmo vinculo carregado aqui e usado por IsAdminOfGroup (ver core/context.py)
+        group = get_request_context(request).group
+        if group is None:
+            return Response(
+                {'detail': 'Você não faz parte de um grupo.'},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        self.check_object_permissions(request, group)
+
+        results = {}
+        try:
+            with transaction.atomic():
+                join_requests = list(
+                    JoinRequest.objects.select_for_update().filter(pk__in=ids, project_group=group)
+                )
+                pending = []
+                for join_request in join_requests:
+                    if join_request.status == JoinRequest.Status.PENDING:
+                        pending.append(join_request)
+                    else:
+                        results[join_request.pk] = 'already_processed'
+
+                approved, rejected = [], []
+                if approve:
+                    # Uma consulta para todos os conflitos de "um grupo por usuario"
+                    members = set(
+                        Membership.objects.filter(user__in=[jr.user_id for jr in pending])
+                        .values_list('user_id', flat=True)
+                    )
+                    for join_request in pending:
+                        if join_request.user_id in members:
+                            rejected.append(join_request.pk)
+                            results[join_request.pk] = 'already_member'
+                        else:
+                            approved.append(join_request)
+                            results[join_request.pk] = 'approved'
+                    Membership.objects.bulk_create([
+                        Membership(user_id=jr.user_id, project_group=group, role=Membership.Role.MEMBER)
+                        for jr in approved
+                    ])
+                else:
+                    for join_request in pending:
+                        rejected.append(join_request.pk)
+                        results[join_request.pk] = 'rejected'
+
+                if approved:
+                    JoinRequest.objects.filter(pk__in=[jr.pk for jr in approved]).update(
+                        status=JoinRequest.Status.APPROVED
+                    )
+                    # bulk_create nao dispara post_save: invalidamos os dados derivados dos grupos
+                    transaction.on_commit(bump_project_groups_version)
+                if rejected:
+                    JoinRequest.objects.filter(pk__in=rejected).update(status=JoinRequest.Status.REJECTED)
+                ProjectGroup.objects.filter(pk=group.pk).adjust_counters(
+                    members=len(approved), pending_requests=-len(pending)
+                )
+        except IntegrityError:
+            # Outro request colocou um dos usuarios em um grupo ao mesmo tempo; nada foi gravado
+            return Response(
+                {'detail': 'Erro ao processar as solicitações. Tente novamente.'},
+                status=status.HTTP_409_CONFLICT
+            )
+
+        return Response(
+            {'results': [{'id': pk, 'result': results.get(pk, 'not_found')} for pk in ids]},
+            status=status.HTTP_200_OK
+        )
+
 @extend_schema_view(
     get=extend_schema(
         summary="Obter pedidos de entrada próprios",
-        description="Retorna todos os pedidos de entrada do usuário autenticado.",
+        description="Retorna os pedidos de entrada do usuário autenticado, mais recentes primeiro.",
         tags=['Pedidos de Entrada'],
+        parameters=[
+            OpenApiParameter(
+                name='status',
+                type=OpenApiTypes.STR,
+                enum=JoinRequest.Status.values,
+                description='Filtra pelo status do pedido'
+            ),
+        ],
         responses={
             200: JoinRequestSerializer(many=True),
             404: OpenApiResponse(description="Usuário não tem pedidos de entrada")
@@ -682,10 +1283,15 @@ class JoinRequestRejectView(APIView):
 class JoinRequestSelfView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = JoinRequestSerializer
+    pagination_class = JoinRequestCursorPagination
 
     def get_queryset(self):
         user = self.request.user
-        return JoinRequest.objects.filter(user=user)
+        queryset = JoinRequest.objects.filter(user=user).select_related('user', 'project_group')
+        join_status = choice_query_param(self.request, 'status', JoinRequest.Status.values)
+        if join_status is not None:
+            queryset = queryset.filter(status=join_status)
+        return queryset
 
 
 #
@@ -12,6 +12,9 @@ python manage.py collectstatic --noinput
 echo "Running migrations..."
 python manage.py migrate --noinput
 
+echo "Creating cache table..."
+python manage.py createcachetable
+
 echo "Creating superuser if needed..."
 python manage.py shell << END
 from django.contrib.auth import get_user_model